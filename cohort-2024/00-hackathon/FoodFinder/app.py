@@ -1,69 +1,17 @@
 from flask import Flask, render_template, request, redirect, url_for, jsonify
-import math
 import json
 import pandas as pd
 from ics_utils import *
+from places_index import PlacesIndex
+from places_loader import load_places_cached
+from place_store import PLACES_STORE_PATH, ATTRIBUTES_STORE_PATH
+from cuisine_index import CuisineIndex, cuisine_query_text, is_generic
+from get_embeddings import EmbeddingBundle, encode_texts, EMBEDDINGS_PATH
+from location_resolver import LocationResolver, NominatimGeocoder, GEOCODER_ENDPOINT
 import os
-from werkzeug.utils import secure_filename
 from datetime import datetime
 import pytz
 
-# --- Data Loading and Processing ---
-
-def load_json_data(file_path):
-    """Loads JSON data from a file."""
-    with open(file_path, 'r') as f:
-        return json.load(f)
-
-def filter_operational_places(places):
-    """Filters places to include only operational businesses."""
-    return [place for place in places if place.get("businessStatus") == "OPERATIONAL"]
-
-def create_extracted_attributes_map(extracted_attributes_list):
-    """Creates a dictionary mapping place IDs to their extracted attributes."""
-    return {item['id']: item for item in extracted_attributes_list}
-
-def json_to_pandas_row(json_data):
-    """Converts JSON data of a place into a Pandas DataFrame row."""
-    data_row = {
-        "id": json_data.get("id"),
-        "types": ", ".join(json_data.get("types", [])),
-        "formattedAddress": json_data.get("formattedAddress"),
-        "latitude": json_data.get("location", {}).get("latitude"),
-        "longitude": json_data.get("location", {}).get("longitude"),
-        "rating": json_data.get("rating"),
-        "businessStatus": json_data.get("businessStatus"),
-        "userRatingCount": json_data.get("userRatingCount"),
-        "displayName_text": json_data.get("displayName", {}).get("text"),
-        "displayName_languageCode": json_data.get("displayName", {}).get("languageCode"),
-        "takeout": json_data.get("takeout"),
-        "delivery": json_data.get("delivery"),
-        "dineIn": json_data.get("dineIn"),
-        "openNow": json_data.get("currentOpeningHours", {}).get("openNow"),
-        "weekdayDescriptions": "\n".join(json_data.get("currentOpeningHours", {}).get("weekdayDescriptions", [])),
-        "acceptsCreditCards": json_data.get("paymentOptions", {}).get("acceptsCreditCards"),
-        "acceptsDebitCards": json_data.get("paymentOptions", {}).get("acceptsDebitCards"),
-        "acceptsCashOnly": json_data.get("paymentOptions", {}).get("acceptsCashOnly"),
-        "acceptsNfc": json_data.get("paymentOptions", {}).get("acceptsNfc"),
-        "freeParkingLot": json_data.get("parkingOptions", {}).get("freeParkingLot"),
-        "freeStreetParking": json_data.get("parkingOptions", {}).get("freeStreetParking"),
-        "spicyLevel": json_data.get("spicy_level"),
-        "priceLevel": json_data.get("price_level")
-    }
-    return pd.DataFrame([data_row])
-
-def create_places_dataframe(places, extracted_attributes):
-    """Creates a Pandas DataFrame from places data and extracted attributes."""
-    if not places:
-        return pd.DataFrame()
-
-    assert len(places) == len(extracted_attributes), "Number of places and extracted attributes must match."
-
-    df = json_to_pandas_row(places[0] | extracted_attributes[places[0]['id']])
-    for place in places[1:]:
-        df = pd.concat([df, json_to_pandas_row(place | extracted_attributes[place['id']])], ignore_index=True)
-    return df
-
 # --- Cuisine Data ---
 
 cuisine_options_map = {
@@ -84,107 +32,125 @@ cuisine_options_map = {
     "Other": ['restaurant', 'food']
 }
 
-# --- Distance Calculation ---
+# --- Recommendation Engine ---
 
-def calculate_distance(lat1, lon1, lat2, lon2):
-    """Calculates the distance between two points on Earth using the Haversine formula."""
-    R = 6371  # Radius of Earth in kilometers
-    dLat = math.radians(lat2 - lat1)
-    dLon = math.radians(lon2 - lon1)
-    lat1 = math.radians(lat1)
-    lat2 = math.radians(lat2)
+def get_restaurant_recommendations(places, cuisine_preference, spice_level, budget, distance, prev_lat, prev_lng, next_lat, next_lng, cuisine_index=None, page=1, page_size=10):
+    """Recommends restaurants based on user preferences and location, best first (see ScoringModel).
 
-    a = math.sin(dLat / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dLon / 2)**2
-    c = 2 * math.asin(math.sqrt(a))
-    return R * c
+    `places` is a shared, read-only PlacesIndex; all per-request state stays local to this call.
+    With a `cuisine_index` the cuisine preference is matched semantically against the
+    place-type embeddings, keeping at least the places its keyword types match; otherwise,
+    and for options that only name generic types, it uses the keyword `cuisine_options_map`.
 
-# --- Recommendation Engine ---
-
-def get_restaurant_recommendations(df, cuisine_preference, spice_level, budget, distance, prev_lat, prev_lng, next_lat, next_lng):
-    """Recommends restaurants based on user preferences and location."""
-    if df.empty:
-        print("DataFrame is empty. Please check data loading.")
-        return [] # Return empty list instead of DataFrame
+    Returns:
+        tuple: The recommendations on the requested page and the total number of matches.
+    """
+    if places.empty:
+        print("Places index is empty. Please check data loading.")
+        return [], 0 # Return empty list instead of DataFrame
     print(prev_lat,prev_lng,next_lat,next_lng)
     if not prev_lat or not prev_lng or not next_lat or not next_lng:
         print("Location parameters are required.")
-        return [] # Return empty list instead of DataFrame
-
-    # 1. Distance Calculation
-    df['distance_to'] = df.apply(
-        lambda row: calculate_distance(
-            float(prev_lat), float(prev_lng), row['latitude'], row['longitude']
-        ), axis=1
-    )
-    df['distance_back'] = df.apply(
-        lambda row: calculate_distance(
-            float(next_lat), float(next_lng), row['latitude'], row['longitude']
-        ), axis=1
-    )
-    df['distance_km'] = df['distance_to'] + df['distance_back']
-
-    filtered_df = df.copy()
-
-    # 2. Filtering
+        return [], 0 # Return empty list instead of DataFrame
+    prev_lat, prev_lng, next_lat, next_lng = float(prev_lat), float(prev_lng), float(next_lat), float(next_lng)
 
     # Distance Preference
-    if distance and distance != "any":
-        filtered_df = filtered_df[filtered_df['distance_km'] <= float(distance)]
+    max_distance = float(distance) if distance and distance != "any" else None
 
     # Cuisine Preference
-    if cuisine_preference:
-        types_to_filter = cuisine_options_map.get(cuisine_preference, [])
-        if types_to_filter:
-            filter_condition = filtered_df['types'].apply(lambda x: any(cuisine_type in x for cuisine_type in types_to_filter))
-            filtered_df = filtered_df[filter_condition]
+    types_to_filter = []
+    similarity = None
+    min_similarity = None
+    keyword_types = cuisine_options_map.get(cuisine_preference, [])
+    # Options such as "Other" only name generic types, which the embeddings leave out on purpose.
+    if cuisine_preference and cuisine_index is not None and not is_generic(keyword_types):
+        query_text = cuisine_query_text(cuisine_preference)
+        similarity = cuisine_index.similarity(query_text)
+        min_similarity = cuisine_index.min_similarity(query_text, keyword_types)
+    elif cuisine_preference:
+        types_to_filter = keyword_types
 
     # Spice Level
-    if spice_level and spice_level != "":
-        filtered_df = filtered_df[filtered_df['spicyLevel'] == spice_level]
+    spicy_level = spice_level if spice_level else None
 
     # Budget
     budget_mapping = {"Budget-friendly": 1, "Mid-range": 2, "Luxury": 3}
-    if budget and budget != "":
-        budget_level = budget_mapping.get(budget)
-        filtered_df = filtered_df[filtered_df['priceLevel'] == budget_level]
+    price_level = budget_mapping.get(budget) if budget else None
+
+    rows, distance_km, total_matches = places.query(
+        prev_lat, prev_lng, next_lat, next_lng,
+        max_distance=max_distance,
+        types_to_filter=types_to_filter,
+        spicy_level=spicy_level,
+        price_level=price_level,
+        similarity=similarity,
+        min_similarity=min_similarity,
+        page=page,
+        page_size=page_size,
+    )
+
+    # Gather the selected rows as plain Python values so they serialise with tojson.
+    columns = {
+        name: places.column(name)[rows].tolist()
+        for name in ('displayName_text', 'formattedAddress', 'types', 'rating', 'userRatingCount', 'latitude', 'longitude')
+    }
+    distances = distance_km[rows].tolist()
 
     recommendations = []
-    for index, row in filtered_df.head(10).iterrows():
+    for i in range(len(rows)):
         recommendations.append({
-            'name': row['displayName_text'],
-            'address': row['formattedAddress'],
-            'types': row['types'],
-            'rating': row['rating'],
-            'userRatingCount': row['userRatingCount'],
-            'distance_km': row['distance_km'],
-            'restaurant_lat': row['latitude'], # Add restaurant lat
-            'restaurant_lng': row['longitude'], # Add restaurant lng
-            'prev_lat': float(prev_lat), # Add prev lat
-            'prev_lng': float(prev_lng), # Add prev lng
-            'next_lat': float(next_lat), # Add next lat
-            'next_lng': float(next_lng)  # Add next lng
+            'name': columns['displayName_text'][i],
+            'address': columns['formattedAddress'][i],
+            'types': columns['types'][i],
+            'rating': columns['rating'][i],
+            'userRatingCount': columns['userRatingCount'][i],
+            'distance_km': distances[i],
+            'restaurant_lat': columns['latitude'][i], # Add restaurant lat
+            'restaurant_lng': columns['longitude'][i], # Add restaurant lng
+            'prev_lat': prev_lat, # Add prev lat
+            'prev_lng': prev_lng, # Add prev lng
+            'next_lat': next_lat, # Add next lat
+            'next_lng': next_lng  # Add next lng
         })
-    return recommendations
+    return recommendations, total_matches
 
 
 # --- Flask App ---
 
-UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'ics'}
+RESULTS_PER_PAGE = 10
+CALENDAR_CACHE_SIZE = 128  # Parsed calendars kept in memory
 
 app = Flask(__name__)
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB limit for uploads
 
 # Load data and create DataFrame outside of routes for efficiency
-json_file_path = "all_places_response.json"
-generated_content_path = "processed_places_response.json"
-
-places_data = load_json_data(json_file_path)
-operational_places = filter_operational_places(places_data)
-extracted_attributes_list = load_json_data(generated_content_path)
-extracted_attributes_map = create_extracted_attributes_map(extracted_attributes_list)
-df = create_places_dataframe(operational_places, extracted_attributes_map)
+json_file_path = PLACES_STORE_PATH
+generated_content_path = ATTRIBUTES_STORE_PATH
+
+# Reuses the Parquet cache unless either source file changed since it was built.
+df = load_places_cached(json_file_path, generated_content_path)
+# Shared read-only view used by every request thread; never mutated after startup.
+places_index = PlacesIndex(df)
+
+
+def load_cuisine_index(places, embeddings_path=EMBEDDINGS_PATH, model_name="all-MiniLM-L6-v2"):
+    """Loads semantic cuisine matching if get_embeddings.py has been run, else returns None."""
+    if not os.path.exists(f"{embeddings_path}.npy"):
+        return None
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        print("sentence_transformers is not installed; using keyword cuisine matching.")
+        return None
+    model = SentenceTransformer(model_name)
+    return CuisineIndex(EmbeddingBundle.load(embeddings_path), places.column('id'),
+                        lambda text: encode_texts(model, [text])[0])
+
+cuisine_index = load_cuisine_index(places_index)
+# Event locations are resolved once per upload; LOCATION fields are geocoded only if an endpoint is configured.
+location_resolver = LocationResolver(NominatimGeocoder() if GEOCODER_ENDPOINT else None)
+calendar_cache = CalendarCache(CALENDAR_CACHE_SIZE, location_resolver)
 
 def allowed_file(filename):
     return '.' in filename and \
@@ -193,47 +159,60 @@ def allowed_file(filename):
 @app.route('/', methods=['GET'])
 def index():
     """Renders the index page with available cuisine options."""
-    all_types_in_data = df['types'].str.split(', ', expand=True).stack().unique()
+    all_types_in_data = places_index.unique_types()
     available_cuisine_options = [
         cuisine for cuisine, types in cuisine_options_map.items()
         if any(item in all_types_in_data for item in types)
     ]
     return render_template('index.html', cuisine_options=available_cuisine_options, initial_lat=51.505, initial_lng=-0.09) # Default London
 
+def selected_datetime_from_form(form):
+    """Converts the selected date and time inputs into a datetime object with timezone info."""
+    selected_datetime_str = f"{form.get('selected_date')} {form.get('selected_time')}"
+    selected_datetime = datetime.strptime(selected_datetime_str, "%Y-%m-%d %H:%M")
+    return pytz.utc.localize(selected_datetime)
+
+def event_locations(calendar_id, events, selected_datetime):
+    """Returns the locations around the selected time as JSON, with the ID for follow-up queries."""
+    (prev_lat, prev_lng), (next_lat, next_lng), next_start = get_lat_lng_from_events(events, selected_datetime)
+    return jsonify({
+        'calendar_id': calendar_id,
+        'prev_lat': prev_lat,
+        'prev_lng': prev_lng,
+        'next_lat': next_lat,
+        'next_lng': next_lng
+    })
+
 @app.route('/process_ics', methods=['POST'])
 def process_ics_file():
-    """Processes the uploaded ICS file and returns location data."""
+    """Processes the uploaded ICS file in memory and returns location data."""
     if 'ics_file' not in request.files:
         return jsonify({'error': 'No file part'})
     ics_file = request.files['ics_file']
     if ics_file.filename == '':
         return jsonify({'error': 'No selected file'})
     if ics_file and allowed_file(ics_file.filename):
-        filename = secure_filename(ics_file.filename)
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        ics_file.save(file_path)
-
-        selected_date_input = request.form.get('selected_date')
-        selected_time_input = request.form.get('selected_time')
-
-        events = parse_ics(file_path)
-
-        # Convert date and time inputs into a datetime object with timezone info
-        selected_datetime_str = f"{selected_date_input} {selected_time_input}"
-        selected_datetime = datetime.strptime(selected_datetime_str, "%Y-%m-%d %H:%M")
-        selected_datetime = pytz.utc.localize(selected_datetime)
-
-        (prev_lat, prev_lng), (next_lat, next_lng), next_start = get_lat_lng_from_events(events, selected_datetime)
+        try:
+            selected_datetime = selected_datetime_from_form(request.form)
+        except ValueError:
+            return jsonify({'error': 'Invalid date or time'})
+        # Parsed straight from the request; identical uploads reuse the cached calendar.
+        calendar_id, events = calendar_cache.add(ics_file.read())
+        return event_locations(calendar_id, events, selected_datetime)
+    return jsonify({'error': 'Invalid file type'})
 
-        os.remove(file_path) # Clean up uploaded file
 
-        return jsonify({
-            'prev_lat': prev_lat,
-            'prev_lng': prev_lng,
-            'next_lat': next_lat,
-            'next_lng': next_lng
-        })
-    return jsonify({'error': 'Invalid file type'})
+@app.route('/calendar/<calendar_id>', methods=['POST'])
+def query_calendar(calendar_id):
+    """Returns location data for a new time from a previously uploaded calendar."""
+    events = calendar_cache.get(calendar_id)
+    if events is None:
+        return jsonify({'error': 'Unknown calendar, please upload it again'}), 404
+    try:
+        selected_datetime = selected_datetime_from_form(request.form)
+    except ValueError:
+        return jsonify({'error': 'Invalid date or time'})
+    return event_locations(calendar_id, events, selected_datetime)
 
 
 @app.route('/recommend', methods=['POST'])
@@ -249,10 +228,11 @@ def recommend():
         prev_lng = request.form.get('start_lng')
         next_lat = request.form.get('end_lat')
         next_lng = request.form.get('end_lng')
+        page = max(request.form.get('page', 1, type=int), 1)
 
-
-        recommendations_list = get_restaurant_recommendations(
-            df, cuisine_preference, spice_level, budget, distance, prev_lat, prev_lng, next_lat, next_lng
+        recommendations_list, total_matches = get_restaurant_recommendations(
+            places_index, cuisine_preference, spice_level, budget, distance, prev_lat, prev_lng, next_lat, next_lng,
+            cuisine_index=cuisine_index, page=page, page_size=RESULTS_PER_PAGE
         )
 
         if recommendations_list:
@@ -261,10 +241,13 @@ def recommend():
         else:
             recommendations_html = "<p>No recommendations found based on your criteria.</p>"
 
-        return render_template('results.html', recommendations=recommendations_html, recommendations_data=recommendations_list)
+        # The other form fields are re-posted by the previous/next page buttons.
+        search_fields = {key: value for key, value in request.form.items() if key != 'page'}
+        return render_template('results.html', recommendations=recommendations_html, recommendations_data=recommendations_list,
+                               search_fields=search_fields, page=page,
+                               has_next_page=page * RESULTS_PER_PAGE < total_matches)
     return render_template('index.html') # Handle GET request to /recommend
 
 
 if __name__ == '__main__':
-    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
     app.run(debug=True, port=8080)
\ No newline at end of file
@@ -0,0 +1,108 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Cosine similarity a place type needs to count as matching the cuisine. It is only an upper
+# bound: CuisineIndex.min_similarity lowers it per query so keyword matches are never dropped.
+MIN_SIMILARITY = 0.5
+# Types that say nothing about the cuisine and would otherwise match every food query.
+GENERIC_TYPES = {"restaurant", "food", "point_of_interest", "establishment", "store", "meal_takeaway", "meal_delivery"}
+
+
+def cuisine_query_text(cuisine_preference):
+    """Turns a cuisine option such as 'Desserts/Bakery' into the text that is embedded."""
+    return cuisine_preference.replace("/", ", ")
+
+
+def is_generic(keyword_types):
+    """True if a cuisine option only names generic types, which semantic matching ignores."""
+    return bool(keyword_types) and GENERIC_TYPES.issuperset(keyword_types)
+
+
+class CuisineIndex:
+    """
+    Semantic cuisine matching over the place-type embeddings of an EmbeddingBundle.
+
+    A place's similarity to a query is that of its best-matching type, mirroring the
+    "any of its types matches" rule of the keyword filter. Because types are shared,
+    a query costs one product with the small type matrix plus a single pass over the
+    place -> type index, and the resulting per-place array is cached per query text.
+    Rows are aligned with a PlacesIndex so the array can be combined with its masks.
+    """
+
+    def __init__(self, bundle, place_ids, encode, ignore_types=GENERIC_TYPES, cache_size=64):
+        """
+        Args:
+            bundle (EmbeddingBundle): Type embeddings and the place -> type index.
+            place_ids (sequence): Place IDs in PlacesIndex row order.
+            encode (callable): Maps a query text to an L2-normalised vector.
+            ignore_types (set): Types that never count as a match.
+        """
+        self.type_vectors = np.asarray(bundle.vectors, dtype=np.float32)
+        self.types = list(bundle.types)
+        self.ignored = np.array([t in ignore_types for t in bundle.types], dtype=bool)
+        self.encode = encode
+
+        bundle_rows = {place_id: i for i, place_id in enumerate(bundle.place_ids)}
+        offsets = [0]
+        rows = []
+        for place_id in place_ids:
+            i = bundle_rows.get(place_id)
+            if i is not None:
+                rows.extend(bundle.place_types(i).tolist())
+            offsets.append(len(rows))
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.size = len(place_ids)
+        self._has_types = np.diff(self.offsets) > 0
+
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def _scores(self, text):
+        """Returns the cached (per-type, per-place) similarity arrays for `text`."""
+        with self._lock:
+            cached = self._cache.get(text)
+            if cached is not None:
+                self._cache.move_to_end(text)
+                return cached
+
+        query = np.asarray(self.encode(text), dtype=np.float32)
+        type_scores = self.type_vectors @ query
+        type_scores[self.ignored] = -1.0
+        scores = np.full(self.size, -1.0, dtype=np.float32)
+        if self.rows.size:
+            scores[self._has_types] = np.maximum.reduceat(type_scores[self.rows], self.offsets[:-1][self._has_types])
+        type_scores.setflags(write=False)
+        scores.setflags(write=False)
+
+        with self._lock:
+            self._cache[text] = (type_scores, scores)
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return type_scores, scores
+
+    def similarity(self, text):
+        """
+        Returns the read-only array of each place's cosine similarity to `text`.
+
+        Places without embedded (non-generic) types get -1.
+        """
+        return self._scores(text)[1]
+
+    def min_similarity(self, text, keyword_types, threshold=MIN_SIMILARITY):
+        """
+        Returns the similarity threshold for `text` that keeps every keyword match.
+
+        This is `threshold`, lowered if need be to the similarity of the least similar
+        non-generic type containing one of `keyword_types` (the substring rule of
+        PlacesIndex.types_mask). Semantic matching can then only add places to those
+        the keyword filter finds, never lose them.
+        """
+        type_scores = self._scores(text)[0]
+        keyword_scores = [
+            type_scores[i] for i, place_type in enumerate(self.types)
+            if not self.ignored[i] and any(keyword in place_type for keyword in keyword_types)
+        ]
+        return min([threshold, *keyword_scores])
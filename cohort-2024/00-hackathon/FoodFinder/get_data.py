@@ -1,14 +1,112 @@
 import requests
+from requests.adapters import HTTPAdapter
 import os
 import json
 import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from place_store import PlaceStore, PLACES_STORE_PATH
 
 API_KEY = os.getenv("GOOGLE_API_KEY")
-ENDPOINT = "https://places.googleapis.com/v1/places:searchNearby"
+# Overridable so the crawler can be pointed at a local stub server.
+ENDPOINT = os.getenv("PLACES_ENDPOINT", "https://places.googleapis.com/v1/places:searchNearby")
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+RESULT_CAP = 20  # Maximum number of places the API returns per request
+METERS_PER_DEGREE = 111111
 
 
-def get_places_in_circle(latitude, longitude, radius, included_types=["restaurant"]):
-    """Fetches places from Google Places API within a specified circle."""
+class TokenBucket:
+    """Thread-safe token bucket limiting requests to `rate` per second with bursts of `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available, then consumes it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class CrawlCheckpoint:
+    """
+    Append-only JSON Lines log of completed grid cells.
+
+    Each line holds one cell and the number of places it returned, and is flushed as
+    soon as the cell completes, so a crashed crawl resumes from the cells already on disk.
+    The places themselves go to a PlaceStore, keeping the crawler's memory flat.
+    The log only describes an unfinished crawl: it is cleared once every cell has
+    been fetched, so the next crawl of the same area fetches again.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.lock = threading.Lock()
+        self.completed = {}  # cell key -> number of places returned
+        if os.path.exists(file_path):
+            with open(file_path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # Partially written last line from an interrupted run
+                    self.completed[self.cell_key(*entry["cell"])] = entry["count"]
+
+    @staticmethod
+    def cell_key(latitude, longitude, radius):
+        return (round(latitude, 7), round(longitude, 7), radius)
+
+    def is_done(self, latitude, longitude, radius):
+        return self.cell_key(latitude, longitude, radius) in self.completed
+
+    def record(self, latitude, longitude, radius, count):
+        """Appends a completed cell to the log and flushes it to disk."""
+        line = json.dumps({"cell": [latitude, longitude, radius], "count": count})
+        with self.lock:
+            with open(self.file_path, 'a') as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.completed[self.cell_key(latitude, longitude, radius)] = count
+
+    def clear(self):
+        """Deletes the log once the crawl has finished."""
+        with self.lock:
+            if os.path.exists(self.file_path):
+                os.remove(self.file_path)
+            self.completed = {}
+
+
+def create_session(pool_size=16):
+    """Creates an HTTP session whose connection pool is shared by all crawler threads."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_places_in_circle(latitude, longitude, radius, included_types=["restaurant"], session=None,
+                         rate_limiter=None, max_retries=0, backoff=1.0, endpoint=None):
+    """
+    Fetches places from Google Places API within a specified circle.
+
+    Connection errors, timeouts and 429/5xx responses are retried up to `max_retries`
+    times with exponential backoff and full jitter; other errors are not retried.
+    """
     params = {
         "includedTypes": included_types,
         "rankPreference": "DISTANCE",
@@ -25,13 +123,21 @@ def get_places_in_circle(latitude, longitude, radius, included_types=["restauran
         "X-Goog-Api-Key": API_KEY,
         "X-Goog-FieldMask": "places.displayName,places.id,places.location,places.types,places.businessStatus,places.currentOpeningHours,places.priceLevel,places.rating,places.userRatingCount,places.formattedAddress,places.photos,places.websiteUri,places.paymentOptions,places.dineIn,places.takeout,places.delivery,places.servesVegetarianFood,places.goodForGroups,places.parkingOptions,places.outdoorSeating",
     }
-    try:
-        response = requests.post(ENDPOINT, headers=headers, data=json.dumps(params))
-        response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching data: {e}")
-        return None
+    http = session if session is not None else requests
+    for attempt in range(max_retries + 1):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        try:
+            response = http.post(endpoint or ENDPOINT, headers=headers, data=json.dumps(params), timeout=30)
+            response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            status = e.response.status_code if e.response is not None else None
+            retryable = status is None or status in RETRY_STATUS_CODES
+            if not retryable or attempt == max_retries:
+                print(f"Error fetching data: {e}")
+                return None
+            time.sleep(random.uniform(0, backoff * 2 ** attempt))
 
 
 def create_grid_circles(center_lat, center_lon, total_radius, grid_radius):
@@ -69,35 +175,209 @@ def create_grid_circles(center_lat, center_lon, total_radius, grid_radius):
     return circles
 
 
-def main(center_lat=53.4609, center_lon=-2.2353, total_radius=2000, grid_radius=500):
-    """Main function to fetch places using a grid of circles."""
-    all_places = []
-    grid_circles = create_grid_circles(
-        center_lat, center_lon, total_radius, grid_radius
-    )
-    print(f"Created {len(grid_circles)} search circles.")
+def _meters_per_degree_lon(center_lat):
+    return METERS_PER_DEGREE * math.cos(math.radians(center_lat))
+
+
+def cell_intersects_circle(center_lat, center_lon, total_radius, lat, lon, half_side):
+    """Checks whether the square cell centred at (lat, lon) overlaps the target search circle."""
+    dy = abs(lat - center_lat) * METERS_PER_DEGREE
+    dx = abs(lon - center_lon) * _meters_per_degree_lon(center_lat)
+    return math.hypot(max(dx - half_side, 0), max(dy - half_side, 0)) <= total_radius
+
+
+def create_quadtree_cells(center_lat, center_lon, total_radius, cell_radius):
+    """
+    Tiles the search circle with square cells, each covered by a circle of `cell_radius`.
+
+    Unlike `create_grid_circles`, cells lying entirely outside the search circle are skipped.
+
+    Returns:
+        list: (lat, lon, radius) tuples.
+    """
+    half_side = cell_radius / math.sqrt(2)  # Half the side of the square inscribed in the circle
+    per_axis = math.ceil(total_radius / half_side)
+    extent = per_axis * half_side
+    m_per_deg_lon = _meters_per_degree_lon(center_lat)
+
+    cells = []
+    for i in range(per_axis):
+        for j in range(per_axis):
+            lat = center_lat + (-extent + (2 * i + 1) * half_side) / METERS_PER_DEGREE
+            lon = center_lon + (-extent + (2 * j + 1) * half_side) / m_per_deg_lon
+            if cell_intersects_circle(center_lat, center_lon, total_radius, lat, lon, half_side):
+                cells.append((lat, lon, cell_radius))
+    return cells
+
 
-    for i, (lat, lon) in enumerate(grid_circles):
-        print(
-            f"Fetching results for grid cell {i+1}/{len(grid_circles)}: ({lat:.4f}, {lon:.4f})"
+def split_cell(center_lat, center_lon, total_radius, lat, lon, radius):
+    """
+    Splits a cell into its four quadrants, dropping those outside the search circle.
+
+    Each quadrant is covered by a circle of half the parent radius.
+    """
+    quarter = radius / math.sqrt(2) / 2  # Half side of a quadrant
+    m_per_deg_lon = _meters_per_degree_lon(center_lat)
+    children = []
+    for sign_lat in (-1, 1):
+        for sign_lon in (-1, 1):
+            child_lat = lat + sign_lat * quarter / METERS_PER_DEGREE
+            child_lon = lon + sign_lon * quarter / m_per_deg_lon
+            if cell_intersects_circle(center_lat, center_lon, total_radius, child_lat, child_lon, quarter):
+                children.append((child_lat, child_lon, radius / 2))
+    return children
+
+
+def _fetch_cells(cells, checkpoint, store, executor, fetch):
+    """
+    Fetches the cells not yet in the checkpoint, streaming their places into the store.
+
+    A cell's places are upserted before the cell is checkpointed, so a crash in between
+    only means the cell is fetched (and harmlessly upserted) again.
+
+    Returns:
+        dict: (lat, lon, radius) -> number of places returned (None for cells that failed), for every cell.
+    """
+    counts = {}
+    futures = {}
+    for lat, lon, radius in cells:
+        key = checkpoint.cell_key(lat, lon, radius)
+        if key in checkpoint.completed:
+            counts[(lat, lon, radius)] = checkpoint.completed[key]
+        else:
+            futures[executor.submit(fetch, lat, lon, radius)] = (lat, lon, radius)
+
+    for i, future in enumerate(as_completed(futures)):
+        lat, lon, radius = futures[future]
+        places_data = future.result()
+        if places_data is None:
+            counts[(lat, lon, radius)] = None
+            continue
+        places = places_data.get("places", [])
+        written = store.upsert_many(places)
+        checkpoint.record(lat, lon, radius, len(places))
+        counts[(lat, lon, radius)] = len(places)
+        print(f"Fetched grid cell {i+1}/{len(futures)}: ({lat:.4f}, {lon:.4f}, r={radius:.0f}m), "
+              f"{written} new or changed places")
+    return counts
+
+
+def crawl(grid_circles, grid_radius, store, checkpoint_path="crawl_checkpoint.jsonl", workers=8, rate=5.0,
+          max_retries=5, backoff=1.0, endpoint=None):
+    """
+    Fetches every grid circle concurrently, upserting the places found into `store`.
+
+    Requests share one connection pool and a token-bucket rate limiter. Each completed
+    cell is appended to the checkpoint file, and cells already in it are skipped,
+    so an interrupted crawl resumes where it left off. Cells that still fail after
+    all retries are not recorded and are fetched again on the next run. Once every
+    cell has been fetched the checkpoint is cleared, so a later crawl starts afresh.
+    """
+    checkpoint = CrawlCheckpoint(checkpoint_path)
+    cells = [(lat, lon, grid_radius) for lat, lon in grid_circles]
+    session = create_session(pool_size=workers)
+    rate_limiter = TokenBucket(rate)
+
+    def fetch(lat, lon, radius):
+        return get_places_in_circle(lat, lon, radius, session=session, rate_limiter=rate_limiter,
+                                    max_retries=max_retries, backoff=backoff, endpoint=endpoint)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        counts = _fetch_cells(cells, checkpoint, store, executor, fetch)
+
+    session.close()
+    if None not in counts.values():
+        checkpoint.clear()
+    return store
+
+
+def crawl_adaptive(center_lat, center_lon, total_radius, store, cell_radius=1000, min_radius=50,
+                   result_cap=RESULT_CAP, checkpoint_path="crawl_checkpoint.jsonl", workers=8, rate=5.0,
+                   max_retries=5, backoff=1.0, endpoint=None):
+    """
+    Crawls the search circle with adaptive quadtree subdivision.
+
+    Starts from square cells of `cell_radius` covering the circle. Any cell whose
+    response hits `result_cap` may have been truncated by the API, so it is split
+    into four quadrants (skipping those outside the circle) and each is queried in
+    turn, down to `min_radius`. Sparse areas are covered by a few large cells and
+    dense areas by many small ones. Each quadtree level is fetched concurrently,
+    streamed into `store` and checkpointed exactly like `crawl`, and the checkpoint
+    is cleared once no cell is left unfetched.
+
+    A cell that still hits `result_cap` at `min_radius` cannot be split further and
+    may be missing places; such cells are reported rather than silently kept.
+
+    Returns:
+        list: The (lat, lon, radius) cells left truncated at `min_radius`; empty if the crawl is complete.
+    """
+    checkpoint = CrawlCheckpoint(checkpoint_path)
+    session = create_session(pool_size=workers)
+    rate_limiter = TokenBucket(rate)
+
+    def fetch(lat, lon, radius):
+        return get_places_in_circle(lat, lon, radius, session=session, rate_limiter=rate_limiter,
+                                    max_retries=max_retries, backoff=backoff, endpoint=endpoint)
+
+    frontier = create_quadtree_cells(center_lat, center_lon, total_radius, cell_radius)
+    level = 0
+    failed = False
+    truncated = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while frontier:
+            print(f"Quadtree level {level}: {len(frontier)} cells of radius {frontier[0][2]:.0f}m.")
+            counts = _fetch_cells(frontier, checkpoint, store, executor, fetch)
+            failed = failed or None in counts.values()
+            next_frontier = []
+            for (lat, lon, radius), count in counts.items():
+                if count is None or count < result_cap:
+                    continue
+                if radius / 2 >= min_radius:
+                    next_frontier.extend(split_cell(center_lat, center_lon, total_radius, lat, lon, radius))
+                else:
+                    truncated.append((lat, lon, radius))
+            frontier = next_frontier
+            level += 1
+
+    session.close()
+    if not failed:
+        checkpoint.clear()
+    if truncated:
+        print(f"Warning: {len(truncated)} cells still returned {result_cap} places at the minimum radius "
+              f"of {min_radius}m and may be missing places:")
+        for lat, lon, radius in truncated:
+            print(f"  ({lat:.6f}, {lon:.6f}, r={radius:.0f}m)")
+    return truncated
+
+
+def main(center_lat=53.4609, center_lon=-2.2353, total_radius=2000, grid_radius=500,
+         checkpoint_path="crawl_checkpoint.jsonl", store_path=PLACES_STORE_PATH, workers=8, rate=5.0,
+         endpoint=None, adaptive=True, min_radius=50):
+    """
+    Main function to fetch places using a grid of circles.
+
+    With `adaptive` the grid starts at `grid_radius` and dense cells are subdivided
+    (see `crawl_adaptive`); otherwise the uniform grid of `create_grid_circles` is used.
+    Places are upserted by ID into the PlaceStore at `store_path` as results arrive,
+    so duplicates across cells and unchanged places from a re-crawl are not written again.
+    """
+    store = PlaceStore(store_path)
+    if adaptive:
+        truncated = crawl_adaptive(center_lat, center_lon, total_radius, store, cell_radius=grid_radius,
+                       min_radius=min_radius, checkpoint_path=checkpoint_path,
+                       workers=workers, rate=rate, endpoint=endpoint)
+        if truncated:
+            print(f"Crawl incomplete: lower min_radius to cover the {len(truncated)} truncated cells.")
+    else:
+        grid_circles = create_grid_circles(
+            center_lat, center_lon, total_radius, grid_radius
         )
-        places_data = get_places_in_circle(lat, lon, grid_radius)
-        if places_data and "places" in places_data:
-            all_places.extend(places_data["places"])
-
-    # Remove duplicate places based on place ID
-    seen_ids = set()
-    unique_places = []
-    for place in all_places:
-        if place["id"] not in seen_ids:
-            seen_ids.add(place["id"])
-            unique_places.append(place)
-    all_places = unique_places
-
-    with open("all_places_response.json", "w") as file:
-        json.dump(all_places, file, indent=4)
-    print(f"Total places found:{len(all_places)}")
-    print("All place results saved to all_places_response.json")
+        print(f"Created {len(grid_circles)} search circles.")
+        crawl(grid_circles, grid_radius, store, checkpoint_path=checkpoint_path, workers=workers,
+              rate=rate, endpoint=endpoint)
+
+    print(f"Total places found:{len(store)}")
+    print(f"All place results saved to {store_path}")
 
 
 if __name__ == "__main__":
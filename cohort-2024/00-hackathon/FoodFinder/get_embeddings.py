@@ -1,22 +1,109 @@
 import json
-import pandas as pd
-from get_pandas import json_to_pandas_row
-from sentence_transformers import SentenceTransformer
-
-def get_embeddings(model, input_json_file_path="all_places_response.json", output_json_file_path="all_places_response_with_embeddings.json"):
-    with open(input_json_file_path, 'r') as f:
-        places = json.load(f)
-
-    if places:
-        # Initialize an empty DataFrame with the first row
-        df = json_to_pandas_row(places[0])
-        
-        # Append remaining rows
-        for place in places[1:]:
-            df = pd.concat([df, json_to_pandas_row(place)], ignore_index=True)
-        df["embeddings"] = df["types"].apply(lambda x: [model.encode(t) for t in x])
-        df.to_json(output_json_file_path, orient='records', lines=True)
+import numpy as np
+from place_store import iter_places, PLACES_STORE_PATH
+
+EMBEDDINGS_PATH = "type_embeddings"  # Writes type_embeddings.npy and type_embeddings.json
+
+
+def type_text(place_type):
+    """Turns a place type such as 'italian_restaurant' into the text that is embedded."""
+    return place_type.replace("_", " ")
+
+
+class EmbeddingBundle:
+    """
+    Sentence embeddings of place types, shared by all places.
+
+    `vectors` is a float32 matrix with one L2-normalised row per distinct type. The
+    types of place `i` are rows `rows[offsets[i]:offsets[i+1]]` (a CSR-style index),
+    so each type string is stored and encoded once however many places share it.
+    """
+
+    def __init__(self, vectors, types, place_ids, offsets, rows):
+        self.vectors = vectors
+        self.types = types
+        self.place_ids = place_ids
+        self.offsets = offsets
+        self.rows = rows
+
+    def place_types(self, i):
+        """Returns the type rows of place `i`."""
+        return self.rows[self.offsets[i]:self.offsets[i + 1]]
+
+    def place_vectors(self):
+        """
+        Returns one L2-normalised float32 vector per place: the mean of its type embeddings.
+
+        Places without types get a zero vector.
+        """
+        counts = np.diff(self.offsets)
+        sums = np.zeros((len(self.place_ids), self.vectors.shape[1]), dtype=np.float32)
+        has_types = counts > 0
+        if self.rows.size:
+            sums[has_types] = np.add.reduceat(self.vectors[self.rows], self.offsets[:-1][has_types], axis=0)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        return np.divide(sums, norms, out=np.zeros_like(sums), where=norms > 0)
+
+    def save(self, path=EMBEDDINGS_PATH):
+        np.save(f"{path}.npy", np.ascontiguousarray(self.vectors, dtype=np.float32))
+        with open(f"{path}.json", 'w') as f:
+            json.dump({
+                "types": self.types,
+                "place_ids": self.place_ids,
+                "offsets": self.offsets.tolist(),
+                "rows": self.rows.tolist(),
+            }, f)
+
+    @classmethod
+    def load(cls, path=EMBEDDINGS_PATH, mmap=True):
+        """Loads a bundle; with `mmap` the embedding matrix is memory-mapped rather than read."""
+        vectors = np.load(f"{path}.npy", mmap_mode='r' if mmap else None)
+        with open(f"{path}.json", 'r') as f:
+            index = json.load(f)
+        return cls(vectors, index["types"], index["place_ids"],
+                   np.asarray(index["offsets"], dtype=np.int64), np.asarray(index["rows"], dtype=np.int64))
+
+
+def encode_texts(model, texts, batch_size=256):
+    """
+    Encodes texts in large batches into an L2-normalised float32 matrix.
+
+    No texts give a (0, dim) matrix: `model.encode([])` returns an array without a
+    second axis, which `EmbeddingBundle.place_vectors` could not size its output from.
+    """
+    if not texts:
+        return np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+    vectors = model.encode(texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True,
+                           show_progress_bar=len(texts) > batch_size)
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def get_embeddings(model, input_json_file_path=PLACES_STORE_PATH, output_path=EMBEDDINGS_PATH, batch_size=256):
+    """
+    Embeds the types of every place, encoding each distinct type string once.
+
+    Returns:
+        EmbeddingBundle: The saved bundle.
+    """
+    type_rows = {}
+    place_ids = []
+    offsets = [0]
+    rows = []
+    for place in iter_places(input_json_file_path):
+        place_ids.append(place.get("id"))
+        for place_type in place.get("types", []):
+            rows.append(type_rows.setdefault(place_type, len(type_rows)))
+        offsets.append(len(rows))
+
+    types = list(type_rows)
+    print(f"Encoding {len(types)} distinct types for {len(place_ids)} places.")
+    vectors = encode_texts(model, [type_text(t) for t in types], batch_size=batch_size)
+    bundle = EmbeddingBundle(vectors, types, place_ids, np.asarray(offsets, dtype=np.int64), np.asarray(rows, dtype=np.int64))
+    bundle.save(output_path)
+    print(f"Embeddings saved to {output_path}.npy and {output_path}.json")
+    return bundle
 
 if __name__ == "__main__":
+    from sentence_transformers import SentenceTransformer
     model = SentenceTransformer("all-MiniLM-L6-v2")
-    get_embeddings(model)
\ No newline at end of file
+    get_embeddings(model)
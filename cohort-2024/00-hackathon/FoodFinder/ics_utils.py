@@ -1,12 +1,87 @@
 from icalendar import Calendar, Event
+from dateutil.rrule import rrulestr
+from collections import OrderedDict
 from datetime import datetime, timedelta
+import bisect
+import hashlib
+import heapq
+import io
+import itertools
+import threading
 import pytz
-import re
+from zoneinfo import ZoneInfo
+from location_resolver import coordinates_from_text
+
+def iter_ics_events(lines):
+    """
+    Streams the VEVENT components of a calendar one at a time.
+
+    Only the lines of the event being read are held in memory, so the size of the
+    calendar does not matter. Events that fail to parse are reported and skipped.
+
+    Args:
+        lines (iterable): Lines of the ICS file, as str or bytes (e.g. an open file).
+
+    Yields:
+        icalendar.Event: Each event, in file order.
+    """
+    block = None
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.rstrip('\r\n')
+        if line == 'BEGIN:VEVENT':
+            block = [line]
+        elif block is not None:
+            block.append(line)  # Folded continuation lines are unfolded by from_ical
+            if line == 'END:VEVENT':
+                try:
+                    yield Event.from_ical('\r\n'.join(block) + '\r\n')
+                except ValueError as e:
+                    print(f"Skipping unparsable event: {e}")
+                block = None
+
+
+def event_from_component(component):
+    """
+    Converts a VEVENT component into an event dictionary.
+
+    Returns:
+        dict: summary, start, end, description and location, plus the RRULE text and
+        EXDATE values of recurring events (None and [] otherwise), the UID, and the
+        RECURRENCE-ID of an event overriding one occurrence of a series (None otherwise).
+    """
+    start = component.get('DTSTART').dt
+    if component.get('DTEND') is not None:
+        end = component.get('DTEND').dt
+    elif component.get('DURATION') is not None:
+        end = start + component.get('DURATION').dt
+    else:
+        end = start
+    rrule = component.get('RRULE')
+    exdates = component.get('EXDATE') or []
+    if not isinstance(exdates, list):
+        exdates = [exdates]
+    recurrence_id = component.get('RECURRENCE-ID')
+    return {
+        'summary': str(component.get('SUMMARY')),
+        'start': start,
+        'end': end,
+        'description': str(component.get('DESCRIPTION')),
+        'location': str(component.get('LOCATION')),
+        'rrule': rrule.to_ical().decode() if rrule is not None else None,
+        'exdates': [exdate.dt for exdates_line in exdates for exdate in exdates_line.dts],
+        'uid': str(component.get('UID')),
+        'recurrence_id': recurrence_id.dt if recurrence_id is not None else None,
+    }
+
 
 def parse_ics(file_path):
     """
     Parse the ICS file and return a list of events with their start and end times.
 
+    The file is streamed event by event (see `iter_ics_events`).
+
     Args:
         file_path (str): Path to the ICS file.
 
@@ -15,69 +90,320 @@ def parse_ics(file_path):
     """
     try:
         with open(file_path, 'r') as f:
-            calendar = Calendar.from_ical(f.read())
+            return [event_from_component(component) for component in iter_ics_events(f)]
     except ValueError as e:
         print(f"Error parsing ICS file: {e}")
         return []
 
-    events = []
-    for component in calendar.walk():
-        if component.name == "VEVENT":
-            event = {
-                'summary': str(component.get('SUMMARY')),
-                'start': component.get('DTSTART').dt,
-                'end': component.get('DTEND').dt,
-                'description': str(component.get('DESCRIPTION')),
-                'location': str(component.get('LOCATION'))
-            }
-            events.append(event)
-    return events
+
+def as_utc(value):
+    """Converts an event time to an aware UTC datetime; dates and floating times are taken as UTC."""
+    if not isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day, tzinfo=pytz.utc)
+    if value.tzinfo is None:
+        return pytz.utc.localize(value)
+    return value.astimezone(pytz.utc)
+
+
+def rule_start(value):
+    """
+    Returns the DTSTART to expand a recurrence from.
+
+    Zoned times stay in their own zone, so occurrences keep their wall-clock time
+    across DST changes; pytz zones are swapped for zoneinfo, whose offset follows
+    each occurrence. Dates and floating times are taken as UTC, like `as_utc`.
+    """
+    if not isinstance(value, datetime) or value.tzinfo is None:
+        return as_utc(value)
+    zone = getattr(value.tzinfo, 'zone', None)  # A localized pytz time carries one fixed offset
+    if zone is not None:
+        return value.replace(tzinfo=ZoneInfo(zone))
+    return value
+
+
+MAX_CACHED_OCCURRENCES = 100000  # Per series; beyond this, lookups fall back to dateutil's own search
+
+
+class OccurrenceCache:
+    """
+    The UTC start times of a recurrence rule, generated lazily and kept for bisection.
+
+    dateutil's `before`, `after` and `xafter` generate a rule from DTSTART on every
+    call, so each lookup in a years-old series walks the whole series again. Here the
+    rule is iterated once, only as far as the latest time asked about, and every
+    lookup bisects the starts generated so far. A lookup past that point only
+    generates the occurrences in between. Safe to share between threads.
+    """
+
+    def __init__(self, rule, max_size=MAX_CACHED_OCCURRENCES):
+        self.rule = rule
+        self.starts = []  # UTC starts generated so far, in order
+        self._iterator = iter(rule)
+        self._exhausted = False
+        self._max_size = max_size
+        self._lock = threading.Lock()
+
+    def _expand(self, done):
+        """
+        Generates occurrences until `done()` holds or the rule ends. Call with the lock held.
+
+        Returns:
+            bool: False if the cache filled up first, True otherwise.
+        """
+        while not (self._exhausted or done()):
+            if len(self.starts) >= self._max_size:
+                return False
+            occurrence = next(self._iterator, None)
+            if occurrence is None:
+                self._exhausted = True
+            else:
+                self.starts.append(as_utc(occurrence))
+        return True
+
+    def _expand_past(self, time):
+        return self._expand(lambda: self.starts and self.starts[-1] > time)
+
+    def before(self, time):
+        """Returns the last start at or before `time`, or None."""
+        with self._lock:
+            if self._expand_past(time):
+                i = bisect.bisect_right(self.starts, time)
+                return self.starts[i - 1] if i else None
+        before = self.rule.before(time, inc=True)
+        return as_utc(before) if before is not None else None
+
+    def after(self, time):
+        """Returns the first start after `time`, or None."""
+        with self._lock:
+            if self._expand_past(time):
+                i = bisect.bisect_right(self.starts, time)
+                return self.starts[i] if i < len(self.starts) else None
+        after = self.rule.after(time)
+        return as_utc(after) if after is not None else None
+
+    def xafter(self, time):
+        """Lazily yields the starts at or after `time`, in order."""
+        with self._lock:
+            if not self._expand_past(time):
+                i = None
+            else:
+                i = bisect.bisect_left(self.starts, time)
+        if i is None:
+            for occurrence in self.rule.xafter(time, inc=True):
+                yield as_utc(occurrence)
+            return
+        while True:
+            with self._lock:
+                if not self._expand(lambda: len(self.starts) > i):
+                    break
+                if i == len(self.starts):
+                    return  # The rule has ended
+                start = self.starts[i]
+            yield start
+            i += 1
+        # The cache is full: continue with dateutil from the last cached start.
+        for occurrence in self.rule.xafter(self.starts[i - 1]):
+            yield as_utc(occurrence)
+
+
+class EventIndex:
+    """
+    Events sorted by start time for O(log n) lookups around a given time.
+
+    One-off events are sorted once and searched with `bisect`. Recurring events are
+    kept as rules whose occurrences are generated on demand (see OccurrenceCache):
+    a series is expanded once, up to the latest time asked about, and later lookups
+    bisect it instead of walking it from DTSTART again. Rules are expanded in the
+    event's own time zone and each occurrence is converted to UTC. An event with a
+    RECURRENCE-ID replaces that occurrence of its series.
+
+    With a LocationResolver, every event's coordinates are resolved once while
+    indexing and stored as its `lat` and `lng`.
+    """
+
+    def __init__(self, events, resolver=None):
+        """
+        Args:
+            events (iterable): Event dictionaries as returned by `event_from_component`.
+            resolver (LocationResolver): Optional resolver of event coordinates.
+        """
+        single = []
+        masters = []
+        overridden = {}  # UID -> RECURRENCE-IDs of the occurrences replaced by their own event
+        resolve = resolver.for_upload() if resolver is not None else None
+        for event in events:
+            if resolve is not None:
+                event['lat'], event['lng'] = resolve(event['description'], event['location'])
+            if event.get('recurrence_id') is not None:
+                overridden.setdefault(event.get('uid'), []).append(event['recurrence_id'])
+            if event.get('rrule'):
+                masters.append(event)
+            else:
+                single.append(event)
+        self.recurring = []  # (event, OccurrenceCache, duration)
+        for event in masters:
+            rule = self._recurrence_rule(event, overridden.get(event.get('uid'), []))
+            if rule is None:
+                single.append(event)
+            else:
+                self.recurring.append((event, OccurrenceCache(rule), as_utc(event['end']) - as_utc(event['start'])))
+        single.sort(key=lambda event: as_utc(event['start']))
+        self.events = single
+        self.starts = [as_utc(event['start']) for event in single]
+
+    @classmethod
+    def from_lines(cls, lines, resolver=None):
+        """Builds the index straight from the lines of an ICS file, streaming its events."""
+        return cls((event_from_component(component) for component in iter_ics_events(lines)), resolver)
+
+    @staticmethod
+    def _recurrence_rule(event, overridden=()):
+        dtstart = rule_start(event['start'])
+        try:
+            rule = rrulestr(event['rrule'], dtstart=dtstart, forceset=True)
+        except (ValueError, TypeError) as e:
+            print(f"Ignoring invalid RRULE of '{event['summary']}': {e}")
+            return None
+        # Aware datetimes compare by instant, so excluded times may be in any zone.
+        for exdate in itertools.chain(event.get('exdates', []), overridden):
+            rule.exdate(as_utc(exdate))
+        return rule
+
+    def __len__(self):
+        return len(self.events) + len(self.recurring)
+
+    @staticmethod
+    def _occurrence(event, start, duration):
+        start = as_utc(start)
+        return {**event, 'start': start, 'end': start + duration}
+
+    def previous_and_next(self, current_time):
+        """
+        Returns the last event starting at or before `current_time` and the first starting after it.
+
+        Occurrences of recurring events are returned as copies with their own start and end.
+        """
+        current = as_utc(current_time)
+        i = bisect.bisect_right(self.starts, current)
+        previous_event = self.events[i - 1] if i else None
+        next_event = self.events[i] if i < len(self.events) else None
+        previous_start = self.starts[i - 1] if previous_event else None
+        next_start = self.starts[i] if next_event else None
+
+        for event, occurrences, duration in self.recurring:
+            before = occurrences.before(current)
+            if before is not None and (previous_start is None or before >= previous_start):
+                previous_event = self._occurrence(event, before, duration)
+                previous_start = before
+            after = occurrences.after(current)
+            if after is not None and (next_start is None or after < next_start):
+                next_event = self._occurrence(event, after, duration)
+                next_start = after
+        return previous_event, next_event
+
+    def events_between(self, start, end):
+        """
+        Lazily yields the events starting in [start, end), in start order.
+
+        Recurring events are expanded only within the window.
+        """
+        start, end = as_utc(start), as_utc(end)
+        lo = bisect.bisect_left(self.starts, start)
+        hi = bisect.bisect_left(self.starts, end)
+        streams = [zip(self.starts[lo:hi], self.events[lo:hi])]
+        for event, occurrences, duration in self.recurring:
+            streams.append(self._occurrences_between(event, occurrences, duration, start, end))
+        for _, event in heapq.merge(*streams, key=lambda item: item[0]):
+            yield event
+
+    @classmethod
+    def _occurrences_between(cls, event, occurrences, duration, start, end):
+        """Yields (UTC start, occurrence) for the occurrences of a series starting in [start, end)."""
+        for occurrence_start in occurrences.xafter(start):
+            if occurrence_start >= end:
+                return
+            yield occurrence_start, cls._occurrence(event, occurrence_start, duration)
+
+
+class CalendarCache:
+    """
+    Parsed calendars kept in memory, keyed by the SHA-256 of their content, with LRU eviction.
+
+    Re-uploading the same file, or asking about another time with its calendar ID,
+    reuses the EventIndex instead of parsing the calendar again.
+    """
+
+    def __init__(self, max_size=128, resolver=None):
+        self._calendars = OrderedDict()
+        self._resolver = resolver
+        self._max_size = max_size
+        self._lock = threading.Lock()
+
+    def get(self, calendar_id):
+        """Returns the cached EventIndex of a calendar, or None if it is unknown or was evicted."""
+        with self._lock:
+            events = self._calendars.get(calendar_id)
+            if events is not None:
+                self._calendars.move_to_end(calendar_id)
+            return events
+
+    def add(self, data):
+        """
+        Parses a calendar from its raw bytes unless it is already cached.
+
+        Returns:
+            tuple: The calendar ID (content hash) and its EventIndex.
+        """
+        calendar_id = hashlib.sha256(data).hexdigest()
+        events = self.get(calendar_id)
+        if events is None:
+            events = EventIndex.from_lines(io.BytesIO(data), self._resolver)
+            with self._lock:
+                self._calendars[calendar_id] = events
+                if len(self._calendars) > self._max_size:
+                    self._calendars.popitem(last=False)
+        return calendar_id, events
+
 
 def get_previous_and_next_events(events, current_time):
     """
     Get the previous and next events based on the current time.
 
     Args:
-        events (list): List of events with their start and end times.
+        events (EventIndex or list): Indexed events, or a list of events to index.
         current_time (datetime): The current time.
 
     Returns:
         tuple: Previous event and next event.
     """
-    previous_event = None
-    next_event = None
-    for event in sorted(events, key=lambda x: x['start']):
-        if event['start'] <= current_time:
-            previous_event = event
-        elif event['start'] > current_time and next_event is None:
-            next_event = event
-            break
-
-    return previous_event, next_event
+    if not isinstance(events, EventIndex):
+        events = EventIndex(events)
+    return events.previous_and_next(current_time)
 
 def extract_lat_lng_from_description(description):
     """
-    Extract latitude and longitude from the Google Map link in the event description.
+    Extract latitude and longitude from the map link in the event description.
 
     Args:
-        description (str): The event description containing the Google Map link.
+        description (str): The event description containing a map link (see `MAP_LINK_PATTERNS`).
 
     Returns:
         tuple: Latitude and longitude as floats.
     """
-    match = re.search(r'https://www\.google\.com/maps/search/\?api=1&query=([\d\.\-]+),([\d\.\-]+)', description)
-    if match:
-        lat = float(match.group(1))
-        lng = float(match.group(2))
-        return lat, lng
-    return None, None
+    return coordinates_from_text(description)
+
+def event_lat_lng(event):
+    """Returns the coordinates resolved while indexing, or those of the description's map link."""
+    if 'lat' in event:
+        return event['lat'], event['lng']
+    return extract_lat_lng_from_description(event['description'])
 
 def get_lat_lng_from_events(events, current_time):
     """
     Get the latitude and longitude of the previous and next events based on the current time.
 
     Args:
-        events (list): List of events with their start and end times.
+        events (EventIndex or list): Indexed events, or a list of events to index.
         current_time (datetime): The current time.
 
     Returns:
@@ -85,8 +411,8 @@ def get_lat_lng_from_events(events, current_time):
     """
     previous_event, next_event = get_previous_and_next_events(events, current_time)
     next_start = next_event['start'] if next_event else None
-    prev_lat, prev_lng = extract_lat_lng_from_description(previous_event['description']) if previous_event else (None, None)
-    next_lat, next_lng = extract_lat_lng_from_description(next_event['description']) if next_event else (None, None)
+    prev_lat, prev_lng = event_lat_lng(previous_event) if previous_event else (None, None)
+    next_lat, next_lng = event_lat_lng(next_event) if next_event else (None, None)
 
     return (prev_lat, prev_lng), (next_lat, next_lng), next_start
 
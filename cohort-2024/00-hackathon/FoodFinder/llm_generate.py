@@ -1,43 +1,90 @@
-import google.generativeai as genai
+import asyncio
+import hashlib
 import json
 import time
 import os
-from tqdm import trange
+from tqdm import tqdm
+from place_store import PlaceStore, iter_places, PLACES_STORE_PATH, ATTRIBUTES_STORE_PATH
 API_KEY = os.getenv("GEMINI_API_KEY")
-genai.configure(api_key=API_KEY) # Replace with your actual API key
-def analyze_restaurants(restaurant_batch):
-    """Analyzes a batch of restaurant data using the LLM to get spicy and price levels."""
-    
-    model = genai.GenerativeModel("gemini-2.0-flash-exp")
-    batch_prompts = []
-    
-    for i, restaurant_data in enumerate(restaurant_batch):
-        restaurant_name = restaurant_data.get("displayName", {}).get("text", "N/A")
-        food_types = ", ".join(restaurant_data.get("types", []))
-        additional_details = restaurant_data.get("formattedAddress", "") + ", " + ", ".join(restaurant_data.get("weekdayDescriptions", ""))
+RESPONSE_CACHE_PATH = "llm_response_cache.jsonl"
+LEGACY_ATTRIBUTES_PATH = "processed_places_response.json"
 
-        batch_prompts.append(f"Restaurant {i+1}:\nRestaurant Name: {restaurant_name}\nFood Types: {food_types}\nAdditional Details: {additional_details}")
 
-    user_prompt = "\n\n".join(batch_prompts)  # Combine all restaurant prompts
+class GeminiClient:
+    """Model client sending prompts to Gemini. Any object with the same `generate` method can replace it."""
 
-    full_prompt = f"{system_prompt}\n\n{user_prompt}"
+    def __init__(self, model_name="gemini-2.0-flash-exp", api_key=API_KEY):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key) # Replace with your actual API key
+        self.genai = genai
+        self.model = genai.GenerativeModel(model_name)
 
-    try:
-        result = model.generate_content(
-            full_prompt,
-             generation_config=genai.GenerationConfig(
+    def generate(self, prompt):
+        """Returns the model's JSON response text for `prompt`."""
+        result = self.model.generate_content(
+            prompt,
+             generation_config=self.genai.GenerationConfig(
                  response_mime_type="application/json"
                 )
         )
-        if result.text:
-            try:
-              return json.loads(result.text)
-            except json.JSONDecodeError:
-              print(f"Error decoding JSON: {result.text}")
-              return [{}] * len(restaurant_batch)
-        else:
-            return [{}] * len(restaurant_batch)
-        
+        return result.text
+
+
+def prompt_fields(restaurant_data):
+    """The fields of a place that are sent to the model; enrichment depends on nothing else."""
+    return {
+        "name": restaurant_data.get("displayName", {}).get("text", "N/A"),
+        "types": restaurant_data.get("types", []),
+        "address": restaurant_data.get("formattedAddress", ""),
+        "price": restaurant_data.get("priceLevel"),
+    }
+
+
+def place_input_hash(restaurant_data):
+    """Hashes the prompt fields of a place, so enrichment is redone only when they change."""
+    return hashlib.sha256(json.dumps(prompt_fields(restaurant_data), sort_keys=True).encode()).hexdigest()
+
+
+def restaurant_prompt(restaurant_data):
+    """Describes one restaurant for the prompt, without its position in the batch."""
+    fields = prompt_fields(restaurant_data)
+    prompt = f"Restaurant Name: {fields['name']}\nFood Types: {', '.join(fields['types'])}\nAdditional Details: {fields['address']}"
+    if fields["price"]:
+        prompt += f"\nGoogle Price Level: {fields['price']}"
+    return prompt
+
+
+# Identical prompt fields get identical answers, so the response cache shares the input hash.
+restaurant_cache_key = place_input_hash
+
+
+def request_batch(restaurant_batch, client):
+    """
+    Sends one batch of restaurants to the model.
+
+    Raises:
+        ValueError: If the response is not a JSON list with one object per restaurant.
+        Exception: Whatever the client raises for API errors.
+    """
+    batch_prompts = [f"Restaurant {i+1}:\n{restaurant_prompt(restaurant_data)}" for i, restaurant_data in enumerate(restaurant_batch)]
+    user_prompt = "\n\n".join(batch_prompts)  # Combine all restaurant prompts
+
+    full_prompt = f"{system_prompt}\n\n{user_prompt}"
+
+    text = client.generate(full_prompt)
+    results = json.loads(text) if text else None
+    if not isinstance(results, list) or len(results) != len(restaurant_batch):
+        raise ValueError(f"Expected a list of {len(restaurant_batch)} results, got: {text}")
+    return [result if isinstance(result, dict) else {} for result in results]
+
+
+def analyze_restaurants(restaurant_batch, client=None):
+    """Analyzes a batch of restaurant data using the LLM to get spicy and price levels."""
+    try:
+        return request_batch(restaurant_batch, client or GeminiClient())
+    except json.JSONDecodeError as e:
+        print(f"Error decoding JSON: {e}")
+        return [{}] * len(restaurant_batch)
     except Exception as e:
         print(f"Error in API call: {e}")
         return [{}] * len(restaurant_batch)  # Handle API call error
@@ -68,44 +115,168 @@ Example output:
 ]
 """
 
-def process_restaurant_data(places):
-    """Processes restaurant data in batches of 10 and saves results."""
-    processed_data = []
-    
-    for i in trange(0, len(places), 50):
-        batch = places[i:i+50]
-        spicy_price_data_list = analyze_restaurants(batch)
-        
-        for place, spicy_price_data in zip(batch, spicy_price_data_list):
-            processed_data.append({"id": place.get("id"), **spicy_price_data})
 
-        time.sleep(10)  # Avoid rate limiting
+class AdaptiveRateLimiter:
+    """
+    Spaces out request starts, adapting the gap to the API's behaviour.
+
+    The gap doubles (up to `max_interval`) after every failed request and shrinks
+    gradually after successes, so the pipeline runs as fast as the API tolerates
+    instead of sleeping a fixed time between batches.
+    """
 
+    def __init__(self, min_interval=0.0, max_interval=60.0, initial_interval=0.0):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = initial_interval
+        self.next_start = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_start - now
+            self.next_start = max(now, self.next_start) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def on_success(self):
+        self.interval = self.interval * 0.8
+        if self.interval < max(self.min_interval, 0.01):
+            self.interval = self.min_interval
+
+    def on_error(self):
+        self.interval = min(self.max_interval, max(self.interval * 2, 1.0))
+        # Hold back the next start too, so the retry that follows waits for the new gap.
+        self.next_start = max(self.next_start, time.monotonic() + self.interval)
+
+
+async def enrich_places(places, client, cache, batch_size=50, concurrency=4, max_retries=3, rate_limiter=None):
+    """
+    Enriches places with LLM-extracted attributes using bounded concurrency.
+
+    Places whose prompt content is already in `cache` are never re-sent, and places with
+    identical content share one request. Up to `concurrency` batches are in flight at
+    once, spaced by an adaptive rate limiter. Each batch is written to the cache as soon
+    as it completes, so an interrupted run loses at most the batches still in flight.
+    Batches that keep failing are left out of the cache and retried on the next run.
+
+    Args:
+        places (list): Places to enrich.
+        client: Model client with a `generate(prompt) -> str` method.
+        cache (PlaceStore): Response cache keyed by `restaurant_cache_key`.
+
+    Returns:
+        list: {"id": ..., **attributes} per place, in input order ({"id": ...} only if enrichment failed).
+    """
+    rate_limiter = rate_limiter or AdaptiveRateLimiter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    keys = [restaurant_cache_key(place) for place in places]
+    to_send = {}
+    for key, place in zip(keys, places):
+        if key not in cache and key not in to_send:
+            to_send[key] = place
+    pending = list(to_send.items())
+    batches = [pending[i:i+batch_size] for i in range(0, len(pending), batch_size)]
+    print(f"{len(places) - len(pending)} places answered from cache, {len(pending)} to send in {len(batches)} batches.")
+
+    async def run_batch(batch):
+        async with semaphore:
+            for attempt in range(max_retries + 1):
+                await rate_limiter.wait()
+                try:
+                    results = await asyncio.to_thread(request_batch, [place for _, place in batch], client)
+                except Exception as e:
+                    rate_limiter.on_error()
+                    print(f"Batch failed (attempt {attempt+1}/{max_retries+1}): {e}")
+                    continue
+                rate_limiter.on_success()
+                await asyncio.to_thread(cache.upsert_many, [
+                    {"key": key, **result} for (key, _), result in zip(batch, results) if result
+                ])
+                return
+
+    progress = tqdm(total=len(batches))
+    for task in asyncio.as_completed([run_batch(batch) for batch in batches]):
+        await task
+        progress.update(1)
+    progress.close()
+
+    answers = cache.get_many(set(keys))  # One pass over the cache rather than one open per place
+    processed_data = []
+    for key, place in zip(keys, places):
+        attributes = {name: value for name, value in answers.get(key, {}).items() if name != "key"}
+        processed_data.append({"id": place.get("id"), **attributes})
     return processed_data
 
-json_file_path = "all_places_response.json"  # Replace with your actual path
-output_json_file_path = "processed_places_response.json"
 
-with open(json_file_path, "r") as f:
-    places = json.load(f)
-if os.path.exists(output_json_file_path):
-    with open(output_json_file_path, "r") as f:
-        existing_data = json.load(f)
-    existing_ids = {item['id']: item for item in existing_data if item.get('spicy_level')}
-    places = [place for place in places if place.get('id') not in existing_ids]
+def process_restaurant_data(places, client=None, cache_path=RESPONSE_CACHE_PATH, batch_size=50, concurrency=4):
+    """Processes restaurant data in concurrent batches of 50, caching every response."""
+    cache = PlaceStore(cache_path, key="key")
+    return asyncio.run(enrich_places(places, client or GeminiClient(), cache,
+                                     batch_size=batch_size, concurrency=concurrency))
+
+
+def select_places_to_enrich(places, attributes):
+    """
+    Returns the places that are new or whose prompt fields changed since they were enriched.
+
+    Records imported from the legacy output carry no input hash; like the previous
+    "has a spicy_level" check, they are treated as up to date and stamped with the
+    current hash of their place.
+    """
+    known_hashes = {}
+    legacy = {}
+    for record in attributes:
+        if record.get("input_hash"):
+            known_hashes[record["id"]] = record["input_hash"]
+        elif record.get("spicy_level"):
+            legacy[record["id"]] = record
+
+    to_enrich = []
+    stamped = []
+    for place in places:
+        input_hash = place_input_hash(place)
+        if known_hashes.get(place.get("id")) == input_hash:
+            continue
+        if place.get("id") in legacy:
+            stamped.append({**legacy[place["id"]], "input_hash": input_hash})
+            continue
+        to_enrich.append(place)
+    if stamped:
+        attributes.upsert_many(stamped)
+    return to_enrich
+
+
+def main(json_file_path=PLACES_STORE_PATH, attributes_path=ATTRIBUTES_STORE_PATH, client=None):
+    """
+    Enriches new or changed operational places and upserts the results into the attribute store.
+
+    Only places whose prompt fields changed are sent, and only their records are appended,
+    so a refresh costs time proportional to the size of the change.
+    """
+    attributes = PlaceStore(attributes_path)
+    if not len(attributes) and os.path.exists(LEGACY_ATTRIBUTES_PATH):
+        with open(LEGACY_ATTRIBUTES_PATH, "r") as f:
+            attributes.upsert_many(json.load(f))
+        print(f"Imported {len(attributes)} records from {LEGACY_ATTRIBUTES_PATH}")
+
+    places = (place for place in iter_places(json_file_path) if place.get("businessStatus") == "OPERATIONAL")
+    places = select_places_to_enrich(places, attributes)
     if not places:
         print("All places already processed.")
-        exit()
-
-places = [place for place in places if place.get("businessStatus") == "OPERATIONAL"]
-
-if places:
-    processed_places = process_restaurant_data(places)
-    if os.path.exists(output_json_file_path):
-        non_empty_existing_data = [place for place in existing_data if place.get('spicy_level')]
-        processed_places = non_empty_existing_data + processed_places
-    with open(output_json_file_path, "w") as outfile:
-        json.dump(processed_places, outfile, indent=4)
-    print(f"Processed data saved to {output_json_file_path}")
-else:
-    print("The JSON list is empty.")
\ No newline at end of file
+        return
+
+    print(f"{len(places)} new or changed places to enrich.")
+    processed_places = process_restaurant_data(places, client)
+    written = attributes.upsert_many(
+        {**item, "input_hash": place_input_hash(place)}
+        for item, place in zip(processed_places, places)
+        if item.get("spicy_level")  # Failed places stay out of the store and are retried next run
+    )
+    print(f"Upserted {written} records into {attributes_path}")
+
+
+if __name__ == "__main__":
+    main()
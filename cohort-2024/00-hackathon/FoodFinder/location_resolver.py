@@ -0,0 +1,188 @@
+import os
+import re
+import threading
+from urllib.parse import urlparse
+import requests
+from get_data import TokenBucket
+from place_store import PlaceStore
+
+GEOCODE_CACHE_PATH = "geocode_cache.jsonl"
+# Geocoding is off unless an endpoint is configured, e.g. https://nominatim.openstreetmap.org/search
+GEOCODER_ENDPOINT = os.getenv("GEOCODER_ENDPOINT")
+GEOCODER_RATE = 1.0  # Requests per second per host; Nominatim's usage policy allows one
+# Uploads are geocoded while the user waits, so each may send at most this many uncached locations.
+MAX_GEOCODES_PER_UPLOAD = 5
+
+_NUMBER = r"(-?\d{1,3}(?:\.\d+)?)"
+_SEPARATOR = r"\s*(?:,|\\,|%2C)\s*"
+# Map-link formats, tried in order; each captures latitude then longitude.
+MAP_LINK_PATTERNS = [
+    re.compile(r"google\.[a-z.]+/maps/search/\?api=1&query=" + _NUMBER + _SEPARATOR + _NUMBER, re.IGNORECASE),  # Google Maps search API
+    re.compile(r"google\.[a-z.]+/maps[^\s)\]]*?@" + _NUMBER + _SEPARATOR + _NUMBER, re.IGNORECASE),  # Google Maps place/view
+    re.compile(r"[?&](?:q|ll|query|daddr|destination)=" + _NUMBER + _SEPARATOR + _NUMBER, re.IGNORECASE),  # Google/Apple Maps query
+    re.compile(r"[?&]mlat=" + _NUMBER + r"&mlon=" + _NUMBER, re.IGNORECASE),  # OpenStreetMap marker
+    re.compile(r"openstreetmap\.org/[^\s#]*#map=\d+/" + _NUMBER + r"/" + _NUMBER, re.IGNORECASE),  # OpenStreetMap view
+    re.compile(r"\bgeo:" + _NUMBER + _SEPARATOR + _NUMBER, re.IGNORECASE),  # geo: URI
+]
+# A LOCATION field that is just "lat, lng".
+COORDINATES_PATTERN = re.compile(r"^\s*" + _NUMBER + _SEPARATOR + _NUMBER + r"\s*$")
+
+
+def valid_coordinates(lat, lng):
+    return -90 <= lat <= 90 and -180 <= lng <= 180
+
+
+def coordinates_from_text(text, patterns=MAP_LINK_PATTERNS):
+    """
+    Finds the first map-link coordinates in a text.
+
+    Returns:
+        tuple: Latitude and longitude as floats, or (None, None).
+    """
+    if not text:
+        return None, None
+    for pattern in patterns:
+        for match in pattern.finditer(text):
+            lat, lng = float(match.group(1)), float(match.group(2))
+            if valid_coordinates(lat, lng):
+                return lat, lng
+    return None, None
+
+
+_host_rate_limiters = {}
+_host_rate_limiters_lock = threading.Lock()
+
+
+def host_rate_limiter(url, rate=GEOCODER_RATE):
+    """Returns the TokenBucket shared by every geocoder sending requests to the host of `url`."""
+    host = urlparse(url).netloc
+    with _host_rate_limiters_lock:
+        if host not in _host_rate_limiters:
+            _host_rate_limiters[host] = TokenBucket(rate, capacity=1)
+        return _host_rate_limiters[host]
+
+
+class NominatimGeocoder:
+    """
+    Geocodes free-text locations with a Nominatim-compatible search endpoint.
+
+    Requests to one host share a rate limiter across all geocoders and threads.
+    """
+
+    def __init__(self, endpoint=GEOCODER_ENDPOINT, user_agent="FoodFinder", timeout=10, rate=GEOCODER_RATE):
+        self.endpoint = endpoint
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+        self.timeout = timeout
+        self.rate_limiter = host_rate_limiter(endpoint, rate)
+
+    def __call__(self, query):
+        """Returns (lat, lng) for a location text, or None if it was not found."""
+        self.rate_limiter.acquire()
+        response = self.session.get(self.endpoint, params={"q": query, "format": "json", "limit": 1}, timeout=self.timeout)
+        response.raise_for_status()
+        results = response.json()
+        if not results:
+            return None
+        return float(results[0]["lat"]), float(results[0]["lon"])
+
+
+class LocationResolver:
+    """
+    Resolves the coordinates of calendar events.
+
+    The description's map links are tried first, then the LOCATION field, either as
+    plain coordinates or through the geocoder. Geocoding results, including misses,
+    are stored in an on-disk JSON Lines cache, so every distinct location is looked up
+    at most once across uploads and restarts. The resolver returned by `for_upload`
+    also caps the number of geocoder calls a single upload can make.
+    """
+
+    def __init__(self, geocoder=None, cache_path=GEOCODE_CACHE_PATH, max_geocodes=MAX_GEOCODES_PER_UPLOAD):
+        """
+        Args:
+            geocoder (callable): Maps a location text to (lat, lng) or None; None disables geocoding.
+            cache_path (str): Path of the geocode cache, or None to keep it in memory only.
+            max_geocodes (int): Uncached locations `for_upload` sends to the geocoder per upload.
+        """
+        self.geocoder = geocoder
+        self.max_geocodes = max_geocodes
+        self.store = PlaceStore(cache_path, key="query") if cache_path else None
+        self._cache = {}
+        if self.store is not None:
+            for record in self.store:
+                self._cache[record["query"]] = (record["lat"], record["lng"])
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalise(location):
+        return " ".join(location.split()).lower()
+
+    def geocode(self, location):
+        """Returns the cached or geocoded (lat, lng) of a location text, or (None, None)."""
+        query = self._normalise(location)
+        with self._lock:
+            if query in self._cache:
+                return self._cache[query]
+        if self.geocoder is None:
+            return None, None
+        try:
+            result = self.geocoder(location)
+        except Exception as e:
+            print(f"Geocoding '{location}' failed: {e}")
+            return None, None  # Not cached, so it is retried next time
+        coordinates = tuple(result) if result else (None, None)
+        with self._lock:
+            self._cache[query] = coordinates
+        if self.store is not None:
+            self.store.upsert({"query": query, "lat": coordinates[0], "lng": coordinates[1]})
+        return coordinates
+
+    def is_cached(self, location):
+        with self._lock:
+            return self._normalise(location) in self._cache
+
+    def for_upload(self):
+        """
+        Returns a `resolve` function for the events of one upload.
+
+        It sends at most `max_geocodes` uncached locations to the geocoder. Later ones
+        resolve to (None, None) and, not being cached, are geocoded by a later upload.
+        """
+        remaining = [self.max_geocodes]
+
+        def geocode(location):
+            if self.geocoder is None or self.is_cached(location):
+                return self.geocode(location)
+            if remaining[0] <= 0:
+                print(f"Geocoding limit of {self.max_geocodes} per upload reached; skipping '{location}'")
+                return None, None
+            remaining[0] -= 1
+            return self.geocode(location)
+
+        return lambda description=None, location=None: self.resolve(description, location, geocode)
+
+    def resolve(self, description=None, location=None, geocode=None):
+        """
+        Returns the coordinates of an event from its description and LOCATION field.
+
+        Args:
+            geocode (callable): Geocodes the LOCATION text; defaults to `self.geocode`.
+
+        Returns:
+            tuple: Latitude and longitude as floats, or (None, None).
+        """
+        lat, lng = coordinates_from_text(description)
+        if lat is not None:
+            return lat, lng
+        if not location or location == "None":
+            return None, None
+        match = COORDINATES_PATTERN.match(location)
+        if match:
+            lat, lng = float(match.group(1)), float(match.group(2))
+            if valid_coordinates(lat, lng):
+                return lat, lng
+        lat, lng = coordinates_from_text(location)
+        if lat is not None:
+            return lat, lng
+        return (geocode or self.geocode)(location)
@@ -0,0 +1,235 @@
+import hashlib
+import io
+import json
+import os
+import threading
+
+PLACES_STORE_PATH = "all_places.jsonl"
+ATTRIBUTES_STORE_PATH = "processed_places.jsonl"  # LLM-extracted attributes, written by llm_generate.py
+
+
+def record_hash(record):
+    """Returns a stable hash of a record's content (key order independent)."""
+    return hashlib.sha256(json.dumps(record, sort_keys=True).encode()).hexdigest()
+
+
+class PlaceStore:
+    """
+    Append-only JSON Lines store of records keyed by their `id`.
+
+    Every upsert of a new or changed record appends one line; unchanged records are not
+    written again. Only the byte offset and content hash of the latest version of each
+    record are kept in memory, so the store stays small regardless of record size, and
+    readers stream records from disk on demand.
+
+    A store opened with `read_only` never modifies the file and requires it to exist;
+    any number of readers can open it while a writer appends.
+    """
+
+    def __init__(self, file_path=PLACES_STORE_PATH, key="id", read_only=False):
+        self.file_path = file_path
+        self.key = key
+        self.read_only = read_only
+        self.lock = threading.RLock()  # Re-entrant: compact() iterates while holding it
+        self._index = {}  # id -> (offset, hash) of the latest version
+        self._end = 0
+        if read_only or os.path.exists(file_path):
+            self._load_index()
+
+    def _load_index(self):
+        """
+        Indexes the log, skipping corrupt lines.
+
+        Only a final line without its newline is a torn write from an interrupted run;
+        a writer truncates it so the next append starts on a clean line. Any other line
+        that fails to parse is skipped and left in place for inspection.
+        """
+        offset = 0
+        last_line = b""
+        with open(self.file_path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    if not line.endswith(b"\n"):
+                        break  # Torn final line
+                    print(f"Skipping corrupt line at byte {offset} of {self.file_path}")
+                else:
+                    self._index[record[self.key]] = (offset, record_hash(record))
+                offset += len(line)
+                last_line = line
+        self._end = offset
+        if self.read_only:
+            return
+        if offset != os.path.getsize(self.file_path):
+            with open(self.file_path, 'r+b') as f:
+                f.truncate(offset)
+        elif last_line and not last_line.endswith(b"\n"):
+            # A complete record missing only its newline: terminate it before appending.
+            with open(self.file_path, 'ab') as f:
+                f.write(b"\n")
+            self._end += 1
+
+    def _check_writable(self):
+        if self.read_only:
+            raise io.UnsupportedOperation(f"PlaceStore at {self.file_path} is read-only")
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, record_id):
+        return record_id in self._index
+
+    def ids(self):
+        """Returns the ids of all records in the store."""
+        return list(self._index)
+
+    def content_hash(self, record_id):
+        """Returns the content hash of the latest version of a record, or None if absent."""
+        entry = self._index.get(record_id)
+        return entry[1] if entry else None
+
+    @property
+    def end_offset(self):
+        """Byte offset of the end of the log; pass it to `iter_since` to read only later changes."""
+        return self._end
+
+    def upsert_many(self, records):
+        """
+        Inserts or updates records, appending only those that are new or changed.
+
+        The appended lines are flushed and fsynced before returning.
+
+        Returns:
+            int: The number of records written.
+        """
+        self._check_writable()
+        written = 0
+        with self.lock:
+            with open(self.file_path, 'ab') as f:
+                for record in records:
+                    digest = record_hash(record)
+                    entry = self._index.get(record[self.key])
+                    if entry is not None and entry[1] == digest:
+                        continue
+                    line = (json.dumps(record) + "\n").encode()
+                    f.write(line)
+                    self._index[record[self.key]] = (self._end, digest)
+                    self._end += len(line)
+                    written += 1
+                if written:
+                    f.flush()
+                    os.fsync(f.fileno())
+        return written
+
+    def upsert(self, record):
+        """Inserts or updates one record. Returns True if it was written."""
+        return self.upsert_many([record]) == 1
+
+    def get(self, record_id, default=None):
+        """Reads the latest version of a record from disk."""
+        entry = self._index.get(record_id)
+        if entry is None:
+            return default
+        with open(self.file_path, 'rb') as f:
+            f.seek(entry[0])
+            return json.loads(f.readline())
+
+    def get_many(self, record_ids):
+        """
+        Reads the latest versions of several records, opening the file once.
+
+        Records are read in file order, so a large batch is one forward pass over the log.
+
+        Returns:
+            dict: id -> record for each of `record_ids` that is in the store.
+        """
+        with self.lock:
+            offsets = {self._index[record_id][0]: record_id for record_id in record_ids if record_id in self._index}
+        records = {}
+        if not offsets:
+            return records
+        with open(self.file_path, 'rb') as f:
+            for offset in sorted(offsets):
+                f.seek(offset)
+                records[offsets[offset]] = json.loads(f.readline())
+        return records
+
+    def __iter__(self):
+        """Lazily yields the latest version of every record, in the order they were last written."""
+        with self.lock:
+            latest = {offset for offset, _ in self._index.values()}
+        if not latest:
+            return
+        with open(self.file_path, 'rb') as f:
+            offset = 0
+            for line in f:
+                if offset in latest:
+                    yield json.loads(line)
+                offset += len(line)
+                if offset >= self._end:
+                    break
+
+    def iter_since(self, offset):
+        """
+        Yields the records appended at or after `offset`, for incremental consumers.
+
+        Records that were updated again later are yielded only once, as their latest version.
+        """
+        with self.lock:
+            latest = {entry_offset for entry_offset, _ in self._index.values() if entry_offset >= offset}
+        if not latest:
+            return
+        with open(self.file_path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if offset in latest:
+                    yield json.loads(line)
+                offset += len(line)
+                if offset >= self._end:
+                    break
+
+    def compact(self):
+        """Rewrites the log keeping only the latest version of each record."""
+        self._check_writable()
+        tmp_path = f"{self.file_path}.{os.getpid()}.tmp"
+        with self.lock:
+            index = {}
+            end = 0
+            with open(tmp_path, 'wb') as out:
+                for record in self:
+                    line = (json.dumps(record) + "\n").encode()
+                    out.write(line)
+                    index[record[self.key]] = (end, record_hash(record))
+                    end += len(line)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp_path, self.file_path)
+            self._index = index
+            self._end = end
+
+
+def iter_places(file_path):
+    """
+    Yields places from either a PlaceStore (`.jsonl`) or a legacy JSON list file.
+
+    The store is opened read-only, so readers never modify it.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    if file_path.endswith(".jsonl"):
+        yield from PlaceStore(file_path, read_only=True)
+    else:
+        with open(file_path, 'r') as f:
+            yield from json.load(f)
+
+
+if __name__ == "__main__":
+    # Import a legacy JSON dump, e.g. python place_store.py all_places_response.json
+    import sys
+    source = sys.argv[1] if len(sys.argv) > 1 else "all_places_response.json"
+    store = PlaceStore(sys.argv[2] if len(sys.argv) > 2 else PLACES_STORE_PATH)
+    with open(source, 'r') as f:
+        written = store.upsert_many(json.load(f))
+    print(f"Imported {written} new or changed places; the store now holds {len(store)} places.")
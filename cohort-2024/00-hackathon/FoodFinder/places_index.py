@@ -0,0 +1,246 @@
+import threading
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371  # Radius of Earth in kilometers
+
+
+def haversine_km(lat, lng, lats_rad, lngs_rad, cos_lats):
+    """
+    Vectorised Haversine distance from one point to many points.
+
+    Args:
+        lat (float): Latitude of the reference point in degrees.
+        lng (float): Longitude of the reference point in degrees.
+        lats_rad (np.ndarray): Latitudes of the other points in radians.
+        lngs_rad (np.ndarray): Longitudes of the other points in radians.
+        cos_lats (np.ndarray): Precomputed cosine of `lats_rad`.
+
+    Returns:
+        np.ndarray: A new array of distances in kilometers.
+    """
+    lat = np.radians(lat)
+    lng = np.radians(lng)
+    a = np.sin((lats_rad - lat) / 2) ** 2 + np.cos(lat) * cos_lats * np.sin((lngs_rad - lng) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class ScoringModel:
+    """
+    Configurable recommendation score; higher is better.
+
+    score = rating_weight * bayesian_rating + popularity_weight * popularity
+            - distance_weight * distance_km / distance_scale_km
+            + similarity_weight * cuisine_similarity
+
+    The Bayesian rating shrinks each rating towards the mean rating, as if every place
+    had `rating_prior_count` extra reviews at that mean, so a 5.0 from two reviews does
+    not beat a 4.7 from two thousand. It is rescaled from 1-5 to 0-1. Popularity is
+    log(1 + reviews) relative to the most reviewed place. The rating and popularity
+    terms do not depend on the query and are computed once per index.
+    """
+
+    def __init__(self, distance_weight=1.0, rating_weight=1.0, popularity_weight=0.5, similarity_weight=1.0,
+                 distance_scale_km=2.0, rating_prior_count=20):
+        self.distance_weight = distance_weight
+        self.rating_weight = rating_weight
+        self.popularity_weight = popularity_weight
+        self.similarity_weight = similarity_weight
+        self.distance_scale_km = distance_scale_km
+        self.rating_prior_count = rating_prior_count
+
+    def static_scores(self, ratings, counts):
+        """Query-independent part of the score, from ratings (NaN if unknown) and review counts."""
+        counts = np.where(np.isnan(ratings), 0.0, counts)
+        ratings = np.nan_to_num(ratings)
+        total_reviews = counts.sum()
+        mean_rating = (ratings * counts).sum() / total_reviews if total_reviews else 3.0
+        prior = self.rating_prior_count
+        bayesian_rating = (prior * mean_rating + ratings * counts) / (prior + counts)
+        max_count = counts.max() if counts.size else 0
+        popularity = np.log1p(counts) / np.log1p(max_count) if max_count else np.zeros_like(counts)
+        return self.rating_weight * (bayesian_rating - 1) / 4 + self.popularity_weight * popularity
+
+    def score(self, static_scores, distance_km, similarity=None):
+        """Full score of every place for one query, as a new array."""
+        scores = static_scores - self.distance_weight * distance_km / self.distance_scale_km
+        if similarity is not None:
+            scores += self.similarity_weight * similarity
+        return scores
+
+
+def top_k_positions(scores, start, stop):
+    """
+    Positions of the `start`-th to `stop`-th highest scores, best first.
+
+    Uses a partition so only the top `stop` scores are sorted, O(n + stop log stop).
+    Equal scores are ordered by position, so consecutive pages of the same query
+    neither repeat nor skip places that tie across a page boundary.
+    """
+    stop = min(stop, len(scores))
+    if start >= stop:
+        return np.empty(0, dtype=np.int64)
+    if stop < len(scores):
+        # argpartition would pick arbitrary members of a tie at the cut, so take every
+        # score above the stop-th highest and then the lowest positions sharing it.
+        kth = -np.partition(-scores, stop - 1)[stop - 1]
+        higher = np.flatnonzero(scores > kth)
+        tied = np.flatnonzero(scores == kth)[:stop - len(higher)]
+        top = np.concatenate((higher, tied))
+    else:
+        top = np.arange(len(scores))
+    top = top[np.lexsort((top, -scores[top]))]
+    return top[start:stop]
+
+
+class PlacesIndex:
+    """
+    Immutable columnar store of places that is safe to share between request threads.
+
+    Every column of the source DataFrame is copied once into a read-only NumPy array.
+    Queries never write to these arrays: distances and filter masks are computed into
+    request-local arrays, so concurrent requests neither race nor copy the base table.
+    """
+
+    def __init__(self, df, scoring=None):
+        """
+        Args:
+            df (pandas.DataFrame): Places DataFrame as built by `places_loader.load_places_cached`.
+            scoring (ScoringModel): Default ranking of query results.
+        """
+        self.size = len(df)
+        self._columns = {}
+        for name in df.columns:
+            series = df[name]
+            if pd.api.types.is_extension_array_dtype(series.dtype):
+                # Nullable and categorical columns become plain objects with None for missing values.
+                values = series.to_numpy(dtype=object, na_value=None)
+            else:
+                values = series.to_numpy(copy=True)
+            self._columns[name] = self._freeze(values)
+
+        if self.size:
+            latitudes = self._columns["latitude"].astype(float)
+            longitudes = self._columns["longitude"].astype(float)
+        else:
+            latitudes = longitudes = np.empty(0)
+        self._lats_rad = self._freeze(np.radians(latitudes))
+        self._lngs_rad = self._freeze(np.radians(longitudes))
+        self._cos_lats = self._freeze(np.cos(self._lats_rad))
+
+        self.scoring = scoring or ScoringModel()
+        self._static_scores = self._freeze(self._compute_static_scores(self.scoring))
+
+        # Type masks only depend on the immutable columns, so they are cached per type list.
+        self._types_masks = {}
+        self._types_masks_lock = threading.Lock()
+
+    def _compute_static_scores(self, scoring):
+        if self.empty:
+            return np.empty(0)
+        ratings = self._columns["rating"].astype(float)
+        counts = np.array([count or 0 for count in self._columns["userRatingCount"]], dtype=float)
+        return scoring.static_scores(ratings, counts)
+
+    @staticmethod
+    def _freeze(values):
+        values.setflags(write=False)
+        return values
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def empty(self):
+        return self.size == 0
+
+    def column(self, name):
+        """Returns the read-only array backing column `name`."""
+        return self._columns[name]
+
+    def unique_types(self):
+        """Returns the set of individual place types present in the data."""
+        if self.empty:
+            return set()
+        return {t for types in self._columns["types"] if types for t in types.split(", ")}
+
+    def distances(self, prev_lat, prev_lng, next_lat, next_lng):
+        """
+        Computes the detour distances for every place.
+
+        Returns:
+            tuple: Request-local arrays (distance_to, distance_back, distance_km).
+        """
+        distance_to = haversine_km(prev_lat, prev_lng, self._lats_rad, self._lngs_rad, self._cos_lats)
+        distance_back = haversine_km(next_lat, next_lng, self._lats_rad, self._lngs_rad, self._cos_lats)
+        return distance_to, distance_back, distance_to + distance_back
+
+    def types_mask(self, types_to_filter):
+        """
+        Boolean mask of places whose `types` contain any of `types_to_filter`.
+
+        The returned array is shared and read-only; combine it with `&` rather than in place.
+        """
+        key = tuple(types_to_filter)
+        mask = self._types_masks.get(key)
+        if mask is None:
+            mask = np.fromiter(
+                (any(cuisine_type in types for cuisine_type in key) for types in self._columns["types"]),
+                dtype=bool,
+                count=self.size,
+            )
+            with self._types_masks_lock:
+                mask = self._types_masks.setdefault(key, self._freeze(mask))
+        return mask
+
+    def equals_mask(self, name, value):
+        """Boolean mask of places whose column `name` equals `value`."""
+        return self._columns[name] == value
+
+    def query(self, prev_lat, prev_lng, next_lat, next_lng, max_distance=None, types_to_filter=None,
+              spicy_level=None, price_level=None, similarity=None, min_similarity=None,
+              page=1, page_size=10, scoring=None):
+        """
+        Selects and ranks places matching the given constraints.
+
+        Args:
+            prev_lat, prev_lng, next_lat, next_lng (float): The surrounding event locations.
+            max_distance (float): Maximum total detour in kilometers, or None for any.
+            types_to_filter (list): Place types of which at least one must match, or None.
+            spicy_level (str): Required spicy level, or None.
+            price_level: Required price level, or None.
+            similarity (np.ndarray): Optional per-place cuisine similarity (see CuisineIndex).
+                Places below `min_similarity` are dropped and the rest get a similarity bonus.
+            page (int): 1-based page of results to return.
+            page_size (int): Number of results per page.
+            scoring (ScoringModel): Ranking to use instead of the index's default.
+
+        Returns:
+            tuple: Row positions of the page's places (best first), the request-local
+            `distance_km` array for all places, and the total number of matching places.
+        """
+        _, _, distance_km = self.distances(prev_lat, prev_lng, next_lat, next_lng)
+
+        mask = np.ones(self.size, dtype=bool)
+        if max_distance is not None:
+            mask &= distance_km <= max_distance
+        if types_to_filter:
+            mask &= self.types_mask(types_to_filter)
+        if spicy_level is not None:
+            mask &= self.equals_mask("spicyLevel", spicy_level)
+        if price_level is not None:
+            mask &= self.equals_mask("priceLevel", price_level)
+        if similarity is not None and min_similarity is not None:
+            mask &= similarity >= min_similarity
+
+        rows = np.flatnonzero(mask)
+        if scoring is None or scoring is self.scoring:
+            scoring, static_scores = self.scoring, self._static_scores
+        else:
+            static_scores = self._compute_static_scores(scoring)
+        scores = scoring.score(
+            static_scores[rows], distance_km[rows], similarity[rows] if similarity is not None else None
+        )
+
+        start = (max(page, 1) - 1) * page_size
+        return rows[top_k_positions(scores, start, start + page_size)], distance_km, len(rows)
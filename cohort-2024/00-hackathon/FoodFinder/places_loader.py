@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import pandas as pd
+from place_store import iter_places, PLACES_STORE_PATH, ATTRIBUTES_STORE_PATH
+
+PLACES_CACHE_PATH = "places_cache.parquet"
+
+# Column name -> dtype of the places DataFrame, in column order.
+PLACE_DTYPES = {
+    "id": "object",
+    "types": "category",
+    "formattedAddress": "object",
+    "latitude": "float64",
+    "longitude": "float64",
+    "rating": "float64",
+    "businessStatus": "category",
+    "userRatingCount": "Int64",
+    "displayName_text": "object",
+    "displayName_languageCode": "object",
+    "takeout": "boolean",
+    "delivery": "boolean",
+    "dineIn": "boolean",
+    "openNow": "boolean",
+    "weekdayDescriptions": "object",
+    "acceptsCreditCards": "boolean",
+    "acceptsDebitCards": "boolean",
+    "acceptsCashOnly": "boolean",
+    "acceptsNfc": "boolean",
+    "freeParkingLot": "boolean",
+    "freeStreetParking": "boolean",
+    "spicyLevel": "category",
+    "priceLevel": "object",
+}
+
+
+def load_json_data(file_path):
+    """Loads JSON data from a file."""
+    with open(file_path, 'r') as f:
+        return json.load(f)
+
+
+def filter_operational_places(places):
+    """Filters places to include only operational businesses."""
+    return [place for place in places if place.get("businessStatus") == "OPERATIONAL"]
+
+
+def create_extracted_attributes_map(extracted_attributes_list):
+    """Creates a dictionary mapping place IDs to their extracted attributes."""
+    return {item['id']: item for item in extracted_attributes_list}
+
+
+def flatten_place(json_data):
+    """
+    Flattens the JSON data of a place into a flat row dictionary.
+
+    Args:
+        json_data (dict): A place from the Places API, optionally merged with its LLM-extracted attributes.
+
+    Returns:
+        dict: Column name -> value, with the keys of `PLACE_DTYPES`.
+    """
+    location = json_data.get("location", {})
+    display_name = json_data.get("displayName", {})
+    opening_hours = json_data.get("currentOpeningHours", {})
+    payment_options = json_data.get("paymentOptions", {})
+    parking_options = json_data.get("parkingOptions", {})
+    return {
+        "id": json_data.get("id"),
+        "types": ", ".join(json_data.get("types", [])),
+        "formattedAddress": json_data.get("formattedAddress"),
+        "latitude": location.get("latitude"),
+        "longitude": location.get("longitude"),
+        "rating": json_data.get("rating"),
+        "businessStatus": json_data.get("businessStatus"),
+        "userRatingCount": json_data.get("userRatingCount"),
+        "displayName_text": display_name.get("text"),
+        "displayName_languageCode": display_name.get("languageCode"),
+        "takeout": json_data.get("takeout"),
+        "delivery": json_data.get("delivery"),
+        "dineIn": json_data.get("dineIn"),
+        "openNow": opening_hours.get("openNow"),
+        "weekdayDescriptions": "\n".join(opening_hours.get("weekdayDescriptions", [])),
+        "acceptsCreditCards": payment_options.get("acceptsCreditCards"),
+        "acceptsDebitCards": payment_options.get("acceptsDebitCards"),
+        "acceptsCashOnly": payment_options.get("acceptsCashOnly"),
+        "acceptsNfc": payment_options.get("acceptsNfc"),
+        "freeParkingLot": parking_options.get("freeParkingLot"),
+        "freeStreetParking": parking_options.get("freeStreetParking"),
+        "spicyLevel": json_data.get("spicy_level"),
+        "priceLevel": json_data.get("price_level"),
+    }
+
+
+def build_places_dataframe(places, extracted_attributes=None):
+    """
+    Builds the places DataFrame in a single pass.
+
+    Every place is flattened (merged with its extracted attributes when given) into
+    per-column lists, and the DataFrame is constructed once with the dtypes in `PLACE_DTYPES`.
+
+    Args:
+        places (iterable): Places from the Places API; consumed once, so a generator is fine.
+        extracted_attributes (dict): Optional mapping of place ID -> LLM-extracted attributes;
+            places missing from it get null spicyLevel and priceLevel.
+
+    Returns:
+        pandas.DataFrame: One row per place.
+    """
+    columns = {name: [] for name in PLACE_DTYPES}
+    appenders = [(name, columns[name].append) for name in PLACE_DTYPES]
+    for place in places:
+        if extracted_attributes is not None:
+            # Places not enriched yet (or whose enrichment failed) keep null attributes.
+            place = place | extracted_attributes.get(place['id'], {})
+        row = flatten_place(place)
+        for name, append in appenders:
+            append(row[name])
+
+    return pd.DataFrame({
+        name: pd.Series(values, dtype=PLACE_DTYPES[name])
+        for name, values in columns.items()
+    })
+
+
+def load_places_dataframe(places_path=PLACES_STORE_PATH, attributes_path=ATTRIBUTES_STORE_PATH):
+    """
+    Loads the operational places merged with their extracted attributes.
+
+    Places are streamed from the store, so only the flattened columns are held in memory.
+
+    Args:
+        places_path (str): Path to the PlaceStore (`.jsonl`) or a legacy JSON dump.
+        attributes_path (str): Path to the LLM-extracted attribute store (or a legacy JSON list), or None to skip the merge.
+
+    Returns:
+        pandas.DataFrame: The places DataFrame.
+    """
+    places = (place for place in iter_places(places_path) if place.get("businessStatus") == "OPERATIONAL")
+    if attributes_path is None:
+        return build_places_dataframe(places)
+    # The attribute store may hold places that have since closed, and lacks places whose
+    # enrichment is pending or failed, so the two are matched loosely in both directions.
+    extracted_attributes = create_extracted_attributes_map(iter_places(attributes_path))
+    return build_places_dataframe(places, extracted_attributes)
+
+
+def file_sha256(file_path, chunk_size=1 << 20):
+    """Returns the hex SHA-256 digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_manifest(places_path, attributes_path):
+    """Describes the inputs a cached table was built from."""
+    return {
+        "schema": PLACE_DTYPES,
+        "places_sha256": file_sha256(places_path),
+        "attributes_sha256": file_sha256(attributes_path) if attributes_path is not None else None,
+    }
+
+
+def _manifest_path(cache_path):
+    return cache_path + ".manifest.json"
+
+
+def build_places_cache(places_path=PLACES_STORE_PATH, attributes_path=ATTRIBUTES_STORE_PATH,
+                       cache_path=PLACES_CACHE_PATH, manifest=None):
+    """
+    Builds the joined, typed places table and writes it to a Parquet cache.
+
+    The table and its manifest (source hashes and schema) are written to temporary
+    files and moved into place, so concurrently starting workers never read a partial cache.
+    The manifest is only written once the new table is in place.
+
+    Returns:
+        pandas.DataFrame: The freshly built places DataFrame.
+    """
+    if manifest is None:
+        manifest = _cache_manifest(places_path, attributes_path)
+    df = load_places_dataframe(places_path, attributes_path)
+
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        df.to_parquet(tmp_path, index=False)
+    except ImportError as e:
+        print(f"Places cache disabled, Parquet support is not installed: {e}")
+        return df
+    # Drop the old manifest first: if we crash before the new one is written, the cache is rebuilt
+    # rather than trusted under a manifest that describes different inputs.
+    try:
+        os.remove(_manifest_path(cache_path))
+    except FileNotFoundError:
+        pass
+    os.replace(tmp_path, cache_path)
+
+    tmp_manifest_path = f"{_manifest_path(cache_path)}.{os.getpid()}.tmp"
+    with open(tmp_manifest_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_manifest_path, _manifest_path(cache_path))
+    return df
+
+
+def load_places_cached(places_path=PLACES_STORE_PATH, attributes_path=ATTRIBUTES_STORE_PATH,
+                       cache_path=PLACES_CACHE_PATH):
+    """
+    Loads the places DataFrame from the Parquet cache, rebuilding it when the sources changed.
+
+    The cache is reused only if the SHA-256 hashes of both source JSON files and the
+    column schema match the manifest written alongside it. An unreadable cache is rebuilt too.
+
+    Returns:
+        pandas.DataFrame: The places DataFrame.
+    """
+    manifest = _cache_manifest(places_path, attributes_path)
+    try:
+        with open(_manifest_path(cache_path), 'r') as f:
+            cached_manifest = json.load(f)
+        if cached_manifest == manifest:
+            # Parquet readers may infer their own string dtype, so restore the declared schema.
+            return pd.read_parquet(cache_path).astype(PLACE_DTYPES)
+    except (FileNotFoundError, ImportError):
+        pass
+    except (OSError, ValueError) as e:
+        # A truncated or corrupt manifest or table (pyarrow's ArrowInvalid is a ValueError) is rebuilt.
+        print(f"Ignoring unreadable places cache: {e}")
+    print(f"Rebuilding places cache at {cache_path}")
+    return build_places_cache(places_path, attributes_path, cache_path, manifest)
+
+
+if __name__ == "__main__":
+    df = build_places_cache()
+    print(f"Cached {len(df)} places to {PLACES_CACHE_PATH}")
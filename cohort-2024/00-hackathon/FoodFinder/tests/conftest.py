@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+# Add the FoodFinder directory to the sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from place_store import PlaceStore, PLACES_STORE_PATH, ATTRIBUTES_STORE_PATH
+
+APP_PLACES = [
+    {"id": "thai", "types": ["thai_restaurant", "restaurant"], "location": {"latitude": 53.461, "longitude": -2.23},
+     "displayName": {"text": "Thai"}, "businessStatus": "OPERATIONAL", "rating": 4.5, "userRatingCount": 10},
+    {"id": "diner", "types": ["restaurant", "food"], "location": {"latitude": 53.462, "longitude": -2.23},
+     "displayName": {"text": "Diner"}, "businessStatus": "OPERATIONAL", "rating": 4.0, "userRatingCount": 5},
+]
+
+
+@pytest.fixture(scope="session")
+def app_module(tmp_path_factory):
+    """
+    Imports app.py, which loads its data at import time, against a small places store.
+
+    The import runs in a temporary directory, so the Parquet cache it writes stays out of the source tree.
+    """
+    data_dir = tmp_path_factory.mktemp("app_data")
+    PlaceStore(str(data_dir / PLACES_STORE_PATH)).upsert_many(APP_PLACES)
+    PlaceStore(str(data_dir / ATTRIBUTES_STORE_PATH)).upsert_many([{"id": "thai", "spicy_level": "High"}])
+    cwd = os.getcwd()
+    os.chdir(data_dir)
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+    app.app.config["TESTING"] = True
+    return app
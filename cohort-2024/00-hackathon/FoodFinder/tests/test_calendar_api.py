@@ -0,0 +1,85 @@
+import io
+import os
+import sys
+
+import pytest
+
+# Add the FoodFinder directory to the sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ics_utils import CalendarCache
+
+
+def ics(*events):
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0"]
+    for uid, start, end, lat, lng in events:
+        lines += ["BEGIN:VEVENT", f"UID:{uid}", f"SUMMARY:{uid}", f"DTSTART:{start}", f"DTEND:{end}",
+                  f"DESCRIPTION:https://www.google.com/maps/search/?api=1&query={lat},{lng}", "END:VEVENT"]
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(lines) + "\r\n").encode()
+
+
+DAY = ics(
+    ("lecture", "20240320T090000Z", "20240320T100000Z", 53.467, -2.234),
+    ("lab", "20240320T140000Z", "20240320T160000Z", 53.472, -2.241),
+    ("seminar", "20240320T180000Z", "20240320T190000Z", 53.479, -2.245),
+)
+OTHER_DAY = ics(("exam", "20240321T090000Z", "20240321T110000Z", 53.46, -2.23))
+
+
+@pytest.fixture
+def client(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "calendar_cache", CalendarCache(max_size=1))
+    return app_module.app.test_client()
+
+
+def upload(client, data, date="2024-03-20", time="12:00"):
+    return client.post("/process_ics", content_type="multipart/form-data", data={
+        "ics_file": (io.BytesIO(data), "calendar.ics"), "selected_date": date, "selected_time": time})
+
+
+def query(client, calendar_id, date="2024-03-20", time="12:00"):
+    return client.post(f"/calendar/{calendar_id}", data={"selected_date": date, "selected_time": time})
+
+
+def test_calendar_is_queried_again_by_id(client):
+    uploaded = upload(client, DAY).get_json()
+    assert (uploaded["prev_lat"], uploaded["prev_lng"]) == (53.467, -2.234)
+    assert (uploaded["next_lat"], uploaded["next_lng"]) == (53.472, -2.241)
+
+    response = query(client, uploaded["calendar_id"], time="17:00")
+    assert response.status_code == 200
+    assert response.get_json() == {"calendar_id": uploaded["calendar_id"], "prev_lat": 53.472, "prev_lng": -2.241,
+                                   "next_lat": 53.479, "next_lng": -2.245}
+    assert query(client, uploaded["calendar_id"], time="noon").get_json() == {"error": "Invalid date or time"}
+
+
+def test_same_upload_reuses_the_parsed_calendar(client, app_module):
+    first = upload(client, DAY).get_json()["calendar_id"]
+    events = app_module.calendar_cache.get(first)
+    assert upload(client, DAY, time="17:00").get_json()["calendar_id"] == first
+    assert app_module.calendar_cache.get(first) is events
+
+
+def test_unknown_or_evicted_calendar_is_404(client):
+    assert query(client, "0" * 64).status_code == 404
+
+    first = upload(client, DAY).get_json()["calendar_id"]
+    upload(client, OTHER_DAY)  # Evicts the first calendar from the one-entry cache
+    response = query(client, first)
+    assert response.status_code == 404
+    assert response.get_json() == {"error": "Unknown calendar, please upload it again"}
+
+    # Uploading it again brings it back under the same ID.
+    assert upload(client, DAY).get_json()["calendar_id"] == first
+    assert query(client, first).status_code == 200
+
+
+def test_calendar_cache_evicts_least_recently_used():
+    cache = CalendarCache(max_size=2)
+    first, _ = cache.add(DAY)
+    second, _ = cache.add(OTHER_DAY)
+    assert cache.get(first) is not None  # Now the most recently used
+    third, _ = cache.add(ics(("talk", "20240322T090000Z", "20240322T100000Z", 53.46, -2.23)))
+    assert cache.get(second) is None
+    assert cache.get(first) is not None and cache.get(third) is not None
@@ -0,0 +1,128 @@
+import os
+import re
+import sys
+
+import numpy as np
+import pytest
+
+# Add the FoodFinder directory to the sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cuisine_index import GENERIC_TYPES, MIN_SIMILARITY, CuisineIndex, cuisine_query_text, is_generic
+from get_embeddings import EmbeddingBundle, type_text
+from places_index import PlacesIndex
+from places_loader import build_places_dataframe
+
+HOME = (53.46, -2.23)
+
+
+def words(text):
+    return re.findall(r"[a-z]+", text.lower())
+
+
+class StubEncoder:
+    """Stands in for a sentence model: a normalised bag of words over a fixed vocabulary."""
+
+    def __init__(self, texts):
+        self.vocabulary = {word: i for i, word in enumerate(sorted({w for text in texts for w in words(text)}))}
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for word in words(text):
+            if word in self.vocabulary:
+                vector[self.vocabulary[word]] += 1
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+@pytest.fixture(scope="module")
+def cuisine_options_map(app_module):
+    return app_module.cuisine_options_map
+
+
+@pytest.fixture(scope="module")
+def places(cuisine_options_map):
+    """One place per mapped type (plus the generic ones), and one with only generic types."""
+    place_types = sorted({t for types in cuisine_options_map.values() for t in types} | {"gas_station"})
+    location = {"latitude": HOME[0], "longitude": HOME[1]}
+    places = [{"id": t, "types": [t, "restaurant"], "location": location, "displayName": {"text": t}}
+              for t in place_types]
+    places.append({"id": "generic", "types": ["restaurant", "food"], "location": location,
+                   "displayName": {"text": "generic"}})
+    return places
+
+
+@pytest.fixture(scope="module")
+def index(places):
+    return PlacesIndex(build_places_dataframe(places))
+
+
+@pytest.fixture(scope="module")
+def cuisine_index(places, cuisine_options_map, index):
+    types = sorted({t for place in places for t in place["types"]})
+    type_rows = {t: i for i, t in enumerate(types)}
+    encode = StubEncoder([type_text(t) for t in types] + [cuisine_query_text(c) for c in cuisine_options_map])
+    offsets = np.cumsum([0] + [len(place["types"]) for place in places])
+    rows = np.array([type_rows[t] for place in places for t in place["types"]], dtype=np.int64)
+    bundle = EmbeddingBundle(np.array([encode(type_text(t)) for t in types]), types,
+                             [place["id"] for place in places], offsets, rows)
+    return CuisineIndex(bundle, index.column("id"), encode)
+
+
+def matching_ids(index, mask):
+    return set(index.column("id")[mask])
+
+
+def test_every_option_keeps_its_keyword_matches(cuisine_options_map, index, cuisine_index):
+    for cuisine, keyword_types in cuisine_options_map.items():
+        if is_generic(keyword_types):
+            continue
+        text = cuisine_query_text(cuisine)
+        threshold = cuisine_index.min_similarity(text, keyword_types)
+        assert threshold <= MIN_SIMILARITY
+        keyword_matches = matching_ids(index, index.types_mask(keyword_types))
+        semantic_matches = matching_ids(index, cuisine_index.similarity(text) >= threshold)
+        assert keyword_matches <= semantic_matches, cuisine
+
+
+def test_threshold_is_only_lowered_when_needed(cuisine_index):
+    # "thai restaurant" is similar enough to "Thai", so the unrelated types stay out.
+    assert cuisine_index.min_similarity("Thai", ["thai_restaurant"]) == MIN_SIMILARITY
+    similarity = cuisine_index.similarity("Thai")
+    assert similarity.max() > MIN_SIMILARITY
+    # "greek restaurant" shares no word with the query, so the threshold drops to keep it.
+    text = cuisine_query_text("Mediterranean/Middle Eastern/African")
+    assert cuisine_index.min_similarity(text, ["greek_restaurant"]) < MIN_SIMILARITY
+
+
+def test_generic_types_never_match(cuisine_index, index):
+    similarity = cuisine_index.similarity("restaurant, food")
+    generic = index.column("id") == "generic"
+    assert similarity[generic] == -1
+    assert is_generic(["restaurant", "food"]) and not is_generic(["restaurant", "cafe"]) and not is_generic([])
+    assert {"restaurant", "food"} <= GENERIC_TYPES
+
+
+def test_similarity_is_cached_per_query(cuisine_index):
+    calls = cuisine_index.encode.calls
+    first = cuisine_index.similarity("Korean barbecue")
+    assert cuisine_index.similarity("Korean barbecue") is first
+    cuisine_index.min_similarity("Korean barbecue", ["korean_restaurant"])
+    assert cuisine_index.encode.calls == calls + 1
+    assert not first.flags.writeable
+
+
+def test_recommendations_use_keywords_for_generic_options(app_module, index, cuisine_index):
+    def recommended(cuisine, semantic):
+        recommendations, total = app_module.get_restaurant_recommendations(
+            index, cuisine, None, None, None, *HOME, *HOME,
+            cuisine_index=cuisine_index if semantic else None, page_size=len(index))
+        assert len(recommendations) == total
+        return {recommendation["name"] for recommendation in recommendations}
+
+    # Every place has a generic type, and the place with nothing else must not be lost.
+    assert recommended("Other", semantic=True) == recommended("Other", semantic=False)
+    assert "generic" in recommended("Other", semantic=True)
+    assert recommended("Thai", semantic=True) >= recommended("Thai", semantic=False) == {"thai_restaurant"}
@@ -0,0 +1,182 @@
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Add the FoodFinder directory to the sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import get_data
+from get_data import RESULT_CAP, CrawlCheckpoint, crawl, crawl_adaptive, get_places_in_circle
+from place_store import PlaceStore
+
+CELLS = [(53.46, -2.23), (53.47, -2.23), (53.46, -2.24), (53.47, -2.24)]
+
+
+class StubPlaces:
+    """Local stand-in for the Places API: one place per requested cell, with scripted failures."""
+
+    def __init__(self):
+        self.requests = []  # (lat, lon) of every request received
+        self.radii = []  # Radius of every request received
+        self.failures = {}  # (lat, lon) -> list of status codes to return before succeeding
+        self.density = lambda lat, lon, radius: 1  # Number of places to return for a cell
+        self.lock = threading.Lock()
+
+    def respond(self, body):
+        circle = body["locationRestriction"]["circle"]
+        cell = (circle["center"]["latitude"], circle["center"]["longitude"])
+        with self.lock:
+            self.requests.append(cell)
+            self.radii.append(circle["radius"])
+            pending = self.failures.get(cell)
+            if pending:
+                return pending.pop(0), {}
+        places = [{"id": f"{cell[0]:.2f},{cell[1]:.2f}", "businessStatus": "OPERATIONAL"}]
+        places += [{"id": f"{cell[0]:.6f},{cell[1]:.6f}/{i}", "businessStatus": "OPERATIONAL"}
+                   for i in range(1, self.density(*cell, circle["radius"]))]
+        return 200, {"places": places}
+
+
+@pytest.fixture
+def stub():
+    places = StubPlaces()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            status, payload = places.respond(body)
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    places.endpoint = f"http://127.0.0.1:{server.server_address[1]}/v1/places:searchNearby"
+    yield places
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """Records the backoff delays instead of sleeping them."""
+    delays = []
+    monkeypatch.setattr(get_data.time, "sleep", delays.append)
+    return delays
+
+
+def run_crawl(tmp_path, stub, **kwargs):
+    store = PlaceStore(str(tmp_path / "places.jsonl"))
+    kwargs.setdefault("max_retries", 3)
+    crawl(CELLS, 500, store, checkpoint_path=str(tmp_path / "checkpoint.jsonl"), workers=2, rate=1000,
+          backoff=0.5, endpoint=stub.endpoint, **kwargs)
+    return store
+
+
+def test_retries_with_backoff(stub, no_sleep):
+    stub.failures[CELLS[0]] = [503, 429]
+    result = get_places_in_circle(*CELLS[0], 500, max_retries=3, backoff=0.5, endpoint=stub.endpoint)
+    assert result["places"][0]["id"] == "53.46,-2.23"
+    assert stub.requests == [CELLS[0]] * 3
+    assert len(no_sleep) == 2
+    assert 0 <= no_sleep[0] <= 0.5 and 0 <= no_sleep[1] <= 1.0  # Full jitter up to backoff * 2**attempt
+
+
+def test_gives_up_after_max_retries(stub, no_sleep):
+    stub.failures[CELLS[0]] = [503] * 5
+    assert get_places_in_circle(*CELLS[0], 500, max_retries=2, backoff=0.5, endpoint=stub.endpoint) is None
+    assert len(stub.requests) == 3
+
+
+def test_client_errors_are_not_retried(stub, no_sleep):
+    stub.failures[CELLS[0]] = [400]
+    assert get_places_in_circle(*CELLS[0], 500, max_retries=3, endpoint=stub.endpoint) is None
+    assert len(stub.requests) == 1 and not no_sleep
+
+
+def test_failed_cells_are_fetched_on_the_next_run(tmp_path, stub, no_sleep):
+    stub.failures[CELLS[1]] = [503] * 4
+    store = run_crawl(tmp_path, stub)
+    assert len(store) == 3
+    checkpoint = CrawlCheckpoint(str(tmp_path / "checkpoint.jsonl"))
+    assert len(checkpoint.completed) == 3 and not checkpoint.is_done(*CELLS[1], 500)
+
+    stub.requests.clear()
+    store = run_crawl(tmp_path, stub)
+    assert stub.requests == [CELLS[1]]
+    assert len(store) == 4
+    assert not os.path.exists(tmp_path / "checkpoint.jsonl")
+
+
+def test_resume_after_interrupt(tmp_path, stub, no_sleep):
+    # A crawl killed after two cells, in the middle of writing the third.
+    with open(tmp_path / "checkpoint.jsonl", 'w') as f:
+        for lat, lon in CELLS[:2]:
+            f.write(json.dumps({"cell": [lat, lon, 500], "count": 1}) + "\n")
+        f.write('{"cell": [53.4')
+    run_crawl(tmp_path, stub)
+    assert sorted(stub.requests) == sorted(CELLS[2:])
+
+
+def test_finished_crawl_clears_checkpoint(tmp_path, stub, no_sleep):
+    run_crawl(tmp_path, stub)
+    assert len(stub.requests) == 4
+    assert not os.path.exists(tmp_path / "checkpoint.jsonl")
+
+    stub.requests.clear()
+    store = run_crawl(tmp_path, stub)
+    assert sorted(stub.requests) == sorted(CELLS)  # A second full run fetches again
+    assert len(store) == 4
+
+
+CENTER = (53.46, -2.23)
+
+
+def run_adaptive_crawl(tmp_path, stub):
+    store = PlaceStore(str(tmp_path / "places.jsonl"))
+    truncated = crawl_adaptive(*CENTER, 1200, store, cell_radius=1000, min_radius=200,
+                               checkpoint_path=str(tmp_path / "checkpoint.jsonl"), workers=2, rate=1000,
+                               endpoint=stub.endpoint)
+    return store, truncated
+
+
+def test_adaptive_crawl_splits_capped_cells(tmp_path, stub, no_sleep):
+    # Only the south-west quarter of the circle is dense, at every radius.
+    stub.density = lambda lat, lon, radius: RESULT_CAP if lat < CENTER[0] and lon < CENTER[1] else 1
+    _, truncated = run_adaptive_crawl(tmp_path, stub)
+
+    # 1000m -> 500m -> 250m; a 125m quadrant would be below min_radius, so nothing is split further.
+    assert stub.radii.count(1000) == 4
+    assert sorted(set(stub.radii)) == [250, 500, 1000]
+    split = [cell for cell, radius in zip(stub.requests, stub.radii) if radius < 1000]
+    assert all(lat < CENTER[0] and lon < CENTER[1] for lat, lon in split)
+
+    # Capped cells at the smallest radius are reported, not silently kept.
+    smallest = [(lat, lon, radius) for (lat, lon), radius in zip(stub.requests, stub.radii) if radius == 250]
+    assert sorted(truncated) == sorted(smallest)
+    assert not os.path.exists(tmp_path / "checkpoint.jsonl")
+
+
+def test_adaptive_crawl_reports_truncated_cells(tmp_path, stub, no_sleep, capsys):
+    stub.density = lambda lat, lon, radius: RESULT_CAP if radius < 1000 or lat < CENTER[0] else 1
+    _, truncated = run_adaptive_crawl(tmp_path, stub)
+    assert truncated and all(radius == 250 for _, _, radius in truncated)
+    assert f"Warning: {len(truncated)} cells still returned {RESULT_CAP} places" in capsys.readouterr().out
+
+    stub.density = lambda lat, lon, radius: RESULT_CAP - 1  # Nothing hits the cap
+    stub.requests.clear()
+    stub.radii.clear()
+    _, truncated = run_adaptive_crawl(tmp_path, stub)
+    assert truncated == [] and set(stub.radii) == {1000}
+    assert "Warning" not in capsys.readouterr().out
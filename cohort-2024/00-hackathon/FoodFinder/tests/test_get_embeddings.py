@@ -0,0 +1,57 @@
+import os
+import sys
+
+import numpy as np
+
+# Add the FoodFinder directory to the sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from get_embeddings import EmbeddingBundle, get_embeddings
+from place_store import PlaceStore
+
+DIM = 4
+
+
+class StubModel:
+    """Stands in for a SentenceTransformer: encodes a text as normalised letter counts."""
+
+    def get_sentence_embedding_dimension(self):
+        return DIM
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False):
+        if not texts:
+            return np.asarray([])  # Like SentenceTransformer: no second axis
+        vectors = np.asarray([[text.count(c) + 1 for c in "aeio"] for text in texts], dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def write_store(tmp_path, places):
+    store = PlaceStore(str(tmp_path / "places.jsonl"))
+    store.upsert_many(places)
+    return store.file_path
+
+
+def test_distinct_types_are_encoded_once(tmp_path):
+    path = write_store(tmp_path, [
+        {"id": "a", "types": ["italian_restaurant", "cafe"]},
+        {"id": "b", "types": ["cafe"]},
+        {"id": "c", "types": []},
+    ])
+    bundle = get_embeddings(StubModel(), path, str(tmp_path / "emb"))
+    assert bundle.types == ["italian_restaurant", "cafe"]
+    assert bundle.vectors.shape == (2, DIM)
+    vectors = bundle.place_vectors()
+    assert vectors.shape == (3, DIM)
+    assert np.allclose(vectors[1], bundle.vectors[1]) and not vectors[2].any()
+
+    loaded = EmbeddingBundle.load(str(tmp_path / "emb"))
+    assert np.array_equal(loaded.place_vectors(), vectors)
+
+
+def test_places_without_any_types(tmp_path):
+    path = write_store(tmp_path, [{"id": "a", "types": []}, {"id": "b"}])
+    bundle = get_embeddings(StubModel(), path, str(tmp_path / "emb"))
+    assert bundle.vectors.shape == (0, DIM) and bundle.vectors.dtype == np.float32
+    vectors = bundle.place_vectors()
+    assert vectors.shape == (2, DIM) and not vectors.any()
+    assert EmbeddingBundle.load(str(tmp_path / "emb")).vectors.shape == (0, DIM)
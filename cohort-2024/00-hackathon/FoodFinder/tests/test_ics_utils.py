@@ -0,0 +1,136 @@
+import itertools
+import os
+import sys
+from datetime import datetime
+
+import pytz
+from dateutil.rrule import rrulestr
+
+# Add the FoodFinder directory to the sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ics_utils import EventIndex, OccurrenceCache
+
+UTC = pytz.utc
+
+
+def calendar(*events):
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0"]
+    for fields in events:
+        lines += ["BEGIN:VEVENT", *fields, "END:VEVENT"]
+    lines.append("END:VCALENDAR")
+    return [line + "\r\n" for line in lines]
+
+
+# Weekly at 09:00 London time; British Summer Time starts on 31 March 2024.
+LECTURE = [
+    "UID:lecture",
+    "SUMMARY:Lecture",
+    "DTSTART;TZID=Europe/London:20240320T090000",
+    "DTEND;TZID=Europe/London:20240320T100000",
+    "RRULE:FREQ=WEEKLY;COUNT=4",
+]
+
+
+def starts(events):
+    return [(event['summary'], event['start']) for event in events]
+
+
+def test_recurrence_keeps_local_time_across_dst():
+    index = EventIndex.from_lines(calendar(LECTURE))
+    events = list(index.events_between(datetime(2024, 3, 1, tzinfo=UTC), datetime(2024, 5, 1, tzinfo=UTC)))
+    assert [event['start'] for event in events] == [
+        datetime(2024, 3, 20, 9, tzinfo=UTC),
+        datetime(2024, 3, 27, 9, tzinfo=UTC),
+        datetime(2024, 4, 3, 8, tzinfo=UTC),  # 09:00 BST
+        datetime(2024, 4, 10, 8, tzinfo=UTC),
+    ]
+    assert all(event['end'] - event['start'] == events[0]['end'] - events[0]['start'] for event in events)
+
+    previous_event, next_event = index.previous_and_next(datetime(2024, 4, 3, 8, 30, tzinfo=UTC))
+    assert previous_event['start'] == datetime(2024, 4, 3, 8, tzinfo=UTC)
+    assert next_event['start'] == datetime(2024, 4, 10, 8, tzinfo=UTC)
+
+
+def test_pytz_start_is_expanded_in_its_zone():
+    london = pytz.timezone("Europe/London")
+    event = {
+        'summary': "Lecture", 'description': "", 'location': "",
+        'start': london.localize(datetime(2024, 3, 20, 9)), 'end': london.localize(datetime(2024, 3, 20, 10)),
+        'rrule': "FREQ=WEEKLY;COUNT=3", 'exdates': [],
+    }
+    index = EventIndex([event])
+    _, next_event = index.previous_and_next(datetime(2024, 3, 28, tzinfo=UTC))
+    assert next_event['start'] == datetime(2024, 4, 3, 8, tzinfo=UTC)
+
+
+def test_recurrence_id_replaces_the_occurrence():
+    moved = [
+        "UID:lecture",
+        "SUMMARY:Lecture (moved)",
+        "RECURRENCE-ID;TZID=Europe/London:20240403T090000",
+        "DTSTART;TZID=Europe/London:20240403T140000",
+        "DTEND;TZID=Europe/London:20240403T150000",
+    ]
+    for events in (calendar(LECTURE, moved), calendar(moved, LECTURE)):
+        index = EventIndex.from_lines(events)
+        window = index.events_between(datetime(2024, 4, 1, tzinfo=UTC), datetime(2024, 4, 8, tzinfo=UTC))
+        assert starts(window) == [("Lecture (moved)", datetime(2024, 4, 3, 13, tzinfo=UTC))]
+        previous_event, _ = index.previous_and_next(datetime(2024, 4, 3, 10, tzinfo=UTC))
+        assert previous_event['start'] == datetime(2024, 3, 27, 9, tzinfo=UTC)
+
+
+def test_several_series_keep_their_own_events():
+    seminar = ["UID:seminar", "SUMMARY:Seminar", "DTSTART:20240321T120000Z", "DTEND:20240321T130000Z",
+               "RRULE:FREQ=WEEKLY;COUNT=2"]
+    index = EventIndex.from_lines(calendar(LECTURE, seminar))
+    window = index.events_between(datetime(2024, 3, 20, tzinfo=UTC), datetime(2024, 3, 29, tzinfo=UTC))
+    assert starts(window) == [
+        ("Lecture", datetime(2024, 3, 20, 9, tzinfo=UTC)),
+        ("Seminar", datetime(2024, 3, 21, 12, tzinfo=UTC)),
+        ("Lecture", datetime(2024, 3, 27, 9, tzinfo=UTC)),
+        ("Seminar", datetime(2024, 3, 28, 12, tzinfo=UTC)),
+    ]
+
+
+def test_example_calendar_still_parses():
+    with open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "example.ics"), 'rb') as f:
+        index = EventIndex.from_lines(f)
+    assert len(index) > 0
+
+
+def test_lookups_in_a_long_series_do_not_rewalk_it():
+    daily = ["UID:daily", "SUMMARY:Standup", "DTSTART;TZID=Europe/London:20150105T093000",
+             "DTEND;TZID=Europe/London:20150105T094500", "RRULE:FREQ=DAILY;UNTIL=20261231T000000Z"]
+    index = EventIndex.from_lines(calendar(daily))
+    occurrences = index.recurring[0][1]
+
+    previous_event, next_event = index.previous_and_next(datetime(2026, 6, 1, 12, tzinfo=UTC))
+    assert previous_event['start'] == datetime(2026, 6, 1, 8, 30, tzinfo=UTC)  # 09:30 BST
+    assert next_event['start'] == datetime(2026, 6, 2, 8, 30, tzinfo=UTC)
+    generated = len(occurrences.starts)
+    assert generated == (datetime(2026, 6, 2) - datetime(2015, 1, 5)).days + 1  # Only up to the next occurrence
+
+    # Earlier lookups only bisect; later ones only generate the occurrences in between.
+    for day in range(1, 29):
+        index.previous_and_next(datetime(2026, 2, day, 12, tzinfo=UTC))
+    assert len(list(index.events_between(datetime(2020, 3, 1, tzinfo=UTC), datetime(2020, 3, 8, tzinfo=UTC)))) == 7
+    assert len(occurrences.starts) == generated
+    index.previous_and_next(datetime(2026, 6, 8, 12, tzinfo=UTC))
+    assert len(occurrences.starts) == generated + 7
+
+    _, next_event = index.previous_and_next(datetime(2027, 1, 1, tzinfo=UTC))
+    assert next_event is None
+
+
+def test_full_occurrence_cache_falls_back_to_dateutil():
+    rule = rrulestr("FREQ=WEEKLY;BYDAY=MO,TH", dtstart=datetime(2024, 1, 1, 9, tzinfo=UTC), forceset=True)
+    rule.exdate(datetime(2024, 1, 11, 9, tzinfo=UTC))
+    occurrences = OccurrenceCache(rule, max_size=5)
+    for time in [datetime(2023, 12, 1, tzinfo=UTC), datetime(2024, 1, 8, 9, tzinfo=UTC),
+                 datetime(2024, 1, 10, tzinfo=UTC), datetime(2024, 3, 1, tzinfo=UTC)]:
+        assert occurrences.before(time) == rule.before(time, inc=True)
+        assert occurrences.after(time) == rule.after(time)
+        expected = list(itertools.islice(rule.xafter(time, inc=True), 8))
+        assert list(itertools.islice(occurrences.xafter(time), 8)) == expected
+    assert len(occurrences.starts) == 5
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+# Add the FoodFinder directory to the sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import llm_generate
+from llm_generate import AdaptiveRateLimiter, enrich_places, restaurant_cache_key
+from place_store import PlaceStore
+
+
+class StubClient:
+    """Stands in for GeminiClient: answers every restaurant of a prompt, failing the first `failures` calls."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def generate(self, prompt):
+        names = [line.split(": ", 1)[1] for line in prompt.splitlines() if line.startswith("Restaurant Name: ")]
+        with self.lock:
+            self.prompts.append(names)
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError("503 Service Unavailable")
+        return json.dumps([{"spicy_level": "High", "price_level": f"{name} price"} for name in names])
+
+
+def make_place(name):
+    return {"id": f"id-{name}", "displayName": {"text": name}, "types": ["restaurant"]}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Records the rate limiter's delays and advances a fake clock instead of sleeping."""
+    clock = FakeClock()
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+        clock.now += delay
+
+    monkeypatch.setattr(llm_generate, "time", clock)
+    monkeypatch.setattr(llm_generate.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+def enrich(places, client, cache, **kwargs):
+    kwargs.setdefault("batch_size", 2)
+    kwargs.setdefault("concurrency", 1)
+    return asyncio.run(enrich_places(places, client, cache, **kwargs))
+
+
+def test_cached_places_are_not_sent(tmp_path, sleeps):
+    cache = PlaceStore(str(tmp_path / "cache.jsonl"), key="key")
+    places = [make_place(name) for name in "abc"]
+    cache.upsert({"key": restaurant_cache_key(places[0]), "spicy_level": "None", "price_level": "cached"})
+    client = StubClient()
+
+    results = enrich(places + [make_place("b")], client, cache)
+    assert client.prompts == [["b", "c"]]  # "a" is cached and the duplicate "b" is sent once
+    assert results[0] == {"id": "id-a", "spicy_level": "None", "price_level": "cached"}
+    assert [result["price_level"] for result in results[1:]] == ["b price", "c price", "b price"]
+
+    client.prompts.clear()
+    enrich(places, client, cache)
+    assert client.prompts == []
+
+
+def test_failed_batch_is_retried(tmp_path, sleeps):
+    cache = PlaceStore(str(tmp_path / "cache.jsonl"), key="key")
+    client = StubClient(failures=2)
+    results = enrich([make_place("a")], client, cache, max_retries=3)
+    assert client.prompts == [["a"]] * 3
+    assert results == [{"id": "id-a", "spicy_level": "High", "price_level": "a price"}]
+
+
+def test_batch_failing_every_retry_is_left_uncached(tmp_path, sleeps):
+    cache = PlaceStore(str(tmp_path / "cache.jsonl"), key="key")
+    client = StubClient(failures=10)
+    results = enrich([make_place("a")], client, cache, max_retries=2)
+    assert len(client.prompts) == 3
+    assert results == [{"id": "id-a"}]
+    assert len(cache) == 0
+
+    client.failures = 0
+    assert enrich([make_place("a")], client, cache)[0]["spicy_level"] == "High"
+
+
+def test_rate_limiter_backs_off_after_errors(tmp_path, sleeps):
+    cache = PlaceStore(str(tmp_path / "cache.jsonl"), key="key")
+    rate_limiter = AdaptiveRateLimiter(max_interval=4.0)
+    enrich([make_place("a")], StubClient(failures=3), cache, max_retries=3, rate_limiter=rate_limiter)
+    # The gap doubles after each failure (1, 2, 4 s) and the retries wait for it.
+    assert sleeps == [1.0, 2.0, 4.0]
+    assert rate_limiter.interval == pytest.approx(4.0 * 0.8)
+
+
+def test_rate_limiter_recovers_after_successes():
+    rate_limiter = AdaptiveRateLimiter(max_interval=4.0)
+    for _ in range(5):
+        rate_limiter.on_error()
+    assert rate_limiter.interval == 4.0
+    for _ in range(30):
+        rate_limiter.on_success()
+    assert rate_limiter.interval == 0.0
@@ -0,0 +1,143 @@
+import os
+import sys
+
+import pytest
+
+# Add the FoodFinder directory to the sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import get_data
+from ics_utils import EventIndex
+from location_resolver import LocationResolver, NominatimGeocoder, coordinates_from_text, host_rate_limiter
+
+
+@pytest.mark.parametrize("text", [
+    "https://www.google.com/maps/search/?api=1&query=53.4668,-2.2339",
+    "Room 1.1 https://www.google.co.uk/maps/place/Kilburn+Building/@53.4668,-2.2339,17z/data=!3m1",
+    "https://maps.apple.com/?q=53.4668,-2.2339",
+    "https://maps.google.com/?daddr=53.4668%2C-2.2339",
+    "https://www.openstreetmap.org/?mlat=53.4668&mlon=-2.2339#map=17/53.4668/-2.2339",
+    "https://www.openstreetmap.org/way/123#map=17/53.4668/-2.2339",
+    "Meet at geo:53.4668,-2.2339",
+    "Escaped in ICS: geo:53.4668\\,-2.2339",
+])
+def test_map_links(text):
+    assert coordinates_from_text(text) == (53.4668, -2.2339)
+
+
+def test_links_without_valid_coordinates():
+    assert coordinates_from_text(None) == (None, None)
+    assert coordinates_from_text("Room 1.1, Kilburn Building") == (None, None)
+    assert coordinates_from_text("geo:153.4,-2.23") == (None, None)  # Latitude out of range
+    assert coordinates_from_text("geo:153.4,-2.23 geo:53.4,-2.23") == (53.4, -2.23)
+
+
+class StubGeocoder:
+    def __init__(self, known):
+        self.known = known
+        self.queries = []
+
+    def __call__(self, query):
+        self.queries.append(query)
+        return self.known.get(query)
+
+
+def test_resolve_prefers_links_then_coordinates_then_geocoder():
+    geocoder = StubGeocoder({"Kilburn Building": (53.4675, -2.2340)})
+    resolver = LocationResolver(geocoder, cache_path=None)
+    assert resolver.resolve("geo:53.1,-2.1", "Kilburn Building") == (53.1, -2.1)
+    assert resolver.resolve("", " 53.2 , -2.2 ") == (53.2, -2.2)
+    assert resolver.resolve("", "None") == (None, None)
+    assert resolver.resolve(None, "Kilburn Building") == (53.4675, -2.2340)
+    assert geocoder.queries == ["Kilburn Building"]
+
+
+def test_geocode_cache_persists_hits_and_misses(tmp_path):
+    cache_path = str(tmp_path / "geocode_cache.jsonl")
+    geocoder = StubGeocoder({"Kilburn Building": (53.4675, -2.2340)})
+    resolver = LocationResolver(geocoder, cache_path=cache_path)
+    assert resolver.geocode("Kilburn Building") == (53.4675, -2.2340)
+    assert resolver.geocode("kilburn  building ") == (53.4675, -2.2340)  # Normalised to the same key
+    assert resolver.geocode("Nowhere") == (None, None)
+    assert resolver.geocode("nowhere") == (None, None)
+    assert geocoder.queries == ["Kilburn Building", "Nowhere"]
+
+    geocoder = StubGeocoder({})
+    reloaded = LocationResolver(geocoder, cache_path=cache_path)
+    assert reloaded.geocode("Kilburn Building") == (53.4675, -2.2340)
+    assert reloaded.geocode("Nowhere") == (None, None)
+    assert geocoder.queries == []
+
+
+def test_failed_geocodes_are_retried(tmp_path):
+    calls = []
+
+    def failing(query):
+        calls.append(query)
+        raise OSError("timed out")
+
+    resolver = LocationResolver(failing, cache_path=str(tmp_path / "geocode_cache.jsonl"))
+    assert resolver.geocode("Kilburn Building") == (None, None)
+    assert resolver.geocode("Kilburn Building") == (None, None)
+    assert len(calls) == 2 and not resolver.is_cached("Kilburn Building")
+
+
+def ics_with_locations(*locations):
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0"]
+    for i, location in enumerate(locations):
+        lines += ["BEGIN:VEVENT", f"UID:{i}", f"SUMMARY:Event {i}", f"DTSTART:202403{20 + i}T090000Z",
+                  f"DTEND:202403{20 + i}T100000Z", f"LOCATION:{location}", "END:VEVENT"]
+    lines.append("END:VCALENDAR")
+    return [line + "\r\n" for line in lines]
+
+
+def test_each_upload_geocodes_a_limited_number_of_locations():
+    places = {f"Building {i}": (53.46, -2.23 + i / 100) for i in range(5)}
+    geocoder = StubGeocoder(places)
+    resolver = LocationResolver(geocoder, cache_path=None, max_geocodes=2)
+    lines = ics_with_locations("Building 0", "Building 1", "Building 0", "Building 2", "53.5, -2.2", "Building 3")
+
+    index = EventIndex.from_lines(lines, resolver)
+    assert [(event['lat'], event['lng']) for event in index.events] == [
+        places["Building 0"], places["Building 1"], places["Building 0"], (None, None), (53.5, -2.2), (None, None)]
+    assert geocoder.queries == ["Building 0", "Building 1"]
+
+    # The next upload has its own budget, and the cached locations do not use it.
+    index = EventIndex.from_lines(lines, resolver)
+    assert [event['lat'] is not None for event in index.events] == [True] * 6
+    assert geocoder.queries == ["Building 0", "Building 1", "Building 2", "Building 3"]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.delays = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.delays.append(delay)
+        self.now += delay
+
+
+def test_geocoders_share_one_rate_limit_per_host(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(get_data, "time", clock)
+    endpoint = "https://nominatim.example.test/search"
+    first, second = NominatimGeocoder(endpoint), NominatimGeocoder(endpoint)
+    assert first.rate_limiter is second.rate_limiter is host_rate_limiter(endpoint + "?q=x")
+    assert host_rate_limiter("https://other.example.test/search") is not first.rate_limiter
+
+    requests_made = []
+
+    def get(url, params, timeout):
+        requests_made.append(clock.now)
+        raise OSError("offline")
+
+    for geocoder in (first, second, first):
+        monkeypatch.setattr(geocoder.session, "get", get)
+        resolver = LocationResolver(geocoder, cache_path=None)
+        assert resolver.geocode(f"Place {len(requests_made)}") == (None, None)
+    assert len(requests_made) == 3
+    assert requests_made[1] - requests_made[0] >= 1.0 and requests_made[2] - requests_made[1] >= 1.0
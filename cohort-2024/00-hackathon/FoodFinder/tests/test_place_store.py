@@ -0,0 +1,75 @@
+import io
+import json
+import os
+import sys
+
+import pytest
+
+# Add the FoodFinder directory to the sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from place_store import PlaceStore, iter_places
+
+
+def write_lines(path, lines):
+    with open(path, 'wb') as f:
+        f.write(b"".join(lines))
+
+
+def record_line(place_id, name):
+    return (json.dumps({"id": place_id, "name": name}) + "\n").encode()
+
+
+def test_upsert_skips_unchanged_records(tmp_path):
+    store = PlaceStore(str(tmp_path / "places.jsonl"))
+    assert store.upsert_many([{"id": "a", "name": "A"}, {"id": "b", "name": "B"}]) == 2
+    assert store.upsert_many([{"id": "a", "name": "A"}, {"id": "b", "name": "B2"}]) == 1
+    assert [place["name"] for place in PlaceStore(store.file_path)] == ["A", "B2"]
+
+
+def test_writer_truncates_only_a_torn_final_line(tmp_path):
+    path = tmp_path / "places.jsonl"
+    write_lines(path, [record_line("a", "A"), record_line("b", "B"), b'{"id": "c", "na'])
+    store = PlaceStore(str(path))
+    assert store.ids() == ["a", "b"]
+    assert path.read_bytes() == record_line("a", "A") + record_line("b", "B")
+    store.upsert({"id": "c", "name": "C"})
+    assert [place["id"] for place in iter_places(str(path))] == ["a", "b", "c"]
+
+
+def test_corrupt_middle_line_is_skipped_not_truncated(tmp_path):
+    path = tmp_path / "places.jsonl"
+    content = record_line("a", "A") + b"not json\n" + record_line("b", "B")
+    write_lines(path, [content])
+    store = PlaceStore(str(path))
+    assert store.ids() == ["a", "b"]
+    assert store.get("b")["name"] == "B"
+    assert path.read_bytes() == content
+
+
+def test_unterminated_final_record_is_kept(tmp_path):
+    path = tmp_path / "places.jsonl"
+    write_lines(path, [record_line("a", "A").rstrip(b"\n")])
+    store = PlaceStore(str(path))
+    store.upsert({"id": "b", "name": "B"})
+    assert [place["id"] for place in iter_places(str(path))] == ["a", "b"]
+
+
+def test_read_only_store_never_writes(tmp_path):
+    path = tmp_path / "places.jsonl"
+    content = record_line("a", "A") + b'{"id": "b"'
+    write_lines(path, [content])
+    assert [place["id"] for place in iter_places(str(path))] == ["a"]
+    assert path.read_bytes() == content
+    store = PlaceStore(str(path), read_only=True)
+    with pytest.raises(io.UnsupportedOperation):
+        store.upsert({"id": "c"})
+    with pytest.raises(io.UnsupportedOperation):
+        store.compact()
+    assert path.read_bytes() == content
+
+
+def test_iter_places_missing_file_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        list(iter_places(str(tmp_path / "missing.jsonl")))
+    assert not os.path.exists(tmp_path / "missing.jsonl")
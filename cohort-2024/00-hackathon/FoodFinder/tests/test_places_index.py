@@ -0,0 +1,143 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the FoodFinder directory to the sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from places_index import PlacesIndex, ScoringModel, top_k_positions
+from places_loader import build_places_dataframe
+
+HOME = (53.46, -2.23)
+KM_PER_DEGREE = 111.195  # Along a meridian
+
+
+def make_place(place_id, km_north=0.0, types=("restaurant",), spicy_level=None, price_level=None,
+               rating=4.0, count=10):
+    return {
+        "id": place_id,
+        "types": list(types),
+        "location": {"latitude": HOME[0] + km_north / KM_PER_DEGREE, "longitude": HOME[1]},
+        "displayName": {"text": place_id},
+        "rating": rating,
+        "userRatingCount": count,
+        "spicy_level": spicy_level,
+        "price_level": price_level,
+    }
+
+
+def make_index(places):
+    return PlacesIndex(build_places_dataframe(places))
+
+
+def query_ids(index, **kwargs):
+    """IDs of every match, best first."""
+    rows, _, total = index.query(*HOME, *HOME, page_size=len(index), **kwargs)
+    assert len(rows) == total
+    return [index.column("id")[row] for row in rows]
+
+
+@pytest.fixture
+def index():
+    return make_index([
+        make_place("near_thai", 0.5, types=("thai_restaurant", "restaurant"), spicy_level="High", price_level=2),
+        make_place("far_thai", 3.0, types=("thai_restaurant",), spicy_level="High", price_level=1),
+        make_place("pizza", 1.0, types=("pizza_restaurant", "italian_restaurant"), spicy_level="Low", price_level=2),
+        make_place("cafe", 2.0, types=("cafe",)),
+    ])
+
+
+def test_distances_are_the_detour_there_and_back(index):
+    _, distance_km, _ = index.query(*HOME, *HOME)
+    assert list(distance_km) == pytest.approx([1.0, 6.0, 2.0, 4.0], abs=1e-3)
+
+
+def test_max_distance_filter(index):
+    assert query_ids(index, max_distance=4.0) == ["near_thai", "pizza", "cafe"]
+    assert query_ids(index, max_distance=1.5) == ["near_thai"]
+    assert query_ids(index, max_distance=0.5) == []
+
+
+def test_types_mask_matches_any_type(index):
+    assert list(index.types_mask(["thai_restaurant"])) == [True, True, False, False]
+    assert list(index.types_mask(["italian_restaurant", "cafe"])) == [False, False, True, True]
+    assert query_ids(index, types_to_filter=["thai_restaurant"]) == ["near_thai", "far_thai"]
+
+
+def test_spice_and_price_masks(index):
+    assert list(index.equals_mask("spicyLevel", "High")) == [True, True, False, False]
+    assert list(index.equals_mask("priceLevel", 2)) == [True, False, True, False]
+    assert query_ids(index, spicy_level="High", price_level=2) == ["near_thai"]
+    assert query_ids(index, spicy_level="Medium") == []
+
+
+def test_queries_never_write_the_shared_arrays(index):
+    before = {name: index.column(name).copy() for name in ("id", "types", "latitude", "rating", "spicyLevel")}
+    index.query(*HOME, *HOME, max_distance=4.0, types_to_filter=["restaurant"], spicy_level="High", price_level=2)
+    index.query(HOME[0] + 0.01, HOME[1], *HOME, similarity=np.linspace(0, 1, len(index)), min_similarity=0.2)
+
+    for name, values in before.items():
+        column = index.column(name)
+        assert not column.flags.writeable
+        assert np.array_equal(column, values)
+        with pytest.raises(ValueError):
+            column[0] = column[1]
+    mask = index.types_mask(["restaurant"])
+    assert mask is index.types_mask(["restaurant"]) and not mask.flags.writeable
+
+
+def test_empty_index():
+    index = make_index([])
+    rows, distance_km, total = index.query(*HOME, *HOME, max_distance=1.0, types_to_filter=["cafe"])
+    assert len(rows) == len(distance_km) == total == 0
+    assert index.unique_types() == set()
+
+
+def test_bayesian_rating_shrinks_towards_the_mean():
+    model = ScoringModel(popularity_weight=0.0, rating_prior_count=20)
+    ratings = np.array([5.0, 4.7, 3.0, np.nan])
+    counts = np.array([2.0, 2000.0, 100.0, 50.0])
+    scores = model.static_scores(ratings, counts)
+    mean = (5.0 * 2 + 4.7 * 2000 + 3.0 * 100) / 2102  # The unrated place does not count
+    assert scores[0] == pytest.approx(((20 * mean + 5.0 * 2) / 22 - 1) / 4)
+    assert scores[1] > scores[0]  # A 4.7 from 2000 reviews beats a 5.0 from two
+    assert scores[3] == pytest.approx((mean - 1) / 4)  # No rating: exactly the mean
+    assert ScoringModel(popularity_weight=0.0).static_scores(np.array([np.nan]), np.array([0.0])) == [0.5]
+
+
+def test_popularity_is_relative_to_the_most_reviewed_place():
+    model = ScoringModel(rating_weight=0.0, popularity_weight=1.0)
+    scores = model.static_scores(np.array([4.0, 4.0, 4.0]), np.array([0.0, 9.0, 99.0]))
+    assert scores == pytest.approx([0.0, np.log(10) / np.log(100), 1.0])
+    assert not model.static_scores(np.array([np.nan, np.nan]), np.array([0.0, 0.0])).any()
+
+
+def test_score_combines_distance_and_similarity():
+    model = ScoringModel(distance_weight=2.0, similarity_weight=0.5, distance_scale_km=4.0)
+    scores = model.score(np.array([1.0, 1.0]), np.array([0.0, 2.0]), np.array([0.2, 1.0]))
+    assert scores == pytest.approx([1.1, 0.5])
+
+
+@pytest.mark.parametrize("page_size", [1, 3, 4, 7])
+def test_pages_list_every_match_once_with_ties(page_size):
+    rng = np.random.default_rng(0)
+    scores = rng.choice([0.1, 0.5, 0.9], size=50)  # Mostly ties
+    pages = []
+    for start in range(0, len(scores) + page_size, page_size):
+        pages.extend(top_k_positions(scores, start, start + page_size).tolist())
+    assert sorted(pages) == list(range(len(scores)))
+    # Best first, ties in position order.
+    assert pages == sorted(range(len(scores)), key=lambda i: (-scores[i], i))
+
+
+def test_query_pages_with_tied_scores():
+    # Identical places at the same spot all score the same.
+    index = make_index([make_place(f"p{i:02d}", 1.0) for i in range(23)])
+    seen = []
+    for page in range(1, 7):  # The sixth page is empty
+        rows, _, total = index.query(*HOME, *HOME, page=page, page_size=5)
+        assert total == 23
+        seen.extend(index.column("id")[rows])
+    assert seen == [f"p{i:02d}" for i in range(23)]
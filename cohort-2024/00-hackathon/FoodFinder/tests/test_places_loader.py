@@ -0,0 +1,69 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Add the FoodFinder directory to the sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from place_store import PlaceStore
+from places_index import PlacesIndex
+from places_loader import PLACE_DTYPES, build_places_dataframe, load_places_cached, load_places_dataframe
+
+
+def make_place(place_id, status="OPERATIONAL"):
+    return {
+        "id": place_id,
+        "types": ["restaurant"],
+        "location": {"latitude": 53.46, "longitude": -2.23},
+        "displayName": {"text": place_id, "languageCode": "en"},
+        "businessStatus": status,
+        "rating": 4.5,
+        "userRatingCount": 10,
+    }
+
+
+def test_places_without_attributes_get_null_attributes():
+    places = [make_place("a"), make_place("b"), make_place("c")]
+    attributes = {"a": {"id": "a", "spicy_level": "High", "price_level": "Low Price"}}
+    df = build_places_dataframe(places, attributes)
+    assert list(df["id"]) == ["a", "b", "c"]
+    assert list(df.dtypes.astype(str)) == list(PLACE_DTYPES.values())
+    assert df.loc[0, "spicyLevel"] == "High" and df.loc[0, "priceLevel"] == "Low Price"
+    assert df["spicyLevel"][1:].isna().all() and df["priceLevel"][1:].isna().all()
+
+
+def test_partially_enriched_store_loads(tmp_path):
+    places = PlaceStore(str(tmp_path / "places.jsonl"))
+    places.upsert_many([make_place("a"), make_place("b"), make_place("closed", status="CLOSED_PERMANENTLY")])
+    attributes = PlaceStore(str(tmp_path / "attributes.jsonl"))
+    attributes.upsert_many([{"id": "a", "spicy_level": "High"}, {"id": "closed", "spicy_level": "Low"}])
+
+    df = load_places_dataframe(places.file_path, attributes.file_path)
+    assert list(df["id"]) == ["a", "b"]
+    assert df.loc[0, "spicyLevel"] == "High" and pd.isna(df.loc[1, "spicyLevel"])
+
+    index = PlacesIndex(df)
+    assert list(index.equals_mask("spicyLevel", "High")) == [True, False]
+
+
+@pytest.mark.parametrize("corrupt", [lambda data: b"not parquet at all", lambda data: data[:len(data) // 2]])
+def test_corrupt_cache_is_rebuilt(tmp_path, capsys, corrupt):
+    places = PlaceStore(str(tmp_path / "places.jsonl"))
+    places.upsert_many([make_place("a"), make_place("b")])
+    attributes = PlaceStore(str(tmp_path / "attributes.jsonl"))
+    attributes.upsert_many([{"id": "a", "spicy_level": "High"}])
+    cache_path = str(tmp_path / "places.parquet")
+    load_places_cached(places.file_path, attributes.file_path, cache_path)
+
+    # The manifest still matches the sources, but the table it describes is unreadable.
+    with open(cache_path, 'rb') as f:
+        data = f.read()
+    with open(cache_path, 'wb') as f:
+        f.write(corrupt(data))
+
+    df = load_places_cached(places.file_path, attributes.file_path, cache_path)
+    assert list(df["id"]) == ["a", "b"]
+    assert "Ignoring unreadable places cache" in capsys.readouterr().out
+    assert list(pd.read_parquet(cache_path)["id"]) == ["a", "b"]
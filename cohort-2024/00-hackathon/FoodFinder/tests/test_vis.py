@@ -0,0 +1,62 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Add the FoodFinder directory to the sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from place_store import PlaceStore
+from vis import place_filter, visualize_places
+
+SCRIPT_NAME = '<img src=x onerror="alert(1)">'
+
+
+def make_place(name, price="PRICE_LEVEL_MODERATE", types=("restaurant",)):
+    return {"id": name, "displayName": {"text": name}, "location": {"latitude": 53.46, "longitude": -2.23},
+            "businessStatus": "OPERATIONAL", "priceLevel": price, "types": list(types)}
+
+
+def test_place_filter():
+    matches = place_filter({"businessStatus": "OPERATIONAL", "priceLevel": ["PRICE_LEVEL_MODERATE", "PRICE_LEVEL_CHEAP"]})
+    assert matches(make_place("a"))
+    assert not matches(make_place("a", price="PRICE_LEVEL_EXPENSIVE"))
+    assert not matches({"displayName": {"text": "a"}})
+
+
+def test_place_filter_with_unhashable_values():
+    matches = place_filter({"types": [["restaurant"], ["cafe", "bar"]]})
+    assert matches(make_place("a"))
+    assert not matches(make_place("a", types=("bar",)))
+    assert place_filter({"location": {"latitude": 53.46, "longitude": -2.23}})(make_place("a"))
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    store = PlaceStore(str(tmp_path / "places.jsonl"))
+    store.upsert_many([make_place("Fish & Chips"), make_place(SCRIPT_NAME)])
+    return store.file_path
+
+
+@pytest.mark.parametrize("cluster", [True, False])
+def test_names_are_escaped_in_the_map(tmp_path, store_path, cluster):
+    output = tmp_path / "map.html"
+    visualize_places(store_path, str(output), cluster=cluster)
+    page = output.read_text().replace("\\u0026", "&")  # The cluster data is JSON-encoded
+    assert "<img src=x" not in page
+    assert "&lt;img src=x onerror=&quot;alert(1)&quot;&gt;" in page
+    assert "Fish &amp; Chips" in page
+
+
+def test_names_are_escaped_in_the_geojson(tmp_path, store_path):
+    visualize_places(store_path, str(tmp_path / "map.html"), geojson_path=str(tmp_path / "places.geojson"))
+    with open(tmp_path / "places.geojson") as f:
+        names = [feature["properties"]["name"] for feature in json.load(f)["features"]]
+    assert names == ["Fish &amp; Chips", "&lt;img src=x onerror=&quot;alert(1)&quot;&gt;"]
+
+
+def test_missing_store_is_reported(tmp_path, capsys):
+    visualize_places(str(tmp_path / "missing.jsonl"), str(tmp_path / "map.html"))
+    assert "not found" in capsys.readouterr().out
+    assert not os.path.exists(tmp_path / "map.html")
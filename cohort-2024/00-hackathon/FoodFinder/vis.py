@@ -1,55 +1,117 @@
+import html
 import json
+import os
 import folium
+from folium.plugins import FastMarkerCluster
+from place_store import iter_places, PLACES_STORE_PATH
 
-def visualize_places(json_file_path="all_places_response.json", output_html="places_map.html", **filters):
+# Builds each clustered marker in the browser from a [lat, lng, name] row.
+# Popups and tooltips render HTML, so names are escaped before they are written out.
+MARKER_CALLBACK = """
+function (row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    marker.bindPopup(row[2]);
+    marker.bindTooltip(row[2]);
+    return marker;
+}
+"""
+
+
+def place_filter(filters):
+    """
+    Combines field filters into a single predicate over places.
+
+    A list value matches any of its elements, any other value must be equal.
+    Values are compared with ==, so unhashable ones (lists, dicts) work too.
+    """
+    conditions = [
+        (key, tuple(value) if isinstance(value, list) else (value,))
+        for key, value in filters.items()
+    ]
+    return lambda place: all(place.get(key) in allowed for key, allowed in conditions)
+
+
+def write_places_geojson(rows, output_path):
+    """Writes [lat, lng, name] rows as a compact GeoJSON FeatureCollection of points."""
+    features = [
+        {"type": "Feature", "geometry": {"type": "Point", "coordinates": [lng, lat]}, "properties": {"name": name}}
+        for lat, lng, name in rows
+    ]
+    with open(output_path, 'w') as f:
+        json.dump({"type": "FeatureCollection", "features": features}, f, separators=(",", ":"))
+
+
+def visualize_places(json_file_path=PLACES_STORE_PATH, output_html="places_map.html", cluster=True, geojson_path=None, **filters):
     """
     Visualizes places from a JSON file on an interactive map.
 
+    Places are filtered in a single streaming pass that keeps only their coordinates
+    and HTML-escaped names. By default they are drawn with a FastMarkerCluster, whose markers are
+    created in the browser only when their cluster is expanded, so tens of thousands
+    of places stay responsive. With `geojson_path`, the points are written to that
+    GeoJSON file instead, which the map loads at view time, keeping the HTML small.
+
     Args:
         json_file_path (str): Path to the JSON file containing places data.
         output_html (str): Path to save the generated HTML map file.
+        cluster (bool): Cluster the markers; if False, one folium.Marker is added per place.
+        geojson_path (str): Optional GeoJSON sidecar to write and reference instead of inline markers.
         filters (dict): Key-value pairs to filter places by specific fields.
     """
+    matches = place_filter(filters)
+    rows = []
+    latitude_sum = longitude_sum = 0.0
     try:
-        with open(json_file_path, 'r') as f:
-            places = json.load(f)
+        for place in iter_places(json_file_path):
+            if not matches(place):
+                continue
+            location = place['location']
+            rows.append((location['latitude'], location['longitude'], html.escape(place['displayName']['text'])))
+            latitude_sum += location['latitude']
+            longitude_sum += location['longitude']
     except FileNotFoundError:
         print(f"Error: JSON file not found at '{json_file_path}'")
         return
     except json.JSONDecodeError:
         print(f"Error: Invalid JSON format in '{json_file_path}'")
         return
-
+    print(len(rows))
 
     # Calculate the center of all places for initial map view
-    for key, value in filters.items():
-        if isinstance(value, list):
-            places = [place for place in places if place.get(key) in value]
-        else:
-            places = [place for place in places if place.get(key) == value]
-    print(len(places))
-    latitudes = [place['location']['latitude'] for place in places]
-    longitudes = [place['location']['longitude'] for place in places]
-    center_latitude = sum(latitudes) / len(latitudes) if latitudes else 0
-    center_longitude = sum(longitudes) / len(longitudes) if longitudes else 0
+    center_latitude = latitude_sum / len(rows) if rows else 0
+    center_longitude = longitude_sum / len(rows) if rows else 0
 
     # Create a Folium map centered around the average location
-    m = folium.Map(location=[center_latitude, center_longitude], zoom_start=12) # Adjust zoom_start as needed
-
-    for place in places:
-        location = place['location']
-        display_name = place['displayName']['text']
+    m = folium.Map(location=[center_latitude, center_longitude], zoom_start=12, prefer_canvas=True) # Adjust zoom_start as needed
 
-        folium.Marker(
-            location=[location['latitude'], location['longitude']],
-            popup=display_name,
-            tooltip=display_name  # Optional: tooltip on hover
-        ).add_to(m)
+    if geojson_path:
+        write_places_geojson(rows, geojson_path)
+        layer = folium.GeoJson(
+            geojson_path,
+            embed=False,
+            marker=folium.CircleMarker(radius=4, fill=True, fill_opacity=0.8),
+            tooltip=folium.GeoJsonTooltip(fields=["name"], labels=False),
+        )
+        # The browser resolves the link relative to the HTML file, not the working directory.
+        layer.embed_link = os.path.relpath(geojson_path, os.path.dirname(os.path.abspath(output_html)))
+        layer.add_to(m)
+        print(f"Places saved to '{geojson_path}'")
+    elif cluster:
+        FastMarkerCluster([list(row) for row in rows], callback=MARKER_CALLBACK).add_to(m)
+    else:
+        for latitude, longitude, display_name in rows:
+            folium.Marker(
+                location=[latitude, longitude],
+                popup=display_name,
+                tooltip=display_name  # Optional: tooltip on hover
+            ).add_to(m)
 
     m.save(output_html)
     print(f"Map visualization saved to '{output_html}'")
 
 if __name__ == "__main__":
-    visualize_places(businessStatus="OPERATIONAL", priceLevel=["PRICE_LEVEL_EXPENSIVE","PRICE_LEVEL_MODERATE", "PRICE_LEVEL_INEXPENSIVE"]) # Uses default file names: places_response.json and places_map.html
+    visualize_places(businessStatus="OPERATIONAL", priceLevel=["PRICE_LEVEL_EXPENSIVE","PRICE_LEVEL_MODERATE", "PRICE_LEVEL_INEXPENSIVE"]) # Uses default file names: all_places.jsonl and places_map.html
     # To use a different JSON file or output HTML file, you can call the function with arguments:
-    # visualize_places(json_file_path="my_places.json", output_html="my_map.html")
\ No newline at end of file
+    # visualize_places(json_file_path="my_places.json", output_html="my_map.html")
+    # For very large datasets, keep the points out of the HTML:
+    # visualize_places(geojson_path="places_map.geojson", businessStatus="OPERATIONAL")
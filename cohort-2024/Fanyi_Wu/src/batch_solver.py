@@ -0,0 +1,163 @@
+"""!@file batch_solver.py
+@brief Module for solving large files of Sudoku puzzles across a process pool.
+
+@details Puzzles are streamed from the input file with iter_grid_file(), grouped into chunks and dispatched to a
+multiprocessing pool. Results come back in input order (see ordered_results()) and are written as soon as their chunk is done,
+so neither the puzzles nor the solutions are ever held in memory all at once.
+
+The output has exactly one line per input puzzle:
+- the solution on one line (81 digits for a 9x9 puzzle, see format_grid_line()), if the puzzle was solved;
+- '# invalid: ...' or '# unsolvable: ...' followed by the puzzle otherwise.
+"""
+
+import collections
+import itertools
+import multiprocessing
+import time
+from check_input import validate_grid, find_invalid_grids
+from bitmask_solver import BitmaskSudokuSolver
+from dlx_solver import DLXSudokuSolver
+from grid_file import iter_grid_file, format_grid_line
+from sudoku_grid import box_size_of
+
+BATCH_METHODS = ("bitmask", "dlx")
+
+
+def solve_grid(grid, method="bitmask"):
+    """
+    @brief Solve one Sudoku grid without printing anything.
+
+    @param grid A 2D list representing the Sudoku grid (not modified), of any supported size.
+    @param method "bitmask" or "dlx".
+
+    @return The solved grid (new 2D list), or None if the puzzle has no solution.
+    """
+    size = len(grid)
+    box_size = box_size_of(size)
+    if method == "dlx":
+        return DLXSudokuSolver(grid, box_size).solve()
+    solver = BitmaskSudokuSolver(grid, box_size)
+    if not solver.solve():
+        return None
+    return [solver.cells[i:i + size] for i in range(0, size * size, size)]
+
+
+def solve_chunk(chunk, method="bitmask"):
+    """
+    @brief Solve a chunk of puzzles (run inside a worker process).
+
+    @details The parsed 9x9 puzzles of the chunk are validated together with find_invalid_grids(); validate_grid() only
+    runs on the invalid ones, to get the error message, and on puzzles of other sizes.
+
+    @param chunk A list of 2D lists (or None for puzzles that could not be parsed).
+    @param method "bitmask" or "dlx".
+
+    @return A list of (status, output line) tuples, status being "solved", "invalid" or "unsolvable".
+    """
+    parsed = [grid for grid in chunk if grid is not None and len(grid) == 9]
+    invalid = iter(find_invalid_grids(parsed) if parsed else [])
+    results = []
+    for grid in chunk:
+        if grid is None:
+            results.append(("invalid", "# invalid: could not parse puzzle"))
+            continue
+        if len(grid) != 9 or next(invalid):
+            try:
+                validate_grid(grid, box_size_of(len(grid)))
+            except ValueError as e:
+                results.append(("invalid", f"# invalid: {format_grid_line(grid)} {e}"))
+                continue
+        solution = solve_grid(grid, method)
+        if solution is None:
+            results.append(("unsolvable", f"# unsolvable: {format_grid_line(grid)}"))
+        else:
+            results.append(("solved", format_grid_line(solution)))
+    return results
+
+
+def ordered_results(pool, tasks, max_pending):
+    """
+    @brief Run solve_chunk() on the pool, yielding results in task order with a bounded number of tasks in flight.
+
+    @details Unlike Pool.imap, which reads the whole task iterator ahead, at most `max_pending` chunks are
+    submitted but not yet written, so memory use does not grow with the input size.
+
+    @param pool A multiprocessing pool.
+    @param tasks An iterable of (chunk, method) tuples.
+    @param max_pending The maximum number of chunks submitted but not yet returned.
+
+    @return A generator of solve_chunk() results.
+    """
+    pending = collections.deque()
+    for task in tasks:
+        pending.append(pool.apply_async(solve_chunk, task))
+        if len(pending) >= max_pending:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def iter_chunks(iterable, chunk_size):
+    """
+    @brief Group an iterable into lists of `chunk_size` items (the last one may be shorter).
+
+    @return A generator of lists.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def solve_file(input_path, output_path, method="bitmask", workers=None, chunk_size=256, report_every=100000):
+    """
+    @brief Solve every puzzle of a file in parallel and write the solutions in order.
+
+    @details Chunks of `chunk_size` puzzles are sent to `workers` processes, which amortises the inter-process
+    communication over many puzzles. At most two chunks per worker are in flight, so memory stays flat however
+    large the file is. Progress and throughput are printed every `report_every` puzzles.
+
+    @param input_path Path of the puzzle file (one 81-character puzzle per line, or boxed grids).
+    @param output_path Path of the output file (one line per puzzle).
+    @param method "bitmask" (default) or "dlx".
+    @param workers Number of worker processes (default: the number of CPUs); 1 solves in this process.
+    @param chunk_size Number of puzzles sent to a worker at a time.
+    @param report_every Number of puzzles between progress reports (0 to disable).
+
+    @return A dictionary of counts ("puzzles", "solved", "invalid", "unsolvable"), "seconds" and "puzzles_per_second".
+
+    @exception ValueError If `method` cannot be used in batch mode.
+    """
+    if method not in BATCH_METHODS:
+        raise ValueError(f"solve_file: Batch mode supports the methods {', '.join(BATCH_METHODS)}, not '{method}'.")
+    workers = workers or multiprocessing.cpu_count()
+    stats = {"puzzles": 0, "solved": 0, "invalid": 0, "unsolvable": 0}
+    start_time = time.perf_counter()
+
+    tasks = ((chunk, method) for chunk in iter_chunks(iter_grid_file(input_path), chunk_size))
+    with open(output_path, 'w') as output:
+        if workers == 1:
+            results = (solve_chunk(*task) for task in tasks)
+            pool = None
+        else:
+            pool = multiprocessing.Pool(workers)
+            results = ordered_results(pool, tasks, 2 * workers)
+        try:
+            for chunk_results in results:
+                for status, line in chunk_results:
+                    output.write(line + '\n')
+                    stats[status] += 1
+                    stats["puzzles"] += 1
+                    if report_every and stats["puzzles"] % report_every == 0:
+                        elapsed = time.perf_counter() - start_time
+                        print(f"solve_file: {stats['puzzles']} puzzles, {stats['puzzles'] / elapsed:.1f} puzzles/s")
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+    stats["seconds"] = time.perf_counter() - start_time
+    stats["puzzles_per_second"] = stats["puzzles"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
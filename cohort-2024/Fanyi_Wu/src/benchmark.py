@@ -0,0 +1,347 @@
+"""!@file benchmark.py
+@brief Benchmark harness for the Sudoku solver backends.
+
+@details Every backend ("bitmask", "backtracking", "dlx") is run over every puzzle set of a corpus directory:
+- one set made of the grids defined in the Puzzles/*.py scripts (read with ast, without running the scripts),
+- one set per puzzle file of its subdirectories (e.g. Puzzles/generated/<level>.txt from puzzle_generator.py).
+Grids rejected by validate_grid() are skipped. For every backend and set the harness reports solves per second,
+p50 and p99 latency (solver setup and search, timed with time.perf_counter_ns()), mean search nodes and the peak
+memory allocated by one solve (measured with tracemalloc in a separate pass, so it does not slow the timed pass).
+
+The results can be saved as a JSON baseline (by default Profiles/benchmark_baseline.json) and later runs compared
+with it: a set is a regression if its throughput drops or its p99 latency grows by more than the tolerance, or if
+its mean search nodes grow at all (beyond rounding). The script then exits with status 1. Timings are scaled by a calibration loop timed with every run, which
+absorbs changes in machine load; still, record the baseline on the machine that runs the comparison.
+Only sets with the same number of puzzles as in the baseline are compared. If any set or backend could not be
+compared (e.g. because --limit differs from the run that saved the baseline) the script says so and, unless it found
+a regression, exits with status 2, so an incomplete comparison never passes as a clean one.
+
+Example Usage: $ python benchmark.py Puzzles --save-baseline
+               $ python benchmark.py Puzzles [--backends bitmask dlx] [--limit 100] [--tolerance 0.5]
+"""
+
+import argparse
+import ast
+import gc
+import glob
+import json
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+from check_input import validate_grid
+from bitmask_solver import BitmaskSudokuSolver
+from dlx_solver import DLXSudokuSolver
+from find_empty import SudokuSolverWithCache
+from main_solver import backtracking_search
+from grid_file import iter_grid_file
+
+BACKENDS = ("bitmask", "backtracking", "dlx")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Profiles", "benchmark_baseline.json")
+MEMORY_SAMPLE = 20  # Puzzles per set measured with tracemalloc
+NODE_TOLERANCE = 0.01  # Search nodes do not depend on the machine, so they are compared almost exactly
+
+
+def load_script_grids(file_path):
+    """
+    @brief Read the grid literals assigned to `grid` in a Python script, without running it.
+
+    @param file_path The path to the script.
+
+    @return A list of 2D lists (empty if the script defines no literal grid).
+    """
+    with open(file_path, 'r') as file:
+        tree = ast.parse(file.read(), file_path)
+    grids = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and any(isinstance(target, ast.Name) and target.id == "grid" for target in node.targets):
+            try:
+                grids.append(ast.literal_eval(node.value))
+            except ValueError:
+                continue  # Not a literal, e.g. grid = read_grid_file(...)
+    return grids
+
+
+def valid_grids(grids):
+    """
+    @brief Keep the grids that pass validate_grid().
+
+    @param grids An iterable of 2D lists (or None).
+
+    @return A list of 2D lists.
+    """
+    kept = []
+    for grid in grids:
+        if grid is None:
+            continue
+        try:
+            validate_grid(grid)
+        except ValueError:
+            continue
+        kept.append(grid)
+    return kept
+
+
+def load_corpus(directory, limit=None):
+    """
+    @brief Load the puzzle sets of a corpus directory.
+
+    @param directory A directory such as Puzzles: its *.py scripts form the set "scripts", and every *.txt file of
+    its subdirectories forms the set "<subdirectory>/<file name>".
+    @param limit The maximum number of puzzles per set (None for all).
+
+    @return A dictionary mapping set names to lists of valid 2D lists.
+    """
+    sets = {}
+    scripts = []
+    for file_path in sorted(glob.glob(os.path.join(directory, "*.py"))):
+        scripts.extend(load_script_grids(file_path))
+    if scripts:
+        sets["scripts"] = valid_grids(scripts)[:limit]
+    for file_path in sorted(glob.glob(os.path.join(directory, "*", "*.txt"))):
+        name = os.path.relpath(file_path, directory).replace(os.sep, "/")[:-len(".txt")]
+        sets[name] = valid_grids(iter_grid_file(file_path))[:limit]
+    return {name: grids for name, grids in sets.items() if grids}
+
+
+def run_backend(backend, grid):
+    """
+    @brief Solve a copy of a grid with one backend.
+
+    @param backend One of BACKENDS.
+    @param grid A valid 9x9 2D list (not modified).
+
+    @return A tuple (solved, nodes).
+
+    @exception ValueError If `backend` is unknown.
+    """
+    grid = [row[:] for row in grid]
+    if backend == "bitmask":
+        solver = BitmaskSudokuSolver(grid)
+        return solver.solve(), solver.nodes
+    if backend == "dlx":
+        solver = DLXSudokuSolver(grid)
+        return solver.solve() is not None, solver.links.nodes
+    if backend == "backtracking":
+        solved, nodes, _ = backtracking_search(SudokuSolverWithCache(grid))
+        return solved, nodes
+    raise ValueError(f"run_backend: Unknown backend '{backend}'.")
+
+
+def peak_memory_kib(backend, grids):
+    """
+    @brief Measure the largest peak of memory allocated while solving one grid.
+
+    @param backend One of BACKENDS.
+    @param grids The grids to measure.
+
+    @return The largest peak in KiB.
+    """
+    peak = 0
+    for grid in grids:
+        tracemalloc.start()
+        try:
+            run_backend(backend, grid)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+    return peak / 1024
+
+
+def benchmark_set(backend, grids, memory_sample=MEMORY_SAMPLE, repeat=3):
+    """
+    @brief Benchmark one backend over one puzzle set.
+
+    @details Like timeit, the garbage collector is disabled while timing and every puzzle is solved `repeat` times,
+    keeping its fastest time, so that the latencies (p99 especially) are stable enough to compare between runs.
+
+    @param backend One of BACKENDS.
+    @param grids A list of valid 2D lists.
+    @param memory_sample The number of grids measured with tracemalloc (0 to skip the memory pass).
+    @param repeat The number of times every puzzle is solved.
+
+    @return A dictionary with "puzzles", "solved", "solves_per_second", "p50_ms", "p99_ms", "mean_nodes" and "peak_kib".
+    """
+    latencies = np.full(len(grids), np.inf)
+    nodes = solved = 0
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for run in range(repeat):
+            for i, grid in enumerate(grids):
+                start = time.perf_counter_ns()
+                grid_solved, grid_nodes = run_backend(backend, grid)
+                latencies[i] = min(latencies[i], time.perf_counter_ns() - start)
+                if run == 0:
+                    solved += grid_solved
+                    nodes += grid_nodes
+    finally:
+        if gc_enabled:
+            gc.enable()
+    total_seconds = latencies.sum() / 1e9
+    p50, p99 = np.percentile(latencies, [50, 99]) / 1e6
+    return {
+        "puzzles": len(grids),
+        "solved": solved,
+        "solves_per_second": len(grids) / total_seconds if total_seconds else 0.0,
+        "p50_ms": float(p50),
+        "p99_ms": float(p99),
+        "mean_nodes": nodes / len(grids),
+        "peak_kib": peak_memory_kib(backend, grids[:memory_sample]) if memory_sample else 0.0,
+    }
+
+
+def run_benchmark(sets, backends=BACKENDS, memory_sample=MEMORY_SAMPLE, repeat=3):
+    """
+    @brief Benchmark every backend over every puzzle set.
+
+    @param sets A dictionary mapping set names to lists of grids (see load_corpus()).
+    @param backends The backends to run.
+    @param memory_sample The number of grids per set measured with tracemalloc.
+    @param repeat The number of times every puzzle is solved (the fastest time is kept).
+
+    @return A nested dictionary: results[backend][set name] is the result of benchmark_set().
+    """
+    return {backend: {name: benchmark_set(backend, grids, memory_sample, repeat) for name, grids in sets.items()}
+            for backend in backends}
+
+
+def calibration_ns(repeat=5):
+    """
+    @brief Time a fixed pure-Python workload, as a measure of the current speed of the machine.
+
+    @details The workload does not use the solvers, so it only changes when the machine (or interpreter) does.
+    Dividing by it makes timings taken at different moments, e.g. under different load, comparable.
+
+    @param repeat The number of runs; the fastest is kept.
+
+    @return The fastest time in nanoseconds.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        total = 0
+        for i in range(200000):
+            total += i * i & 0xFF
+        elapsed = time.perf_counter_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def compare_to_baseline(results, baseline, tolerance=0.5, speed_ratio=1.0):
+    """
+    @brief Find the regressions of a benchmark against a baseline.
+
+    @details Only the backends and sets present in both, with the same number of puzzles, are compared.
+    Baseline timings are scaled by `speed_ratio` first, so that a machine that is slower than when the baseline
+    was recorded (e.g. because it is busy) does not report regressions. Timings vary from run to run, so they get
+    a generous tolerance; search nodes are deterministic and may only grow by NODE_TOLERANCE, which catches
+    algorithmic regressions reliably.
+
+    @param results The results of run_benchmark().
+    @param baseline Earlier results of run_benchmark().
+    @param tolerance The relative change of throughput or p99 latency allowed before it counts as a regression.
+    @param speed_ratio The calibration time now divided by the calibration time of the baseline (see calibration_ns()).
+
+    @return A list of messages, one per regression (empty if there is none).
+    """
+    regressions = []
+    for backend, sets in results.items():
+        for name, result in sets.items():
+            base = baseline.get(backend, {}).get(name)
+            if base is None or base["puzzles"] != result["puzzles"]:
+                continue
+            expected_rate, expected_p99 = base["solves_per_second"] / speed_ratio, base["p99_ms"] * speed_ratio
+            if result["solves_per_second"] < expected_rate * (1 - tolerance):
+                regressions.append(f"{backend} {name}: {result['solves_per_second']:.1f} solves/s, baseline {expected_rate:.1f}")
+            if result["p99_ms"] > expected_p99 * (1 + tolerance):
+                regressions.append(f"{backend} {name}: p99 {result['p99_ms']:.3f} ms, baseline {expected_p99:.3f} ms")
+            if result["mean_nodes"] > base["mean_nodes"] * (1 + NODE_TOLERANCE):
+                regressions.append(f"{backend} {name}: {result['mean_nodes']:.1f} nodes per puzzle, baseline {base['mean_nodes']:.1f}")
+    return regressions
+
+
+def uncompared_sets(results, baseline):
+    """
+    @brief Find the results that compare_to_baseline() cannot compare.
+
+    @param results The results of run_benchmark().
+    @param baseline Earlier results of run_benchmark().
+
+    @return A list of messages, one per backend and set missing from the baseline or with a different number of puzzles.
+    """
+    messages = []
+    for backend, sets in results.items():
+        for name, result in sets.items():
+            base = baseline.get(backend, {}).get(name)
+            if base is None:
+                messages.append(f"{backend} {name}: not in the baseline")
+            elif base["puzzles"] != result["puzzles"]:
+                messages.append(f"{backend} {name}: {result['puzzles']} puzzles, baseline {base['puzzles']}")
+    return messages
+
+
+def format_results(results):
+    """
+    @brief Format benchmark results as a table.
+
+    @param results The results of run_benchmark().
+
+    @return A string with one line per backend and set.
+    """
+    lines = ["{:<13} {:<20} {:>7} {:>10} {:>9} {:>9} {:>10} {:>9}".format(
+        "backend", "set", "puzzles", "solves/s", "p50 ms", "p99 ms", "nodes", "peak KiB")]
+    for backend, sets in results.items():
+        for name, result in sets.items():
+            lines.append("{:<13} {:<20} {:>7} {:>10.1f} {:>9.3f} {:>9.3f} {:>10.1f} {:>9.1f}".format(
+                backend, name, result["puzzles"], result["solves_per_second"], result["p50_ms"], result["p99_ms"],
+                result["mean_nodes"], result["peak_kib"]))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Sudoku solver backends over a puzzle corpus.")
+    parser.add_argument("corpus", nargs="?", default="Puzzles", help="Corpus directory (default: Puzzles).")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS), help="Backends to run (default: all).")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of puzzles per set.")
+    parser.add_argument("--repeat", type=int, default=3, help="Times every puzzle is solved; the fastest is kept (default: 3).")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file.")
+    parser.add_argument("--save-baseline", action="store_true", help="Save the results as the new baseline instead of comparing.")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Relative change of throughput or p99 allowed before a regression (default: 0.5).")
+    args = parser.parse_args()
+
+    sets = load_corpus(args.corpus, args.limit)
+    calibration = calibration_ns()
+    results = run_benchmark(sets, args.backends, repeat=args.repeat)
+    calibration = min(calibration, calibration_ns())  # The machine may have been busy at the start only
+    print(format_results(results))
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump({"calibration_ns": calibration, "results": results}, file, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline found at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+    with open(args.baseline, 'r') as file:
+        baseline = json.load(file)
+    speed_ratio = calibration / baseline["calibration_ns"]
+    print("Machine speed relative to the baseline: {:.2f}".format(1 / speed_ratio))
+    regressions = compare_to_baseline(results, baseline["results"], args.tolerance, speed_ratio)
+    for message in regressions:
+        print(f"Regression: {message}")
+    uncompared = uncompared_sets(results, baseline["results"])
+    for message in uncompared:
+        print(f"Not compared: {message}")
+    if regressions:
+        return 1
+    if uncompared:
+        print("The comparison is incomplete; use the same corpus and --limit as the baseline, or save a new one.")
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""!@file bitmask_solver.py
+@brief Module containing a constraint-propagation Sudoku solver based on candidate bitmasks.
+
+@details This module contains the BitmaskSudokuSolver class. Instead of rescanning the row, column and box
+of a cell for every candidate number (as is_valid() does), the solver keeps one bitmask of used numbers per
+row, column and box. Bit (d - 1) is set when number d is used, so the candidates of an empty cell are
+`~(rows[r] | cols[c] | boxes[b])` and placing or removing a number costs O(1).
+
+Before every branching step the solver propagates two rules until nothing changes:
+- Naked single: an empty cell with exactly one candidate gets that number.
+- Hidden single: a number that fits only one cell of a row, column or box goes into that cell.
+The search then branches on the empty cell with the fewest candidates. Every placement is recorded on a
+trail, so backtracking undoes exactly the placements made since a branch was taken.
+"""
+
+from sudoku_grid import SudokuGrid
+
+
+def popcount(mask):
+    """
+    @brief Count the set bits of a bitmask.
+
+    @param mask A non-negative integer.
+
+    @return The number of candidates in the mask.
+    """
+    return bin(mask).count("1")
+
+
+class BitmaskSudokuSolver:
+    def __init__(self, grid, box_size=3):
+        """
+        @brief Set up the bitmasks and units of a Sudoku grid.
+
+        @details The grid is copied into a flat list of cells (row-major), so the input grid is only
+        modified when write_solution() is called. The given numbers are assumed to be valid
+        (see validate_grid()).
+
+        @param grid A 2D list of (box_size^2) rows of (box_size^2) numbers, 0 meaning empty, or a SudokuGrid.
+        @param box_size The side length of a box (3 for a standard 9x9 Sudoku), ignored for a SudokuGrid.
+        """
+        if isinstance(grid, SudokuGrid):
+            box_size = grid.box_size
+            self.cells = list(grid.cells)
+        else:
+            self.cells = [num for row in grid for num in row]
+        size = box_size * box_size
+        self.box_size = box_size
+        self.size = size
+        self.all_numbers = (1 << size) - 1
+
+        self.row_of = [i // size for i in range(size * size)]
+        self.col_of = [i % size for i in range(size * size)]
+        self.box_of = [(r // box_size) * box_size + c // box_size for r, c in zip(self.row_of, self.col_of)]
+        # Every row, column and box as a list of cell indices, for the hidden-single rule.
+        self.units = [[r * size + c for c in range(size)] for r in range(size)]
+        self.units += [[r * size + c for r in range(size)] for c in range(size)]
+        self.units += [[i for i in range(size * size) if self.box_of[i] == b] for b in range(size)]
+
+        self.rows = [0] * size
+        self.cols = [0] * size
+        self.boxes = [0] * size
+        for i, num in enumerate(self.cells):
+            if num:
+                bit = 1 << (num - 1)
+                self.rows[self.row_of[i]] |= bit
+                self.cols[self.col_of[i]] |= bit
+                self.boxes[self.box_of[i]] |= bit
+
+        self.trail = []  # Cell indices filled by the solver, in order
+        self.nodes = 0  # Number of branching decisions made
+        self.backtracks = 0  # Number of branches undone
+        self.propagations = 0  # Number of cells filled by propagate()
+
+    def candidates(self, cell):
+        """
+        @brief Get the numbers that can be placed in a cell.
+
+        @param cell The flat index of the cell.
+
+        @return A bitmask with bit (d - 1) set for every possible number d.
+        """
+        return self.all_numbers & ~(self.rows[self.row_of[cell]] | self.cols[self.col_of[cell]] | self.boxes[self.box_of[cell]])
+
+    def place(self, cell, num):
+        """
+        @brief Place a number in an empty cell and record it on the trail.
+
+        @param cell The flat index of the cell.
+        @param num The number to place.
+        """
+        bit = 1 << (num - 1)
+        self.cells[cell] = num
+        self.rows[self.row_of[cell]] |= bit
+        self.cols[self.col_of[cell]] |= bit
+        self.boxes[self.box_of[cell]] |= bit
+        self.trail.append(cell)
+
+    def undo(self, mark):
+        """
+        @brief Remove every number placed since the trail had length `mark`.
+
+        @param mark A previous length of the trail.
+        """
+        while len(self.trail) > mark:
+            cell = self.trail.pop()
+            bit = 1 << (self.cells[cell] - 1)
+            self.cells[cell] = 0
+            self.rows[self.row_of[cell]] ^= bit
+            self.cols[self.col_of[cell]] ^= bit
+            self.boxes[self.box_of[cell]] ^= bit
+
+    def propagate(self):
+        """
+        @brief Apply the naked-single and hidden-single rules until no cell can be filled.
+
+        @details Naked singles are applied first; the more expensive hidden-single scan over all units
+        only runs once no naked single is left.
+
+        @return False if a contradiction was found (a cell or a number with no possible place), True otherwise.
+        """
+        cells, rows, cols, boxes = self.cells, self.rows, self.cols, self.boxes
+        row_of, col_of, box_of = self.row_of, self.col_of, self.box_of
+        all_numbers, place = self.all_numbers, self.place
+        while True:
+            progress = False
+            for cell in [i for i, num in enumerate(cells) if not num]:
+                mask = all_numbers & ~(rows[row_of[cell]] | cols[col_of[cell]] | boxes[box_of[cell]])
+                if not mask:
+                    return False
+                if not mask & (mask - 1):
+                    place(cell, mask.bit_length())
+                    progress = True
+            if progress:
+                continue
+
+            for unit in self.units:
+                once = twice = placed = 0
+                for cell in unit:
+                    if cells[cell]:
+                        placed |= 1 << (cells[cell] - 1)
+                        continue
+                    mask = all_numbers & ~(rows[row_of[cell]] | cols[col_of[cell]] | boxes[box_of[cell]])
+                    twice |= once & mask
+                    once |= mask
+                if once | placed != all_numbers:
+                    return False  # Some number fits nowhere in this unit
+                hidden = once & ~twice
+                while hidden:
+                    bit = hidden & -hidden
+                    hidden ^= bit
+                    for cell in unit:
+                        if not cells[cell] and self.candidates(cell) & bit:
+                            place(cell, bit.bit_length())
+                            progress = True
+                            break
+                    else:
+                        return False  # An earlier placement took this number's only cell
+            if not progress:
+                return True
+
+    def select_cell(self):
+        """
+        @brief Find the empty cell with the fewest candidates.
+
+        @return Tuple of (cell, candidates bitmask), or (None, 0) if the grid is full.
+        """
+        rows, cols, boxes = self.rows, self.cols, self.boxes
+        row_of, col_of, box_of = self.row_of, self.col_of, self.box_of
+        best_cell, best_mask, best_count = None, 0, self.size + 1
+        for cell, num in enumerate(self.cells):
+            if num:
+                continue
+            mask = self.all_numbers & ~(rows[row_of[cell]] | cols[col_of[cell]] | boxes[box_of[cell]])
+            count = popcount(mask)
+            if count < best_count:
+                best_cell, best_mask, best_count = cell, mask, count
+                if count <= 2:
+                    break
+        return best_cell, best_mask
+
+    def _search(self):
+        start = len(self.trail)
+        consistent = self.propagate()
+        self.propagations += len(self.trail) - start
+        if not consistent:
+            return False
+        cell, mask = self.select_cell()
+        if cell is None:
+            return True
+        mark = len(self.trail)
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            self.nodes += 1
+            self.place(cell, bit.bit_length())
+            if self._search():
+                return True
+            self.undo(mark)
+            self.backtracks += 1
+        return False
+
+    def solve(self):
+        """
+        @brief Solve the puzzle by propagation and search.
+
+        @return True if a solution was found (kept in `cells`), False if the puzzle has none (the cells are left as given).
+        """
+        if self._search():
+            return True
+        self.undo(0)
+        return False
+
+    def record_stats(self, stats):
+        """
+        @brief Add the search counters of the solver to a SolverStats.
+
+        @param stats A SolverStats (see solver_stats.py).
+        """
+        stats.nodes += self.nodes
+        stats.backtracks += self.backtracks
+        stats.propagations += self.propagations
+
+    def write_solution(self, grid):
+        """
+        @brief Copy the current cells back into a 2D grid in place.
+
+        @param grid The 2D list or SudokuGrid the solver was created from.
+        """
+        if isinstance(grid, SudokuGrid):
+            grid.cells[:] = bytes(self.cells)
+            return
+        for r, row in enumerate(grid):
+            row[:] = self.cells[r * self.size:(r + 1) * self.size]
@@ -3,45 +3,92 @@
 
 @details This module contains functions for validating the structure and correctness of Sudoku grids.
 It includes a function that checks whether a given grid is a valid 9x9 Sudoku grid, ensuring that each cell contains an integer between 0 and 9 and that there are no duplicates in rows, columns, or 3x3 subgrids, except for the number 0.
+Other sizes ((n^2)x(n^2), e.g. 16x16) are validated in the same way when the box size is given or the grid is a SudokuGrid.
+A SudokuGrid is checked on its flat bytearray of cells, one slice per unit; only an invalid one goes through the
+cell-by-cell loop, to report the first duplicate.
+
+The NumPy functions validate many grids at once: find_invalid_grids() flags the invalid grids of a (K, 9, 9) stack,
+validate_grid_array() validates one grid with the same errors as validate_grid(), and check_solutions() checks that
+solved grids are complete and correct (and keep the givens of their puzzles) in one pass.
 
 @author Created by F. Wu on 30/11/2023
 """
 
-def validate_grid(grid):
+import numpy as np
+from sudoku_grid import SudokuGrid
+
+
+def _has_duplicate(cells, size, box_size):
+    """
+    @brief Check the rows, columns and subgrids of a flat grid for a repeated non-zero number.
+
+    @param cells The size^2 numbers of the grid, row by row (a bytearray).
+    @param size The number of rows.
+    @param box_size The side length of a subgrid.
+
+    @return True if a unit holds a non-zero number twice.
+    """
+    units = [cells[i * size:(i + 1) * size] for i in range(size)] + [cells[i::size] for i in range(size)]
+    for band in range(0, size, box_size):
+        for stack in range(0, size, box_size):
+            start = band * size + stack
+            units.append(b''.join(cells[start + k * size:start + k * size + box_size] for k in range(box_size)))
+    for unit in units:
+        empty = unit.count(0)
+        if len(set(unit)) - (empty > 0) != size - empty:
+            return True
+    return False
+
+def validate_grid(grid, box_size=3):
     """
     @brief Validate a Sudoku grid (the form is valid and solvable).
 
-    @details This function checks if the provided grid is a valid 9x9 Sudoku grid. It ensures that:
+    @details This function checks if the provided grid is a valid Sudoku grid of (box_size^2)x(box_size^2) cells
+    (9x9 by default). It ensures that:
     - The grid is a list of 9 rows, where each row is a list of 9 numbers.
     - Each cell in the grid contains an integer value between 0 and 9 (inclusive).
     - There are no duplicate numbers in any row, column, or 3x3 subgrid, excluding the number 0.
+    (with 9 and 3 replaced by box_size^2 and box_size for other sizes). A SudokuGrid is checked with its own box size.
     If any of these conditions are not met, a ValueError is raised with an appropriate message.
 
-    @param grid A 9x9 grid represented as a list of rows, where each row is a list of integers from 0 to 9.
+    @param grid A 9x9 grid represented as a list of rows, where each row is a list of integers from 0 to 9, or a SudokuGrid.
+    @param box_size The side length of a subgrid, ignored for a SudokuGrid (default 3).
 
     @raisewarning ValueError If the grid is not a list of 9 rows, if any row is not a list of 9 integers,
             if any cell contains a value not in the range 0-9, or if duplicates are found in a row,
             column, or 3x3 subgrid (excluding zeros).
     """
-    if not isinstance(grid, list) or len(grid) != 9:
-        raise ValueError("validate_grid: Grid must be a list of 9 rows.")
+    if isinstance(grid, SudokuGrid):
+        box_size = grid.box_size
+        size = grid.size
+        if max(grid.cells) > size:
+            raise ValueError(f"validate_grid: Grid numbers must be between 0 and {size}, inclusive.")
+        if not _has_duplicate(grid.cells, size, box_size):
+            return
+        grid = grid.to_rows()  # Find the first duplicate with the loop below, for its message
+    else:
+        size = box_size * box_size
+        if not isinstance(grid, list) or len(grid) != size:
+            raise ValueError(f"validate_grid: Grid must be a list of {size} rows.")
 
-    for row in grid:
-        if not isinstance(row, list) or len(row) != 9:
-            raise ValueError("validate_grid: Each row in the grid must be a list of 9 numbers.")
+        for row in grid:
+            if not isinstance(row, list) or len(row) != size:
+                raise ValueError(f"validate_grid: Each row in the grid must be a list of {size} numbers.")
 
-        for cell in row:
-            if not isinstance(cell, int):
-                raise ValueError("validate_grid: Grid must only contain integers.")
-            if cell < 0 or cell > 9:
-                raise ValueError("validate_grid: Grid numbers must be between 0 and 9, inclusive.")
+            for cell in row:
+                if not isinstance(cell, int):
+                    raise ValueError("validate_grid: Grid must only contain integers.")
+                if cell < 0 or cell > size:
+                    raise ValueError(f"validate_grid: Grid numbers must be between 0 and {size}, inclusive.")
 
     # checking for duplicates in rows, columns, and subgrids
-    for i in range(9):
+    for i in range(size):
         row = set()
         col = set()
         subgrid = set()
-        for j in range(9):
+        row_index = box_size * (i // box_size)
+        col_index = box_size * (i % box_size)
+        for j in range(size):
             if grid[i][j] in row and grid[i][j] != 0:
                 raise ValueError(f"validate_grid: Duplicate number {grid[i][j]} found in row {i}.")
             row.add(grid[i][j])
@@ -50,8 +97,135 @@ def validate_grid(grid):
                 raise ValueError(f"validate_grid: Duplicate number {grid[j][i]} found in column {i}.")
             col.add(grid[j][i])
 
-            row_index = 3 * (i // 3)
-            col_index = 3 * (i % 3)
-            if grid[row_index + j // 3][col_index + j % 3] in subgrid and grid[row_index + j // 3][col_index + j % 3] != 0:
-                raise ValueError(f"validate_grid: Duplicate number {grid[row_index + j // 3][col_index + j % 3]} found in the 3x3 subgrid starting at ({row_index}, {col_index}).")
-            subgrid.add(grid[row_index + j // 3][col_index + j % 3])
+            cell = grid[row_index + j // box_size][col_index + j % box_size]
+            if cell in subgrid and cell != 0:
+                raise ValueError(f"validate_grid: Duplicate number {cell} found in the {box_size}x{box_size} subgrid starting at ({row_index}, {col_index}).")
+            subgrid.add(cell)
+
+
+def grid_units(grids, box_size=3):
+    """
+    @brief Gather the rows, columns and subgrids of a stack of grids as the rows of one array.
+
+    @param grids A NumPy array of shape (K, size, size), size being box_size^2.
+    @param box_size The side length of a subgrid (default 3).
+
+    @return An array of shape (K, 3 * size, size): the size rows, then the size columns, then the size subgrids
+    (row-major, each flattened row by row) of every grid.
+    """
+    k, size = grids.shape[0], box_size * box_size
+    boxes = grids.reshape(k, box_size, box_size, box_size, box_size).transpose(0, 1, 3, 2, 4).reshape(k, size, size)
+    return np.concatenate((grids, grids.transpose(0, 2, 1), boxes), axis=1)
+
+
+def _as_grid_stack(grids, box_size, caller):
+    size = box_size * box_size
+    try:
+        grids = np.asarray(grids)
+    except ValueError:
+        raise ValueError(f"{caller}: Grids must be arrays of shape ({size}, {size}).")
+    if grids.ndim != 3 or grids.shape[1:] != (size, size):
+        raise ValueError(f"{caller}: Grids must be arrays of shape ({size}, {size}).")
+    if not np.issubdtype(grids.dtype, np.integer):
+        raise ValueError(f"{caller}: Grid must only contain integers.")
+    return grids
+
+
+def _sorted_units(grids, box_size):
+    # Values are checked to be in range first, so they fit in one byte; sorting puts duplicates side by side.
+    return np.sort(grid_units(grids.astype(np.uint8, copy=False), box_size), axis=2)
+
+
+def find_invalid_grids(grids, box_size=3, chunk_size=65536):
+    """
+    @brief Find the invalid grids in a stack of Sudoku grids, with a handful of array operations per chunk.
+
+    @details A grid is invalid if a cell is outside 0..size or a number other than 0 appears twice in a row, column
+    or subgrid. All units of all grids are sorted at once and compared with their neighbours, so there is no
+    Python loop over grids or cells. Grids are processed `chunk_size` at a time to bound the temporary memory
+    (about 6 bytes per cell).
+
+    @param grids An integer array-like of shape (K, size, size), e.g. a list of 2D lists or np.stack() of grids.
+    @param box_size The side length of a subgrid (default 3 for 9x9 grids).
+    @param chunk_size The number of grids processed at once.
+
+    @return A boolean NumPy array of shape (K,), True where the grid is invalid.
+
+    @exception ValueError If `grids` does not have the right shape or is not made of integers.
+    """
+    grids = _as_grid_stack(grids, box_size, "find_invalid_grids")
+    size = box_size * box_size
+    invalid = np.empty(grids.shape[0], dtype=bool)
+    for start in range(0, grids.shape[0], chunk_size):
+        chunk = grids[start:start + chunk_size]
+        out_of_range = ((chunk < 0) | (chunk > size)).any(axis=(1, 2))
+        units = _sorted_units(chunk, box_size)
+        duplicates = ((units[:, :, 1:] == units[:, :, :-1]) & (units[:, :, 1:] != 0)).any(axis=(1, 2))
+        invalid[start:start + chunk_size] = out_of_range | duplicates
+    return invalid
+
+
+def validate_grid_array(grid, box_size=3):
+    """
+    @brief Validate one Sudoku grid with NumPy, raising the same errors as validate_grid().
+
+    @param grid A 2D integer array-like of size x size numbers, or a SudokuGrid (whose box size is used).
+    @param box_size The side length of a subgrid, ignored for a SudokuGrid (default 3).
+
+    @exception ValueError If the grid has the wrong shape or type, a value is out of range, or a row, column or
+    subgrid has a duplicate number (excluding zeros).
+    """
+    if isinstance(grid, SudokuGrid):
+        box_size = grid.box_size
+        grid = grid.as_array()
+    size = box_size * box_size
+    grids = _as_grid_stack([grid], box_size, "validate_grid_array")
+    if ((grids < 0) | (grids > size)).any():
+        raise ValueError(f"validate_grid_array: Grid numbers must be between 0 and {size}, inclusive.")
+    units = _sorted_units(grids, box_size)[0]
+    duplicates = (units[:, 1:] == units[:, :-1]) & (units[:, 1:] != 0)
+    if duplicates.any():
+        unit, position = np.argwhere(duplicates)[0]
+        number, index = units[unit, position + 1], unit % size
+        if unit < size:
+            raise ValueError(f"validate_grid_array: Duplicate number {number} found in row {index}.")
+        if unit < 2 * size:
+            raise ValueError(f"validate_grid_array: Duplicate number {number} found in column {index}.")
+        row_index, col_index = box_size * (index // box_size), box_size * (index % box_size)
+        raise ValueError(f"validate_grid_array: Duplicate number {number} found in the {box_size}x{box_size} subgrid starting at ({row_index}, {col_index}).")
+
+
+def check_solutions(grids, puzzles=None, box_size=3, chunk_size=65536):
+    """
+    @brief Check in one pass whether each grid of a stack is a complete, correct solution.
+
+    @details A grid is a solution if every row, column and subgrid holds exactly the numbers 1..size, which is
+    checked by sorting all units at once and comparing them with 1..size. If `puzzles` is given, each solution
+    must also keep the given (non-zero) numbers of its puzzle.
+
+    @param grids An integer array-like of shape (K, size, size).
+    @param puzzles An optional array-like of the same shape with the puzzles that were solved.
+    @param box_size The side length of a subgrid (default 3 for 9x9 grids).
+    @param chunk_size The number of grids processed at once.
+
+    @return A boolean NumPy array of shape (K,), True where the grid is a solution.
+
+    @exception ValueError If `grids` or `puzzles` do not have the right shape or are not made of integers.
+    """
+    grids = _as_grid_stack(grids, box_size, "check_solutions")
+    size = box_size * box_size
+    if puzzles is not None:
+        puzzles = _as_grid_stack(puzzles, box_size, "check_solutions")
+        if puzzles.shape != grids.shape:
+            raise ValueError("check_solutions: Puzzles and grids must have the same shape.")
+    numbers = np.arange(1, size + 1, dtype=np.uint8)
+    solved = np.empty(grids.shape[0], dtype=bool)
+    for start in range(0, grids.shape[0], chunk_size):
+        chunk = grids[start:start + chunk_size]
+        in_range = ((chunk >= 1) & (chunk <= size)).all(axis=(1, 2))
+        chunk_solved = in_range & (_sorted_units(chunk, box_size) == numbers).all(axis=(1, 2))
+        if puzzles is not None:
+            given = puzzles[start:start + chunk_size]
+            chunk_solved &= ((given == 0) | (given == chunk)).all(axis=(1, 2))
+        solved[start:start + chunk_size] = chunk_solved
+    return solved
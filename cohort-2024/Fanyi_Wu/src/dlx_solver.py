@@ -0,0 +1,271 @@
+"""!@file dlx_solver.py
+@brief Module containing an exact-cover (Dancing Links) Sudoku solver.
+
+@details This module solves Sudoku as an exact-cover problem with Knuth's Algorithm X, using Dancing Links (DLX).
+Every candidate placement "number d in cell (r, c)" is a row of the cover matrix, covering four constraints:
+the cell is filled, row r has d, column c has d and the box of (r, c) has d. A solution picks rows so that every
+constraint is covered exactly once. The links are stored in flat lists (one entry per node) rather than objects.
+
+Unlike the backtracking and bitmask solvers, DLX can enumerate all solutions cheaply, which makes it suitable for
+uniqueness checks (count up to 2 solutions). It works for any box size, i.e. (n^2)x(n^2) grids.
+There are two classes in the module:
+- DancingLinks: a generic exact-cover solver.
+- DLXSudokuSolver: builds the cover matrix of a Sudoku grid and converts covers back to grids.
+"""
+
+from sudoku_grid import SudokuGrid
+
+
+class DancingLinks:
+    def __init__(self, n_columns):
+        """
+        @brief Create an exact-cover matrix with `n_columns` columns and no rows.
+
+        @details Node 0 is the root, nodes 1..n_columns are the column headers. Each node has left, right, up
+        and down links (L, R, U, D) and its column header (C). S holds the number of nodes in each column.
+
+        @param n_columns The number of constraints to cover.
+        """
+        self.L = [i - 1 for i in range(n_columns + 1)]
+        self.R = [i + 1 for i in range(n_columns + 1)]
+        self.L[0], self.R[n_columns] = n_columns, 0
+        self.U = list(range(n_columns + 1))
+        self.D = list(range(n_columns + 1))
+        self.C = list(range(n_columns + 1))
+        self.S = [0] * (n_columns + 1)
+        self.row_of = [None] * (n_columns + 1)
+        self.nodes = 0  # Number of rows tried by solutions()
+        self.backtracks = 0  # Number of rows tried that led to no (further) solution
+
+    def add_row(self, row_id, columns):
+        """
+        @brief Append a row covering the given columns.
+
+        @param row_id An identifier returned in solutions for this row.
+        @param columns The column indices (1-based) covered by the row.
+        """
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        first = len(L)
+        for k, column in enumerate(columns):
+            node = first + k
+            L.append(node - 1 if k else first + len(columns) - 1)
+            R.append(node + 1 if k < len(columns) - 1 else first)
+            U.append(U[column])
+            D.append(column)
+            C.append(column)
+            self.row_of.append(row_id)
+            D[U[column]] = node
+            U[column] = node
+            S[column] += 1
+
+    def cover(self, column):
+        """
+        @brief Remove a column and every row that covers it.
+
+        @param column The column index.
+        """
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        R[L[column]] = R[column]
+        L[R[column]] = L[column]
+        i = D[column]
+        while i != column:
+            j = R[i]
+            while j != i:
+                D[U[j]] = D[j]
+                U[D[j]] = U[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def uncover(self, column):
+        """
+        @brief Restore a column removed by cover(), in exactly the reverse order.
+
+        @param column The column index.
+        """
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[column]
+        while i != column:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                D[U[j]] = j
+                U[D[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[column]] = column
+        L[R[column]] = column
+
+    def _choose_column(self):
+        R, S = self.R, self.S
+        best, best_size = None, None
+        column = R[0]
+        while column != 0:
+            if best_size is None or S[column] < best_size:
+                best, best_size = column, S[column]
+                if best_size <= 1:
+                    break
+            column = R[column]
+        return best
+
+    def solutions(self, partial=None):
+        """
+        @brief Enumerate every exact cover.
+
+        @details Each step covers the column with the fewest remaining rows. The links are restored when the
+        generator is exhausted or closed early (e.g. after enough solutions were counted).
+
+        @param partial Row ids already chosen (used by the recursion).
+
+        @return A generator of lists of row ids, one list per solution.
+        """
+        if partial is None:
+            partial = []
+        if self.R[0] == 0:
+            yield list(partial)
+            return
+        column = self._choose_column()
+        if self.S[column] == 0:
+            return
+        R, L, D, C = self.R, self.L, self.D, self.C
+        self.cover(column)
+        try:
+            i = D[column]
+            while i != column:
+                partial.append(self.row_of[i])
+                self.nodes += 1
+                j = R[i]
+                while j != i:
+                    self.cover(C[j])
+                    j = R[j]
+                try:
+                    yield from self.solutions(partial)
+                finally:
+                    j = L[i]
+                    while j != i:
+                        self.uncover(C[j])
+                        j = L[j]
+                    partial.pop()
+                self.backtracks += 1
+                i = D[i]
+        finally:
+            self.uncover(column)
+
+
+class DLXSudokuSolver:
+    def __init__(self, grid, box_size=3):
+        """
+        @brief Build the exact-cover matrix of a Sudoku grid.
+
+        @details Constraints already satisfied by the given numbers get no column, and only placements compatible
+        with the givens get a row, so the matrix shrinks with every given. Givens that clash with each other
+        make the puzzle inconsistent (it has no solution).
+
+        @param grid A 2D list of (box_size^2) rows of (box_size^2) numbers, 0 meaning empty, or a SudokuGrid.
+        @param box_size The side length of a box (3 for a standard 9x9 Sudoku), ignored for a SudokuGrid.
+        """
+        if isinstance(grid, SudokuGrid):
+            box_size = grid.box_size
+        size = box_size * box_size
+        self.grid = [list(row) for row in grid]
+        self.size = size
+        self.box_size = box_size
+        self.consistent = True
+
+        used = set()  # Constraints satisfied by the givens
+        for r in range(size):
+            for c in range(size):
+                num = self.grid[r][c]
+                if num:
+                    box = (r // box_size) * box_size + c // box_size
+                    for constraint in (("cell", r, c), ("row", r, num), ("col", c, num), ("box", box, num)):
+                        if constraint in used:
+                            self.consistent = False
+                        used.add(constraint)
+
+        placements = []
+        columns = {}
+        for r in range(size):
+            for c in range(size):
+                if self.grid[r][c]:
+                    continue
+                box = (r // box_size) * box_size + c // box_size
+                for num in range(1, size + 1):
+                    constraints = (("cell", r, c), ("row", r, num), ("col", c, num), ("box", box, num))
+                    if any(constraint in used for constraint in constraints):
+                        continue
+                    placements.append(((r, c, num), [columns.setdefault(constraint, len(columns) + 1) for constraint in constraints]))
+
+        # Every open constraint must be coverable; otherwise some cell or number has no possible placement.
+        open_constraints = 4 * size * size - len(used)
+        if len(columns) != open_constraints:
+            self.consistent = False
+        self.links = DancingLinks(len(columns))
+        for placement, placement_columns in placements:
+            self.links.add_row(placement, placement_columns)
+
+    def iter_solutions(self):
+        """
+        @brief Enumerate all solutions of the puzzle.
+
+        @return A generator of solved grids (new 2D lists).
+        """
+        if not self.consistent:
+            return
+        for placements in self.links.solutions():
+            solution = [row[:] for row in self.grid]
+            for r, c, num in placements:
+                solution[r][c] = num
+            yield solution
+
+    def count_solutions(self, limit=2):
+        """
+        @brief Count the solutions of the puzzle, stopping at `limit`.
+
+        @details With the default limit of 2 this is a uniqueness check: 0 means unsolvable, 1 unique, 2 ambiguous.
+
+        @param limit The count at which to stop searching, or None to count all solutions.
+
+        @return The number of solutions found (at most `limit`).
+        """
+        count = 0
+        solutions = self.iter_solutions()
+        for _ in solutions:
+            count += 1
+            if limit is not None and count >= limit:
+                solutions.close()
+                break
+        return count
+
+    def record_stats(self, stats):
+        """
+        @brief Add the search counters of the Dancing Links matrix to a SolverStats.
+
+        @param stats A SolverStats (see solver_stats.py).
+        """
+        stats.nodes += self.links.nodes
+        stats.backtracks += self.links.backtracks
+
+    def solve(self):
+        """
+        @brief Find one solution of the puzzle.
+
+        @return A solved grid (new 2D list), or None if the puzzle has no solution.
+        """
+        solutions = self.iter_solutions()
+        solution = next(solutions, None)
+        solutions.close()
+        return solution
+
+
+def count_solutions(grid, limit=2, box_size=3):
+    """
+    @brief Count the solutions of a Sudoku grid with DLX, stopping at `limit`.
+
+    @param grid A 2D list representing the Sudoku grid.
+    @param limit The count at which to stop searching (2 for a uniqueness check), or None for all.
+    @param box_size The side length of a box.
+
+    @return The number of solutions found (at most `limit`).
+    """
+    return DLXSudokuSolver(grid, box_size).count_solutions(limit)
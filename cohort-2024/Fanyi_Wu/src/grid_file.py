@@ -1,19 +1,60 @@
 """!@file grid_file.py
 @brief Module containing two functions for reading and outputting Sudoku grids.
 
-@details This module contains two functions for reading and outputting Sudoku grids.
+@details This module contains functions for reading and outputting Sudoku grids.
 The read_grid_file() function reads a Sudoku grid from a text file and returns it as a list of lists of integers (2D list).
 The save_grid_file() function saves a Sudoku grid to a text file, which is in the same format as the input file.
+The iter_grid_file() function streams many puzzles from one file, and format_grid_line() writes a grid as one line.
+All of them handle (n^2)x(n^2) grids up to 25x25: numbers above 9 are written as letters on one line (see
+sudoku_grid.py) and as two digits per cell in the boxed format, like str(SudokuGrid).
 
 @author Created by F. Wu on 30/11/2023
 """
 
+from sudoku_grid import SudokuGrid, SYMBOLS, MAX_BOX_SIZE
+
+GRID_SIZES = {box_size * box_size for box_size in range(2, MAX_BOX_SIZE + 1)}  # Rows of the supported grids
+ONE_LINE_LENGTHS = {size * size for size in GRID_SIZES}  # Characters of a puzzle written on one line
+
+
+def is_separator(line):
+    """
+    @brief Check whether a stripped line of the boxed format separates two bands of boxes (e.g. '---+---+---').
+    """
+    return bool(line) and set(line) <= set('-+')
+
+
+def parse_grid_row(line):
+    """
+    @brief Parse one row of the boxed format.
+
+    @details '|' separators and spaces are ignored. A row of n cells (n = 4, 9, 16 or 25) is written either with one
+    character per cell ('0' or '.' for empty cells, '1'-'9' then 'A'-'Z'), or with two digits per cell as
+    save_grid_file() writes grids larger than 9x9. The two cannot be confused, as 2n is never the square of an integer.
+
+    @param line A line of the file.
+
+    @return A list of n integers, or None if the line is not a row of a supported grid.
+    """
+    chars = ''.join(line.split()).replace('|', '')
+    try:
+        if len(chars) in GRID_SIZES:
+            row = [0 if char in '.0' else SYMBOLS.index(char.upper()) + 1 for char in chars]
+        elif len(chars) // 2 in GRID_SIZES and len(chars) % 2 == 0 and chars.isdigit():
+            row = [int(chars[i:i + 2]) for i in range(0, len(chars), 2)]
+        else:
+            return None
+    except ValueError:
+        return None
+    return row if max(row) <= len(row) else None
+
 def read_grid_file(file_path):
     """
     @brief Read a Sudoku puzzle from input file and convert it into a 2D list.
 
     @details This function opens a file containing a Sudoku puzzle and parses each line into a list of integers,
-    representing the Sudoku grid. This is achieved by calling parse_sudoku_line(line).
+    representing the Sudoku grid. This is achieved by calling parse_grid_row(line). Separator lines and blank lines
+    are skipped. Grids of other sizes (4x4, 16x16, 25x25) are read in the same way, see parse_grid_row().
 
     @param file_path The path to the file containing the Sudoku puzzle.
 
@@ -21,7 +62,7 @@ def read_grid_file(file_path):
     or if the puzzle format is incorrect.
 
     @exception FileNotFoundError If the specified file cannot be found.
-    @exception ValueError If any row in the Sudoku puzzle is not of length 9.
+    @exception ValueError If a row cannot be parsed or is not as long as the first row.
     @exception Exception For any other errors that occur during file reading.
 
     Example usage:
@@ -47,19 +88,17 @@ def read_grid_file(file_path):
     """
     grid = []
 
-    def parse_sudoku_line(line):
-        return [int(num) if num.isdigit() else 0 for num in line if num.isdigit()]
-
     try:
         with open(file_path, 'r') as file:
             for line in file:
-                # Ignore lines with '---+---+---'
-                if '---' not in line:
+                stripped = line.strip()
+                # Ignore blank lines and lines like '---+---+---'
+                if stripped and not is_separator(stripped):
                     try:
                         # Parse the line into a list of integers
-                        row = parse_sudoku_line(line)
-                        if len(row) != 9:  # Each row must have exactly 9 numbers
-                            raise ValueError(f"read_grid_file: Invalid row length in line: {line.strip()}")
+                        row = parse_grid_row(stripped)
+                        if row is None or (grid and len(row) != len(grid[0])):  # Every row as long as the first
+                            raise ValueError(f"read_grid_file: Invalid row length in line: {stripped}")
                         grid.append(row)
                     except ValueError as ve:
                         print(ve)
@@ -79,13 +118,14 @@ def save_grid_file(grid, file_path):
     @brief Save a Sudoku puzzle to a file from a 2D list representation.
 
     @details This function writes a Sudoku grid to an output file, making the output Sudoku in the same format as the input file.
-    It is achieved by calling format_sudoku_row(row)
-    - converts each row into a string format with '|' separators for every three numbers.
+    It is achieved by formatting the grid as a SudokuGrid (see SudokuGrid.__str__):
+    - each row is written with '|' separators for every three numbers.
     - After every third row (except the last one), a separator
     line '---+---+---' is added.
+    - Other sizes use their own box size, with two digits per cell above 9x9 (e.g. '01' to '16').
     - The function handles any exceptions that may occur during file writing.
 
-    @param grid A 2D list representing the Sudoku grid.
+    @param grid A 2D list representing the Sudoku grid, or a SudokuGrid.
     @param file_path The path where the Sudoku puzzle will be saved.
 
     @exception Exception If an error occurs while writing to the file.
@@ -97,20 +137,79 @@ def save_grid_file(grid, file_path):
     ```
     The output.txt file will be in the same format as the input.txt file.
     """
-
-    def format_sudoku_row(row):
-        """Convert a row of the Sudoku grid to the string format with '|' separators."""
-        return '|'.join(''.join(str(num) if num != 0 else '0' for num in row[i:i+3]) for i in range(0, 9, 3))
-
     try:
+        text = str(grid if isinstance(grid, SudokuGrid) else SudokuGrid.from_rows(grid))
         with open(file_path, 'w') as file:
-            for i, row in enumerate(grid):
-                formatted_row = format_sudoku_row(row)
-                file.write(formatted_row + '\n')
-                print(formatted_row)
-                # Add a separator line after every third row, except the last one
-                if i % 3 == 2 and i != 8:
-                    file.write('---+---+---\n')
-                    print('---+---+---')
+            file.write(text + '\n')
+        print(text)
     except Exception as e:
         print(f"save_grid_file: An error occurred while writing to the file: {e}")
+
+
+def parse_grid_line(line):
+    """
+    @brief Parse a puzzle written on one line (81 characters, row by row, for a 9x9 grid).
+
+    @details Other sizes have n^4 characters (16, 256 or 625), with letters for numbers above 9 (see SudokuGrid.from_line()).
+
+    @param line The puzzle line; '0' or '.' mark empty cells.
+
+    @return A 2D list representing the Sudoku grid, or None if the line is not a puzzle of a supported size.
+    """
+    try:
+        return SudokuGrid.from_line(line).to_rows()
+    except ValueError:
+        return None
+
+
+def format_grid_line(grid):
+    """
+    @brief Write a Sudoku grid on one line (81 characters, row by row, '0' for empty cells).
+
+    @param grid A 2D list representing the Sudoku grid, of any supported size (letters are used above 9).
+
+    @return The grid as a string of 81 characters for a 9x9 grid.
+    """
+    return ''.join(SYMBOLS[num - 1] if num else '0' for row in grid for num in row)
+
+
+def iter_grid_file(file_path):
+    """
+    @brief Stream the Sudoku puzzles of a file one at a time.
+
+    @details The file is read line by line, so its size does not matter. Two formats are accepted, and may be mixed:
+    - One puzzle per line: 81 characters, row by row, with '0' or '.' for empty cells (n^4 characters for other
+      sizes, see parse_grid_line()).
+    - The boxed format of read_grid_file(): nine rows with '|' separators and '---+---+---' lines (n^2 rows for
+      other sizes; a line without '|' whose length is n^4 is read as a one-line puzzle).
+    Blank lines and lines starting with '#' are skipped. A puzzle that cannot be parsed is yielded as None,
+    so the position of every puzzle in the file is kept.
+
+    @param file_path The path to the file containing the Sudoku puzzles.
+
+    @return A generator of 2D lists (or None for unparsable puzzles), in file order.
+    """
+    rows = []
+    size = None  # Row length of the boxed puzzle being read, from its first valid row
+    with open(file_path, 'r') as file:
+        for line in file:
+            stripped = line.strip()
+            if not stripped or stripped.startswith('#') or is_separator(stripped):
+                continue
+            if '|' in stripped or len(stripped) not in ONE_LINE_LENGTHS:
+                row = parse_grid_row(stripped)
+                if size is None and row is not None:
+                    size = len(row)
+                rows.append(row if row is not None and len(row) == size else None)
+                if len(rows) == size:
+                    yield rows if None not in rows else None
+                    rows = []
+                    size = None
+            else:
+                if rows:  # A boxed puzzle cut short
+                    rows = []
+                    size = None
+                    yield None
+                yield parse_grid_line(stripped)
+    if rows:
+        yield None
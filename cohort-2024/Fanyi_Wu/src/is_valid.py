@@ -7,11 +7,15 @@ The function executes a series of checks to assess the validity of placing a num
 - Number must not already exist in the given row
 - Number must not already exist in the given column
 - Number must not already exist in the 3x3 subgrid that includes the cell at ('row', 'col')
+For a SudokuGrid the checks run on its flat bytearray of cells, with one C-level `in` test per row, column and subgrid row.
 
 @author Created by F. Wu on 30/11/2023
 """
 
-def is_valid(grid, row, col, num):
+from sudoku_grid import SudokuGrid
+
+
+def is_valid(grid, row, col, num, box_size=3):
     """
     @brief Check if it's valid to place 'num' in the 'grid' at position ('row', 'col').
 
@@ -19,37 +23,49 @@ def is_valid(grid, row, col, num):
     - It first determines if the cell at the specified 'row' and 'col' is empty or can accept a new value.
     - It then confirms whether the number 'num' is already present in the given 'row', followed by a check to see if 'num' exists in the specified 'col'.
     - Finally, it verifies if 'num' is already in the 3x3 subgrid that includes the cell at ('row', 'col').
+    - For other grid sizes, 9 and 3 are replaced by box_size^2 and box_size.
     - If 'num' does not violate any of these constraints, the function returns True, signifying that it is permissible to place 'num' at the specified position.
     - If any constraint is violated, it returns False.
 
-    @param grid (list of lists of int): The current state of the Sudoku grid.
+    @param grid (list of lists of int): The current state of the Sudoku grid, or a SudokuGrid (checked with its own box size).
     @param row (int): Row index where the number is to be placed.
     @param col (int): Column index where the number is to be placed.
     @param num (int): The number to place.
+    @param box_size (int): The side length of a subgrid (default 3 for a 9x9 grid), ignored for a SudokuGrid.
 
     @return True if placing 'num' at ('row', 'col') is valid, False otherwise.
     """
-    if not (1 <= num <= 9):
+    if isinstance(grid, SudokuGrid):
+        box_size = grid.box_size
+    size = box_size * box_size
+    if not (1 <= num <= size):
         return False  # Number must be between 1 and 9
 
+    if isinstance(grid, SudokuGrid):
+        cells = grid.cells
+        if num in cells[row * size:(row + 1) * size] or num in cells[col::size]:
+            return False
+        start = box_size * (row // box_size) * size + box_size * (col // box_size)
+        return not any(num in cells[start + i * size:start + i * size + box_size] for i in range(box_size))
+
     # Check if 'num' is not in the given 'row'
-    for x in range(9):
+    for x in range(size):
         if grid[row][x] == num:
             #raise ValueError(f"Number {num} already exists in row {row}.")
             return False
 
     # Check if 'num' is not in the given 'col'
-    for x in range(9):
+    for x in range(size):
         if grid[x][col] == num:
             #raise ValueError(f"Number {num} already exists in column {col}.")
             return False
 
     # Calculate the start of the 3x3 subgrid
-    start_row, start_col = 3 * (row // 3), 3 * (col // 3)
+    start_row, start_col = box_size * (row // box_size), box_size * (col // box_size)
 
     # Check if 'num' is not in the 3x3 subgrid
-    for i in range(3):
-        for j in range(3):
+    for i in range(box_size):
+        for j in range(box_size):
             if grid[i + start_row][j + start_col] == num:
                 #raise ValueError(f"Number {num} already exists in the 3x3 subgrid starting at ({start_row}, {start_col}).")
                 return False
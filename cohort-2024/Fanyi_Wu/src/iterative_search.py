@@ -0,0 +1,153 @@
+"""!@file iterative_search.py
+@brief Module containing an iterative backtracking driver that can be paused, resumed and checkpointed.
+
+@details IterativeSearch runs the backtracking search of solve_sudoku() (the most constrained empty cell from
+SudokuSolverWithCache, numbers tried in increasing order) without recursion. The search state is an explicit trail
+with one entry per search level: the flat index of the cell, the number placed in it and the bitmask of numbers
+not tried yet. The trail is preallocated with one entry per cell, so the search allocates nothing per node and
+its depth is not limited by Python's recursion limit (a 25x25 grid has 625 levels).
+
+Because the whole state is in the object, run() can stop after a node or time budget and be called again to
+resume where it stopped, and checkpoint() / restore() save the state as plain data, e.g. to continue a long
+search in another process.
+"""
+
+import time
+
+SOLVED = "solved"
+UNSOLVABLE = "unsolvable"
+PAUSED = "paused"
+CHECK_INTERVAL = 256  # Nodes between two checks of the time budget
+
+
+class IterativeSearch:
+    def __init__(self, solver, find_empty_times=None):
+        """
+        @brief Prepare a search on the grid of a SudokuSolverWithCache.
+
+        @param solver A SudokuSolverWithCache; its grid is solved in place.
+        @param find_empty_times An optional list to which the time of every find_empty() call is appended.
+        """
+        self.solver = solver
+        self.size = solver.size
+        n_cells = self.size * self.size
+        self.trail_cell = [0] * n_cells  # Flat index of the cell of each level
+        self.trail_value = [0] * n_cells  # Number placed at each level (0 if none)
+        self.trail_rest = [0] * n_cells  # Bitmask of the numbers not tried yet at each level
+        self.depth = 0
+        self.descend = True  # Open a new level on the next step
+        self.status = None
+        self.nodes = 0
+        self.backtracks = 0
+        self.find_empty_times = find_empty_times
+
+    def _find_empty(self):
+        if self.find_empty_times is None:
+            return self.solver.find_empty()
+        start_time = time.perf_counter()
+        find = self.solver.find_empty()
+        self.find_empty_times.append(time.perf_counter() - start_time)
+        return find
+
+    def run(self, max_nodes=None, time_budget=None):
+        """
+        @brief Search until the puzzle is solved, proved unsolvable, or a budget runs out.
+
+        @details The time budget is checked every CHECK_INTERVAL nodes, so a run may overshoot it slightly.
+        After PAUSED, calling run() again resumes the search; after SOLVED or UNSOLVABLE it returns at once.
+
+        @param max_nodes The maximum number of nodes (numbers placed) in this call, or None.
+        @param time_budget The maximum time of this call in seconds, or None.
+
+        @return SOLVED (the solution is in the grid), UNSOLVABLE (the grid is back to the puzzle) or PAUSED.
+        """
+        if self.status in (SOLVED, UNSOLVABLE):
+            return self.status
+        solver, size = self.solver, self.size
+        trail_cell, trail_value, trail_rest = self.trail_cell, self.trail_value, self.trail_rest
+        depth, descend = self.depth, self.descend
+        nodes = backtracks = 0
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+        status = PAUSED
+        while True:
+            if descend:
+                find = self._find_empty()
+                if find is None:
+                    status = SOLVED
+                    break
+                row, col = find
+                trail_cell[depth] = row * size + col
+                trail_value[depth] = 0
+                trail_rest[depth] = solver.candidate_mask(row, col)
+                depth += 1
+                descend = False
+
+            top = depth - 1
+            row, col = divmod(trail_cell[top], size)
+            if trail_value[top]:
+                solver.update_cell(row, col, 0)  # Undo the number tried last at this level
+                trail_value[top] = 0
+                backtracks += 1
+            rest = trail_rest[top]
+            if not rest:
+                depth -= 1  # Every number failed: go back to the previous level
+                if depth == 0:
+                    status = UNSOLVABLE
+                    break
+                continue
+
+            if (max_nodes is not None and nodes >= max_nodes) or \
+                    (deadline is not None and nodes % CHECK_INTERVAL == 0 and nodes and time.perf_counter() > deadline):
+                break  # Paused before trying the next number of this level
+            bit = rest & -rest
+            trail_rest[top] = rest ^ bit
+            trail_value[top] = bit.bit_length()
+            solver.update_cell(row, col, trail_value[top])
+            nodes += 1
+            descend = True
+
+        self.depth, self.descend, self.status = depth, descend, status
+        self.nodes += nodes
+        self.backtracks += backtracks
+        return status
+
+    def checkpoint(self):
+        """
+        @brief Save the search state as plain data (lists and integers, e.g. for JSON).
+
+        @return A dictionary with the trail entries (cell, number, numbers not tried) and the counters.
+        """
+        levels = range(self.depth)
+        return {
+            "trail": [[self.trail_cell[i], self.trail_value[i], self.trail_rest[i]] for i in levels],
+            "descend": self.descend,
+            "status": self.status,
+            "nodes": self.nodes,
+            "backtracks": self.backtracks,
+        }
+
+    def restore(self, checkpoint):
+        """
+        @brief Continue from a checkpoint() of a search on the same puzzle.
+
+        @details The numbers of the trail are placed again, so the search must start from the puzzle itself
+        (a new SudokuSolverWithCache on the original grid) and no search must have been run yet.
+
+        @param checkpoint A dictionary returned by checkpoint().
+
+        @exception ValueError If the search has already started or the checkpoint does not fit the puzzle.
+        """
+        if self.depth or self.nodes:
+            raise ValueError("IterativeSearch: A checkpoint can only be restored before the search starts.")
+        for depth, (cell, value, rest) in enumerate(checkpoint["trail"]):
+            row, col = divmod(cell, self.size)
+            if self.solver.grid[row][col] != 0 or (value and not self.solver.candidate_mask(row, col) >> (value - 1) & 1):
+                raise ValueError("IterativeSearch: The checkpoint does not fit the puzzle.")
+            if value:
+                self.solver.update_cell(row, col, value)
+            self.trail_cell[depth], self.trail_value[depth], self.trail_rest[depth] = cell, value, rest
+        self.depth = len(checkpoint["trail"])
+        self.descend = checkpoint["descend"]
+        self.status = checkpoint["status"]
+        self.nodes = checkpoint["nodes"]
+        self.backtracks = checkpoint["backtracks"]
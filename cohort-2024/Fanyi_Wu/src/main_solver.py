@@ -2,12 +2,14 @@
  @brief Module for solving Sudoku puzzles (in the form of 2D list).
 
  @details This module imports necessary functions and classes for solving Sudoku puzzles.
- It includes a primary function `solve_sudoku` which attempts to solve the puzzle using a backtracking algorithm.
- Then it utilizes `validate_grid` for initial grid validation, `SudokuSolverWithCache` for managing the puzzle state,
- and `is_valid` for checking the validity of each move.
+ It includes a primary function `solve_sudoku` which attempts to solve the puzzle using either constraint propagation
+ on candidate bitmasks (`BitmaskSudokuSolver`, the default) or a backtracking algorithm.
+ Then it utilizes `validate_grid` for initial grid validation, and for backtracking `SudokuSolverWithCache` for managing
+ the puzzle state and the valid numbers of each cell, and `IterativeSearch` for running the search without recursion.
 
  The module is designed to measure the time taken for validation
- and finding empty cells, providing insights into the performance of the solving process.
+ and finding empty cells, providing insights into the performance of the solving process. Search counts and
+ phase times can be recorded with an opt-in `SolverStats` object (solver_stats.py).
  Optional profiling lines are commented out for further performance analysis.
 
  @author Created by F. Wu on 30/11/2023
@@ -16,27 +18,45 @@
 import time
 from check_input import validate_grid
 from find_empty import SudokuSolverWithCache
-from is_valid import is_valid
+from bitmask_solver import BitmaskSudokuSolver
+from dlx_solver import DLXSudokuSolver
+from sudoku_grid import SudokuGrid
+from solver_stats import timed
+from iterative_search import IterativeSearch, SOLVED
 # from memory_profiler import profile
 # import cProfile
 
 # @profile(precision=4)
-def solve_sudoku(grid, validation_times=[], find_empty_times=[]):
+def solve_sudoku(grid, validation_times=None, find_empty_times=None, method="bitmask", stats=None):
     """
-    @brief Solve a Sudoku puzzle using a backtracking algorithm.
+    @brief Solve a Sudoku puzzle using constraint propagation or a backtracking algorithm.
 
     @details This function attempts to solve a Sudoku puzzle. It first validates the input grid,
-    then proceeds to solve the puzzle using a backtracking algorithm implemented in the `SudokuSolverWithCache` class.
-    The function measures the time taken for grid validation and finding empty cells, which are appended to respective lists.
+    then proceeds to solve the puzzle with the selected method:
+    - "bitmask": constraint propagation (naked and hidden singles) on candidate bitmasks with
+      fewest-candidates branching, implemented in the `BitmaskSudokuSolver` class.
+    - "backtracking": a backtracking algorithm implemented in the `SudokuSolverWithCache` class.
+    - "dlx": exact cover with Dancing Links, implemented in the `DLXSudokuSolver` class.
+    The solved grid is written back into `grid` in all cases. A SudokuGrid of any box size (e.g. 16x16) can be
+    solved by all three methods; a 2D list must be 9x9.
+    The time taken for grid validation is appended to `validation_times`. The time taken by each call to
+    find_empty() is only measured (and appended to `find_empty_times`) if a list is passed, as timing every
+    call costs about as much as the call itself. New lists are created on every call when none are given.
+    For search counts and phase times, pass a SolverStats as `stats`; it adds no work per node, as the solvers keep
+    their integer counters in any case.
     The function prints messages regarding the puzzle's completeness and solvability.
 
-    @param grid A 2D list representing the initial Sudoku grid.
-    @param validation_times A list to store the time taken for grid validation at each call (default empty).
-    @param find_empty_times A list to store the time taken to find empty cells at each call (default empty).
+    @param grid A 2D list representing the initial Sudoku grid, or a SudokuGrid.
+    @param validation_times A list to store the time taken for grid validation at each call (default: a new list).
+    @param find_empty_times A list to store the time taken to find empty cells at each call of the backtracking
+    method (default: a new list, and find_empty() is not timed).
+    @param method The solving method, "bitmask" (default), "backtracking" or "dlx".
+    @param stats An optional SolverStats (see solver_stats.py), to which the search nodes, backtracks, propagated
+    cells and the "validation", "setup" and "search" times are added.
 
     @return A tuple containing a boolean indicating if the puzzle was solved or not, and the lists `validation_times` and `find_empty_times`.
 
-    @exception ValueError If the input grid is not valid.
+    @exception ValueError If the input grid is not valid, or if `method` is unknown.
 
     @note The commented out lines are for optional profiling (both time profile and memory profile).
 
@@ -54,56 +74,101 @@ def solve_sudoku(grid, validation_times=[], find_empty_times=[]):
         [0, 0, 0, 4, 1, 9, 0, 0, 5],
         [0, 0, 0, 0, 8, 0, 0, 7, 9]
     ]
-    solved, validation_times, find_empty_times = solve_sudoku(initial_grid)
+    stats = SolverStats()
+    solved, validation_times, find_empty_times = solve_sudoku(initial_grid, stats=stats)
     print("Sudoku Solved:", solved)
+    print(stats)
     ```
     """
-
+    if validation_times is None:
+        validation_times = []
+    time_find_empty = find_empty_times is not None
+    if find_empty_times is None:
+        find_empty_times = []
+    if method not in ("bitmask", "backtracking", "dlx"):
+        raise ValueError(f"solve_sudoku: Unknown method '{method}'.")
+
+    box_size = grid.box_size if isinstance(grid, SudokuGrid) else 3
     try:
-        start_time = time.time()
-        validate_grid(grid)
-        validation_times.append(time.time() - start_time)
+        start_time = time.perf_counter()
+        with timed(stats, "validation"):
+            validate_grid(grid, box_size)
+        validation_times.append(time.perf_counter() - start_time)
     except ValueError as e:
         print(e)
         return False, validation_times, find_empty_times
 
-    solver = SudokuSolverWithCache(grid)
-
-    start_time = time.time()
-    find = solver.find_empty()
-    find_empty_times.append(time.time() - start_time)
-    if not find:
-        print("solve_sudoku: No empty cells found. The grid might already be complete.")
+    if method == "bitmask":
+        with timed(stats, "setup"):
+            solver = BitmaskSudokuSolver(grid, box_size)
+        if 0 not in solver.cells:
+            print("solve_sudoku: No empty cells found. The grid might already be complete.")
+            return True, validation_times, find_empty_times
+        with timed(stats, "search"):
+            solved = solver.solve()
+        if stats is not None:
+            solver.record_stats(stats)
+        if solved:
+            solver.write_solution(grid)
+            print("solve_sudoku: Puzzle solved!")
+        else:
+            print("solve_sudoku: Puzzle could not be solved.")
+        return True, validation_times, find_empty_times
+    if method == "dlx":
+        with timed(stats, "setup"):
+            solver = DLXSudokuSolver(grid, box_size)
+        with timed(stats, "search"):
+            solution = solver.solve()
+        if stats is not None:
+            solver.record_stats(stats)
+        if solution is None:
+            print("solve_sudoku: Puzzle could not be solved.")
+        elif all(list(row) == solved_row for row, solved_row in zip(grid, solution)):
+            print("solve_sudoku: No empty cells found. The grid might already be complete.")
+        else:
+            for row, solved_row in zip(grid, solution):
+                row[:] = bytes(solved_row) if isinstance(row, memoryview) else solved_row
+            print("solve_sudoku: Puzzle solved!")
         return True, validation_times, find_empty_times
 
-    def backtrack():
-        start_time = time.time()
-        find = solver.find_empty()  # Use the cached method to find an empty cell
-        find_empty_times.append(time.time() - start_time)
-
-        if not find:
-            return True  # Puzzle solved
-
-        row, col = find
-        for num in range(1, 10):
-            if is_valid(grid, row, col, num):
-                solver.update_cell(row, col, num)  # Update the cell in the solver's grid
-
-                if backtrack():
-                    return True  # Puzzle solved
-
-                solver.update_cell(row, col, 0)  # Backtrack in the solver's grid
+    with timed(stats, "setup"):
+        solver = SudokuSolverWithCache(grid, box_size)
 
-        return False  # Puzzle not solved
+    if not solver.find_empty():
+        print("solve_sudoku: No empty cells found. The grid might already be complete.")
+        return True, validation_times, find_empty_times
 
     # Start solving the puzzle
-    if backtrack():
+    with timed(stats, "search"):
+        solved, nodes, backtracks = backtracking_search(solver, find_empty_times if time_find_empty else None)
+    if stats is not None:
+        stats.nodes += nodes
+        stats.backtracks += backtracks
+    if solved:
         print("solve_sudoku: Puzzle solved!")
     else:
         print("solve_sudoku: Puzzle could not be solved.")
 
     return True, validation_times, find_empty_times
 
+
+def backtracking_search(solver, find_empty_times=None):
+    """
+    @brief Fill the grid of a SudokuSolverWithCache by backtracking, without printing anything.
+
+    @details The empty cell with the fewest candidates is taken from the solver's cache, and every number it allows
+    is tried in increasing order. The search is run by IterativeSearch with an explicit trail instead of recursing
+    once per filled cell, so it has no Python frame per level and no recursion limit (see iterative_search.py).
+
+    @param solver A SudokuSolverWithCache; its grid is solved in place (and left as given if there is no solution).
+    @param find_empty_times An optional list to which the time of every find_empty() call is appended.
+
+    @return A tuple (solved, nodes, backtracks): whether a solution was found, the number of numbers placed and the
+    number of placements undone.
+    """
+    search = IterativeSearch(solver, find_empty_times)
+    return search.run() == SOLVED, search.nodes, search.backtracks
+
 # from grid_file import read_grid_file
 
 # # Read the soduku grid from a file
@@ -0,0 +1,205 @@
+"""!@file puzzle_generator.py
+@brief Module for generating uniquely solvable Sudoku puzzles graded by difficulty.
+
+@details A puzzle is made in three steps:
+- A random solved grid is built by filling the diagonal boxes with random permutations (they do not constrain
+  each other), completing the grid with BitmaskSudokuSolver and relabelling the numbers at random.
+- Cells are then emptied in random order, in symmetric pairs. A removal is kept only if the puzzle still has a
+  unique solution (counted with DLX, stopping at 2) and is not harder than the target level.
+- The final puzzle is graded with grade_puzzle() and kept if it has the target level.
+
+Difficulty is graded by the techniques needed to solve the puzzle and, beyond those, by search nodes:
+- "easy": naked singles only,
+- "medium": naked and hidden singles (constraint propagation without search),
+- "hard": propagation plus at most HARD_MAX_NODES branching decisions,
+- "expert": more than HARD_MAX_NODES branching decisions.
+
+generate_corpus() generates many puzzles across a process pool and writes one file per level (one 81-character
+puzzle per line, readable by iter_grid_file() and batch mode).
+
+Example Usage: $ python puzzle_generator.py Puzzles/generated --count 1000 [--levels easy hard] [--workers 8] [--seed 1]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
+from bitmask_solver import BitmaskSudokuSolver
+from dlx_solver import count_solutions
+from grid_file import format_grid_line
+
+LEVELS = ("easy", "medium", "hard", "expert")
+HARD_MAX_NODES = 3  # Branching decisions allowed for a "hard" puzzle
+
+
+def random_solution(rng, box_size=3):
+    """
+    @brief Build a random solved grid.
+
+    @param rng A random.Random instance.
+    @param box_size The side length of a box (3 for 9x9).
+
+    @return A solved grid (2D list).
+    """
+    size = box_size * box_size
+    while True:
+        grid = [[0] * size for _ in range(size)]
+        for b in range(box_size):
+            numbers = rng.sample(range(1, size + 1), size)
+            for k, num in enumerate(numbers):
+                grid[b * box_size + k // box_size][b * box_size + k % box_size] = num
+        solver = BitmaskSudokuSolver(grid, box_size)
+        if solver.solve():
+            break
+    labels = [0] + rng.sample(range(1, size + 1), size)
+    return [[labels[solver.cells[r * size + c]] for c in range(size)] for r in range(size)]
+
+
+def grade_puzzle(grid, box_size=3):
+    """
+    @brief Grade a puzzle by the techniques needed to solve it and the search nodes.
+
+    @param grid A 2D list with a unique solution.
+    @param box_size The side length of a box.
+
+    @return A tuple (level, nodes): the level from LEVELS and the number of branching decisions of BitmaskSudokuSolver.
+    """
+    solver = BitmaskSudokuSolver(grid, box_size)
+    cells = solver.cells
+    progress = True
+    while progress:  # Naked singles only
+        progress = False
+        for cell in range(len(cells)):
+            if not cells[cell]:
+                mask = solver.candidates(cell)
+                if mask and not mask & (mask - 1):
+                    solver.place(cell, mask.bit_length())
+                    progress = True
+    if 0 not in cells:
+        return "easy", 0
+    if solver.propagate() and 0 not in cells:
+        return "medium", 0
+    solver.solve()
+    return ("hard" if solver.nodes <= HARD_MAX_NODES else "expert"), solver.nodes
+
+
+def make_puzzle(solution, level, rng, box_size=3):
+    """
+    @brief Empty cells of a solved grid while the puzzle stays unique and no harder than `level`.
+
+    @param solution A solved grid (2D list, not modified).
+    @param level The target level (one of LEVELS).
+    @param rng A random.Random instance.
+    @param box_size The side length of a box.
+
+    @return A tuple (puzzle, level, nodes) with the grade of the final puzzle.
+    """
+    size = box_size * box_size
+    rank = LEVELS.index(level)
+    puzzle = [row[:] for row in solution]
+    cells = list(range(size * size // 2 + 1))  # One cell of each symmetric pair (and the centre)
+    rng.shuffle(cells)
+    for cell in cells:
+        pair = {cell, size * size - 1 - cell}
+        removed = [(c, puzzle[c // size][c % size]) for c in pair]
+        for c, _ in removed:
+            puzzle[c // size][c % size] = 0
+        if count_solutions(puzzle, 2, box_size) == 1 and LEVELS.index(grade_puzzle(puzzle, box_size)[0]) <= rank:
+            continue
+        for c, num in removed:  # Put the pair back
+            puzzle[c // size][c % size] = num
+    grade, nodes = grade_puzzle(puzzle, box_size)
+    return puzzle, grade, nodes
+
+
+def generate_puzzle(level, seed=None, box_size=3, max_attempts=200):
+    """
+    @brief Generate a uniquely solvable puzzle of the given level.
+
+    @param level The target level (one of LEVELS).
+    @param seed A seed for the random generator, so that a puzzle can be reproduced (None for a random one).
+    @param box_size The side length of a box.
+    @param max_attempts The number of solved grids to try before giving up.
+
+    @return A tuple (puzzle, nodes), or None if no puzzle of the level was found.
+
+    @exception ValueError If `level` is unknown.
+    """
+    if level not in LEVELS:
+        raise ValueError(f"generate_puzzle: Unknown level '{level}', expected one of {', '.join(LEVELS)}.")
+    rng = random.Random(seed)
+    for _ in range(max_attempts):
+        puzzle, grade, nodes = make_puzzle(random_solution(rng, box_size), level, rng, box_size)
+        if grade == level:
+            return puzzle, nodes
+    return None
+
+
+def _generate_task(task):
+    level, seed = task
+    return level, generate_puzzle(level, seed)
+
+
+def generate_corpus(output_dir, count, levels=LEVELS, workers=None, seed=0):
+    """
+    @brief Generate `count` puzzles of every level across a process pool and write them to `output_dir/<level>.txt`.
+
+    @details Puzzle i of a level is generated from the seed (seed, level, i), so a corpus can be regenerated exactly
+    whatever the number of workers. Each file starts with a '#' comment line, followed by one puzzle per line.
+
+    @param output_dir The directory to write the files to (created if needed).
+    @param count The number of puzzles per level.
+    @param levels The levels to generate.
+    @param workers The number of worker processes (default: the number of CPUs); 1 generates in this process.
+    @param seed The base seed of the corpus.
+
+    @return A dictionary mapping each level to the number of puzzles written (fewer than `count` if some
+    attempts failed, which can happen for "expert").
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or multiprocessing.cpu_count()
+    tasks = [(level, f"{seed}-{level}-{i}") for level in levels for i in range(count)]
+    files = {level: open(os.path.join(output_dir, f"{level}.txt"), 'w') for level in levels}
+    written = dict.fromkeys(levels, 0)
+    pool = multiprocessing.Pool(workers) if workers > 1 else None
+    try:
+        for level, output in files.items():
+            output.write(f"# {level} Sudoku puzzles, generated by puzzle_generator.py (seed {seed})\n")
+        results = pool.imap(_generate_task, tasks, chunksize=8) if pool else map(_generate_task, tasks)
+        for level, result in results:
+            if result is None:
+                continue
+            files[level].write(format_grid_line(result[0]) + '\n')
+            written[level] += 1
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        for output in files.values():
+            output.close()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate graded, uniquely solvable Sudoku puzzles.")
+    parser.add_argument("output_dir", help="Directory for the <level>.txt files.")
+    parser.add_argument("--count", type=int, default=100, help="Puzzles per level (default: 100).")
+    parser.add_argument("--levels", nargs="+", choices=LEVELS, default=list(LEVELS), help="Levels to generate (default: all).")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: number of CPUs).")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed of the corpus (default: 0).")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    written = generate_corpus(args.output_dir, args.count, args.levels, args.workers, args.seed)
+    total_time = time.perf_counter() - start_time
+    for level, count in written.items():
+        print(f"{level}: {count} puzzles")
+    print("Total time: {:.3f} seconds".format(total_time))
+    return 0
+
+
+# The guard keeps the worker processes from running the script again when they import it.
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,8 +4,17 @@
 @details This script solves a Sudoku puzzle from an input file and saves the solution to 'output.txt'.
 It uses `solve_sudoku` defined in main_solver.py module for solving, `read_grid_file` to read the puzzle, and `save_grid_file` for output.
 Execution time for various stages is measured and displayed. It accepts the puzzle file path as a command-line argument.
+The solving method can be chosen with --method (bitmask, backtracking or dlx). With --count-solutions the
+script instead reports whether the puzzle has no, one or several solutions (using DLX), and with
+--all-solutions it prints every solution. With --batch the input file may hold any number of puzzles
+(one 81-character puzzle per line, or boxed grids), which are solved across a process pool and written to the
+output file one line per puzzle, in order (see batch_solver.py).
+Puzzles of other sizes (4x4, 16x16, 25x25) are read in the same formats (see grid_file.py) and solved as a SudokuGrid.
 
-Example Usage: $ python solve_sudoku.py [input_file_path]
+With --stats the search nodes, backtracks, propagated cells and the time of each phase are printed.
+
+Example Usage: $ python solve_sudoku.py [input_file_path] [--method dlx] [--stats] [--count-solutions] [--all-solutions]
+               $ python solve_sudoku.py puzzles.txt --batch [--output solutions.txt] [--workers 8] [--chunk-size 256]
 
 @author Created by F. Wu on 30/11/2023
 """
@@ -13,27 +22,122 @@ Example Usage: $ python solve_sudoku.py [input_file_path]
 from main_solver import solve_sudoku
 from grid_file import read_grid_file
 from grid_file import save_grid_file
+from grid_file import format_grid_line
+from sudoku_grid import SudokuGrid
+from check_input import validate_grid
+from dlx_solver import DLXSudokuSolver
+from batch_solver import solve_file
+from solver_stats import SolverStats
+import argparse
 import sys
 # import cProfile
 import time
 
-# Read the input file
-file_path = sys.argv[1]
-grid = read_grid_file(file_path)
-
-#cProfile.run('solve_sudoku(grid)')
-
-start_time = time.time()
-# Solve the puzzle
-solved, validation_times, find_empty_times = solve_sudoku(grid)
-end_time = time.time()
-total_time = end_time - start_time
-if solved:
-    print("Validation time: {:.6f} seconds".format(sum(validation_times)))
-    print("Find empty time: {:.6f} seconds".format(sum(find_empty_times)))
-    print("Total time for backtracking algorithm: {:.6f} seconds".format(total_time))
-else:
-    print("Puzzle could not be solved.")
-
-# Save the result to a file
-save_grid_file(grid, 'output.txt')
+def parse_args():
+    """
+    @brief Parse the command-line arguments.
+
+    @return The parsed arguments (argparse.Namespace).
+    """
+    parser = argparse.ArgumentParser(description="Solve a Sudoku puzzle and save the solution to 'output.txt'.")
+    parser.add_argument("input_file", help="Path to the puzzle file.")
+    parser.add_argument("--output", default="output.txt", help="Path of the output file (default: output.txt).")
+    parser.add_argument("--method", choices=["bitmask", "backtracking", "dlx"], default="bitmask", help="Solving method (default: bitmask).")
+    parser.add_argument("--count-solutions", action="store_true", help="Only check whether the solution is unique.")
+    parser.add_argument("--all-solutions", action="store_true", help="Print every solution of the puzzle.")
+    parser.add_argument("--stats", action="store_true", help="Print search nodes, backtracks, propagated cells and phase times.")
+    parser.add_argument("--batch", action="store_true", help="Solve every puzzle of the input file in parallel.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes in batch mode (default: number of CPUs).")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Puzzles sent to a worker at a time in batch mode.")
+    return parser.parse_args()
+
+
+def run_batch(args):
+    """
+    @brief Solve every puzzle of the input file in parallel and print the throughput.
+
+    @param args The parsed command-line arguments.
+    """
+    stats = solve_file(args.input_file, args.output, method=args.method, workers=args.workers, chunk_size=args.chunk_size)
+    print(f"Puzzles: {stats['puzzles']} (solved: {stats['solved']}, invalid: {stats['invalid']}, unsolvable: {stats['unsolvable']})")
+    print("Total time: {:.3f} seconds ({:.1f} puzzles/s)".format(stats['seconds'], stats['puzzles_per_second']))
+
+
+def report_solutions(grid, all_solutions):
+    """
+    @brief Print whether the puzzle has no, one or several solutions, or print all of them.
+
+    @param grid A 2D list representing the Sudoku grid, or a SudokuGrid.
+    @param all_solutions Print every solution instead of stopping at the second one.
+
+    @return The exit status (1 if the grid is invalid, 0 otherwise).
+    """
+    try:
+        validate_grid(grid)
+    except ValueError as e:
+        print(e)
+        return 1
+    start_time = time.time()
+    solver = DLXSudokuSolver(grid)
+    if all_solutions:
+        count = 0
+        for solution in solver.iter_solutions():
+            count += 1
+            print(f"Solution {count}:")
+            for row in solution:
+                print(format_grid_line([row]))
+        print(f"Number of solutions: {count}")
+    else:
+        count = solver.count_solutions(limit=2)
+        print(["Puzzle has no solution.", "Puzzle has a unique solution.", "Puzzle has more than one solution."][count])
+    print("Total time for counting solutions: {:.6f} seconds".format(time.time() - start_time))
+    return 0
+
+
+def main():
+    args = parse_args()
+    if args.batch:
+        run_batch(args)
+        return 0
+
+    # Read the input file
+    file_path = args.input_file
+    grid = read_grid_file(file_path)
+    if grid is None:
+        return 1
+    if len(grid) != 9:
+        # solve_sudoku() takes other sizes as a SudokuGrid, which carries its box size
+        try:
+            grid = SudokuGrid.from_rows(grid)
+        except ValueError as e:
+            print(e)
+            return 1
+
+    if args.count_solutions or args.all_solutions:
+        return report_solutions(grid, args.all_solutions)
+
+    #cProfile.run('solve_sudoku(grid)')
+
+    stats = SolverStats() if args.stats else None
+    start_time = time.perf_counter()
+    # Solve the puzzle
+    solved, validation_times, find_empty_times = solve_sudoku(grid, method=args.method, stats=stats)
+    end_time = time.perf_counter()
+    total_time = end_time - start_time
+    if solved:
+        if stats is not None:
+            print(stats)
+        else:
+            print("Validation time: {:.6f} seconds".format(sum(validation_times)))
+        print("Total time for {} algorithm: {:.6f} seconds".format(args.method, total_time))
+    else:
+        print("Puzzle could not be solved.")
+
+    # Save the result to a file
+    save_grid_file(grid, args.output)
+    return 0
+
+
+# The guard keeps the worker processes of batch mode from running the script again when they import it.
+if __name__ == '__main__':
+    sys.exit(main())
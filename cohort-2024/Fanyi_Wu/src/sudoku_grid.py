@@ -0,0 +1,170 @@
+"""!@file sudoku_grid.py
+@brief Module containing a compact grid type for Sudoku puzzles of any box size.
+
+@details The SudokuGrid class stores an (n^2)x(n^2) Sudoku grid (4x4, 9x9, 16x16, 25x25, ...) as one flat bytearray,
+row by row, with 0 for empty cells. Compared with a list of lists of Python ints it uses one byte per cell and a
+single contiguous buffer, which the solvers copy in one step.
+
+Rows are exposed as writable memoryviews, so code written for 2D lists (`grid[row][col]`, `for row in grid`,
+`len(grid)`) works on a SudokuGrid unchanged. The row views are made once per grid, so `grid[row]` costs a tuple
+lookup; hot loops can still index `grid.cells` directly (row * size + col), as is_valid() and validate_grid() do. Values above 9 are written as letters in the one-line text format
+(A = 10, B = 11, ...).
+"""
+
+import numpy as np
+
+SYMBOLS = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+MAX_BOX_SIZE = 5  # Largest box size whose numbers fit SYMBOLS
+
+
+def box_size_of(size):
+    """
+    @brief Get the box size of a grid with `size` rows.
+
+    @param size The number of rows (and columns) of the grid.
+
+    @return The integer n with n * n == size.
+
+    @exception ValueError If `size` is not the square of an integer greater than 1.
+    """
+    box_size = int(round(size ** 0.5))
+    if size < 4 or box_size * box_size != size:
+        raise ValueError(f"box_size_of: A Sudoku grid must have n^2 rows for some n > 1, not {size}.")
+    return box_size
+
+
+class SudokuGrid:
+    def __init__(self, box_size=3, cells=None):
+        """
+        @brief Create a grid, empty unless its cells are given.
+
+        @param box_size The side length of a box (2 for 4x4, 3 for 9x9, 4 for 16x16, 5 for 25x25).
+        @param cells Optional flat sequence of size^2 numbers, row by row (0 for empty cells).
+
+        @exception ValueError If the box size is unsupported or `cells` has the wrong length or values.
+        """
+        if not 2 <= box_size <= MAX_BOX_SIZE:
+            raise ValueError(f"SudokuGrid: Box size must be between 2 and {MAX_BOX_SIZE}.")
+        self.box_size = box_size
+        self.size = box_size * box_size
+        if cells is None:
+            self.cells = bytearray(self.size * self.size)
+        else:
+            if len(cells) != self.size * self.size:
+                raise ValueError(f"SudokuGrid: Expected {self.size * self.size} cells, got {len(cells)}.")
+            if any(num < 0 or num > self.size for num in cells):
+                raise ValueError(f"SudokuGrid: Grid numbers must be between 0 and {self.size}, inclusive.")
+            self.cells = bytearray(cells)
+        self._rows = self._row_views()
+
+    def _row_views(self):
+        view = memoryview(self.cells)
+        return tuple(view[r * self.size:(r + 1) * self.size] for r in range(self.size))
+
+    def __getstate__(self):
+        # Memoryviews cannot be pickled or deep-copied; they are made again from the cells.
+        return {"box_size": self.box_size, "size": self.size, "cells": self.cells}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._rows = self._row_views()
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        @brief Create a grid from a 2D list; the box size follows from the number of rows.
+
+        @param rows A list of size lists of size integers.
+
+        @return A SudokuGrid.
+
+        @exception ValueError If the grid is not square, its size is not n^2 or a value is out of range.
+        """
+        box_size = box_size_of(len(rows))
+        if any(len(row) != len(rows) for row in rows):
+            raise ValueError(f"SudokuGrid: Each row in the grid must be a list of {len(rows)} numbers.")
+        return cls(box_size, [num for row in rows for num in row])
+
+    @classmethod
+    def from_line(cls, line):
+        """
+        @brief Create a grid from its one-line text form (see to_line()).
+
+        @param line size^2 characters, row by row: '0' or '.' for empty cells, '1'-'9' then 'A'-'Z' for 1 to 35.
+
+        @return A SudokuGrid.
+
+        @exception ValueError If the length is not n^4 or a character is not a number of the grid.
+        """
+        line = line.strip()
+        box_size = box_size_of(int(round(len(line) ** 0.5)))
+        if len(line) != box_size ** 4:
+            raise ValueError(f"SudokuGrid: A grid line must have n^4 characters, not {len(line)}.")
+        try:
+            cells = [0 if char in ".0" else SYMBOLS.index(char.upper()) + 1 for char in line]
+        except ValueError:
+            raise ValueError(f"SudokuGrid: Invalid character in grid line: {line}")
+        return cls(box_size, cells)
+
+    def to_line(self):
+        """
+        @brief Write the grid on one line ('0' for empty cells, letters for numbers above 9).
+
+        @return A string of size^2 characters.
+        """
+        return ''.join(SYMBOLS[num - 1] if num else '0' for num in self.cells)
+
+    def to_rows(self):
+        """
+        @brief Convert the grid to a 2D list of ints.
+
+        @return A new list of size lists of size integers.
+        """
+        return [list(self.cells[r * self.size:(r + 1) * self.size]) for r in range(self.size)]
+
+    def as_array(self):
+        """
+        @brief View the grid as a NumPy array without copying it.
+
+        @return A (size, size) uint8 array sharing the grid's memory (writes to one show in the other).
+        """
+        return np.frombuffer(self.cells, dtype=np.uint8).reshape(self.size, self.size)
+
+    def copy(self):
+        """
+        @brief Copy the grid.
+
+        @return A new SudokuGrid with the same cells.
+        """
+        return SudokuGrid(self.box_size, self.cells)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, row):
+        return self._rows[row]
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __eq__(self, other):
+        if isinstance(other, SudokuGrid):
+            return self.box_size == other.box_size and self.cells == other.cells
+        return NotImplemented
+
+    def __repr__(self):
+        return f"SudokuGrid.from_line('{self.to_line()}')"
+
+    def __str__(self):
+        """Write the grid in the boxed format of grid_file.py, generalised to any box size."""
+        width = 2 if self.size > 9 else 1
+        lines = []
+        for r in range(self.size):
+            if r and r % self.box_size == 0:
+                lines.append('+'.join(['-' * (width * self.box_size)] * self.box_size))
+            row = self.cells[r * self.size:(r + 1) * self.size]
+            lines.append('|'.join(
+                ''.join(str(num).rjust(width, '0') for num in row[b:b + self.box_size])
+                for b in range(0, self.size, self.box_size)
+            ))
+        return '\n'.join(lines)
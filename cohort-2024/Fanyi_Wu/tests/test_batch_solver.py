@@ -0,0 +1,64 @@
+import pytest
+import os
+import sys
+
+# Add the 'src' directory to the sys.path
+current_dir = os.path.dirname(__file__)
+parent_dir = os.path.dirname(current_dir)
+src_dir = os.path.join(parent_dir, 'src')
+sys.path.append(src_dir)
+
+from batch_solver import solve_file, iter_chunks
+from grid_file import iter_grid_file, parse_grid_line, format_grid_line
+
+PUZZLE = "000007000000009504000050169080000305075000290406000080762080000103900000000600000"
+SOLUTION = "594167832618239574237458169981726345375841296426395781762584913143972658859613427"
+BOXED = """000|007|000
+000|009|504
+000|050|169
+---+---+---
+080|000|305
+075|000|290
+406|000|080
+---+---+---
+762|080|000
+103|900|000
+000|600|000
+"""
+
+def test_parse_and_format_grid_line():
+    grid = parse_grid_line(PUZZLE.replace("0", "."))
+    assert grid[0] == [0, 0, 0, 0, 0, 7, 0, 0, 0]
+    assert format_grid_line(grid) == PUZZLE
+    assert parse_grid_line("123") is None
+
+def test_iter_grid_file_mixed_formats(tmp_path):
+    path = tmp_path / "puzzles.txt"
+    path.write_text(PUZZLE + "\n# comment\n\n" + BOXED + "\nnot a puzzle\n" + PUZZLE + "\n")
+    grids = list(iter_grid_file(str(path)))
+    assert len(grids) == 4
+    assert format_grid_line(grids[0]) == PUZZLE
+    assert format_grid_line(grids[1]) == PUZZLE
+    assert grids[2] is None
+    assert format_grid_line(grids[3]) == PUZZLE
+
+def test_iter_chunks():
+    assert list(iter_chunks(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_solve_file_in_order(tmp_path, workers):
+    input_path = tmp_path / "puzzles.txt"
+    output_path = tmp_path / "solutions.txt"
+    unsolvable = "12345678" + "0" * 9 + "9" + "0" * 63  # Cell 8 needs 9, which its column already has
+    input_path.write_text("\n".join([PUZZLE, "11" + "0" * 79, unsolvable, PUZZLE]) + "\n")
+    stats = solve_file(str(input_path), str(output_path), workers=workers, chunk_size=1)
+    lines = output_path.read_text().splitlines()
+    assert lines[0] == SOLUTION
+    assert lines[1].startswith("# invalid:")
+    assert lines[2].startswith("# unsolvable:")
+    assert lines[3] == SOLUTION
+    assert (stats["puzzles"], stats["solved"], stats["invalid"], stats["unsolvable"]) == (4, 2, 1, 1)
+
+def test_solve_file_unknown_method(tmp_path):
+    with pytest.raises(ValueError):
+        solve_file(str(tmp_path / "in.txt"), str(tmp_path / "out.txt"), method="backtracking")
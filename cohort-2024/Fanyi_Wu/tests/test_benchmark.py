@@ -0,0 +1,78 @@
+import pytest
+import os
+import sys
+
+# Add the 'src' directory to the sys.path
+current_dir = os.path.dirname(__file__)
+parent_dir = os.path.dirname(current_dir)
+src_dir = os.path.join(parent_dir, 'src')
+sys.path.append(src_dir)
+
+from benchmark import load_script_grids, load_corpus, run_backend, run_benchmark, compare_to_baseline, uncompared_sets, format_results, BACKENDS
+import benchmark
+
+PUZZLES_DIR = os.path.join(parent_dir, 'Puzzles')
+
+
+def test_load_script_grids():
+    grids = load_script_grids(os.path.join(PUZZLES_DIR, 'hard.py'))
+    assert len(grids) == 1
+    assert len(grids[0]) == 9 and grids[0][0][0] == 8
+    assert load_script_grids(os.path.join(PUZZLES_DIR, 'load_file.py')) == []
+
+
+def test_load_corpus(tmp_path):
+    (tmp_path / "script.py").write_text(f"grid = {[[0] * 9 for _ in range(9)]}\nsolve(grid)\n")
+    (tmp_path / "generated").mkdir()
+    (tmp_path / "generated" / "easy.txt").write_text("# comment\n" + "0" * 81 + "\n" + "1" * 81 + "\n")
+    sets = load_corpus(str(tmp_path))
+    assert sorted(sets) == ["generated/easy", "scripts"]
+    assert len(sets["generated/easy"]) == 1  # The invalid puzzle is skipped
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_run_backend(backend):
+    grid = load_script_grids(os.path.join(PUZZLES_DIR, 'solvable.py'))[0]
+    copy = [row[:] for row in grid]
+    solved, nodes = run_backend(backend, grid)
+    assert solved and nodes >= 0
+    assert grid == copy
+
+
+def test_run_benchmark_and_compare():
+    grids = load_script_grids(os.path.join(PUZZLES_DIR, 'solvable.py'))
+    results = run_benchmark({"solvable": grids}, ("bitmask", "dlx"), memory_sample=1, repeat=2)
+    result = results["bitmask"]["solvable"]
+    assert result["puzzles"] == 1 and result["solved"] == 1
+    assert result["solves_per_second"] > 0 and result["p50_ms"] <= result["p99_ms"]
+    assert result["peak_kib"] > 0
+    assert "solvable" in format_results(results)
+
+    assert compare_to_baseline(results, results) == []
+    slower = {"bitmask": {"solvable": dict(result, solves_per_second=result["solves_per_second"] * 10, p99_ms=0.0, mean_nodes=-1)}}
+    assert len(compare_to_baseline(results, slower)) == 3
+    other_size = {"bitmask": {"solvable": dict(slower["bitmask"]["solvable"], puzzles=2)}}
+    assert compare_to_baseline(results, other_size) == []
+    assert uncompared_sets(results, results) == []
+    assert uncompared_sets(results, other_size) == ["bitmask solvable: 1 puzzles, baseline 2", "dlx solvable: not in the baseline"]
+
+
+def test_limited_run_is_not_reported_as_clean(tmp_path, monkeypatch, capsys):
+    (tmp_path / "generated").mkdir()
+    with open(os.path.join(PUZZLES_DIR, "generated", "easy.txt")) as file:
+        puzzles = [line for line in file if not line.startswith("#")][:3]
+    (tmp_path / "generated" / "easy.txt").write_text("".join(puzzles))
+    baseline = str(tmp_path / "baseline.json")
+
+    def run(*args):
+        monkeypatch.setattr(sys, "argv", ["benchmark.py", str(tmp_path), "--backends", "bitmask", "--repeat", "1",
+                                          "--baseline", baseline, *args])
+        return benchmark.main()
+
+    assert run("--save-baseline") == 0
+    assert run("--tolerance", "100") == 0
+    capsys.readouterr()
+    assert run("--tolerance", "100", "--limit", "2") == 2
+    output = capsys.readouterr().out
+    assert "Not compared: bitmask generated/easy: 2 puzzles, baseline 3" in output
+    assert "comparison is incomplete" in output
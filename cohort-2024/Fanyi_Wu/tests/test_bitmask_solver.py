@@ -0,0 +1,83 @@
+import pytest
+import os
+import sys
+
+# Add the 'src' directory to the sys.path
+current_dir = os.path.dirname(__file__)
+parent_dir = os.path.dirname(current_dir)
+src_dir = os.path.join(parent_dir, 'src')
+sys.path.append(src_dir)
+
+from bitmask_solver import BitmaskSudokuSolver
+from main_solver import solve_sudoku
+
+HARD_GRID = [
+    [8, 0, 0, 0, 0, 0, 0, 0, 0],
+    [0, 0, 3, 6, 0, 0, 0, 0, 0],
+    [0, 7, 0, 0, 9, 0, 2, 0, 0],
+    [0, 5, 0, 0, 0, 7, 0, 0, 0],
+    [0, 0, 0, 0, 4, 5, 7, 0, 0],
+    [0, 0, 0, 1, 0, 0, 0, 3, 0],
+    [0, 0, 1, 0, 0, 0, 0, 6, 8],
+    [0, 0, 8, 5, 0, 0, 0, 1, 0],
+    [0, 9, 0, 0, 0, 0, 4, 0, 0]
+]
+
+def is_solution(grid, puzzle):
+    digits = list(range(1, 10))
+    rows_ok = all(sorted(row) == digits for row in grid)
+    cols_ok = all(sorted(col) == digits for col in zip(*grid))
+    boxes_ok = all(sorted(grid[r + i][c + j] for i in range(3) for j in range(3)) == digits
+                   for r in range(0, 9, 3) for c in range(0, 9, 3))
+    givens_kept = all(puzzle[i][j] in (0, grid[i][j]) for i in range(9) for j in range(9))
+    return rows_ok and cols_ok and boxes_ok and givens_kept
+
+def test_candidates():
+    grid = [[0 for _ in range(9)] for _ in range(9)]
+    grid[0][0] = 1
+    grid[4][1] = 2
+    solver = BitmaskSudokuSolver(grid)
+    assert solver.candidates(1) == 0b111111100  # 1 is in the row and box, 2 in the column
+
+def test_place_and_undo():
+    grid = [[0 for _ in range(9)] for _ in range(9)]
+    solver = BitmaskSudokuSolver(grid)
+    solver.place(0, 5)
+    assert solver.candidates(1) & (1 << 4) == 0
+    solver.undo(0)
+    assert solver.cells[0] == 0
+    assert solver.candidates(1) == solver.all_numbers
+
+def test_solve_hard_grid():
+    grid = [row[:] for row in HARD_GRID]
+    solver = BitmaskSudokuSolver(grid)
+    assert solver.solve() == True
+    solver.write_solution(grid)
+    assert is_solution(grid, HARD_GRID)
+
+def test_solve_empty_grid():
+    grid = [[0 for _ in range(9)] for _ in range(9)]
+    solver = BitmaskSudokuSolver(grid)
+    assert solver.solve() == True
+    solver.write_solution(grid)
+    assert is_solution(grid, [[0 for _ in range(9)] for _ in range(9)])
+
+def test_unsolvable_grid_left_unchanged():
+    grid = [[0 for _ in range(9)] for _ in range(9)]
+    grid[0][:8] = [1, 2, 3, 4, 5, 6, 7, 0]
+    grid[1][8] = 8
+    grid[2][8] = 9  # The last two cells of row 0 need 8 and 9, which their box already has
+    solver = BitmaskSudokuSolver(grid)
+    assert solver.solve() == False
+    assert solver.cells == [num for row in grid for num in row]
+
+def test_solve_sudoku_methods_agree():
+    for method in ("bitmask", "backtracking"):
+        grid = [[0 for _ in range(9)] for _ in range(9)]
+        grid[0][0] = 5
+        solve_sudoku(grid, [], [], method=method)
+        assert is_solution(grid, [[5] + [0] * 8] + [[0] * 9 for _ in range(8)])
+
+def test_solve_sudoku_unknown_method():
+    with pytest.raises(ValueError):
+        solve_sudoku([[0 for _ in range(9)] for _ in range(9)], [], [], method="unknown")
@@ -8,7 +8,8 @@ parent_dir = os.path.dirname(current_dir)
 src_dir = os.path.join(parent_dir, 'src')
 sys.path.append(src_dir)
 
-from check_input import validate_grid
+import numpy as np
+from check_input import validate_grid, find_invalid_grids, validate_grid_array, check_solutions
 def test_valid_grid():
     # Create a valid Sudoku grid and assert that no exception is raised
     grid = [
@@ -81,3 +82,55 @@ def test_grid_with_zeros():
     [0, 0, 0, 0, 0, 0, 0, 0, 0]
     ]
     validate_grid(grid)
+
+
+def solved_grid():
+    return [[(3 * (r % 3) + r // 3 + c) % 9 + 1 for c in range(9)] for r in range(9)]
+
+
+def test_find_invalid_grids():
+    valid = solved_grid()
+    valid[0][0] = 0
+    duplicate_box = [row[:] for row in valid]
+    duplicate_box[1][1] = duplicate_box[0][2]
+    duplicate_box[1][2] = 0
+    duplicate_box[0][1] = 0
+    out_of_range = [row[:] for row in valid]
+    out_of_range[4][4] = 10
+    grids = [valid, [[0] * 9] * 8 + [[1] * 9], duplicate_box, out_of_range]
+    assert list(find_invalid_grids(grids)) == [False, True, True, True]
+    assert list(find_invalid_grids(np.array(grids * 3), chunk_size=5)) == [False, True, True, True] * 3
+    with pytest.raises(ValueError):
+        find_invalid_grids([[[0] * 9] * 8])
+
+
+def test_validate_grid_array_matches_validate_grid():
+    validate_grid_array(solved_grid())
+    grids = [
+        [[0] * 9] * 8 + [[1] * 9],
+        [[1 if i == 8 else 0 for i in range(9)] for _ in range(9)],
+        [[0] * 9] * 8 + [[10] * 9],
+        [[0] * 9] * 8 + [['a'] * 9],
+        [[0] * 9] * 10,
+    ]
+    for grid in grids:
+        with pytest.raises(ValueError):
+            validate_grid(grid)
+        with pytest.raises(ValueError):
+            validate_grid_array(grid)
+    with pytest.raises(ValueError, match="subgrid starting at \\(0, 0\\)"):
+        grid = [[0] * 9 for _ in range(9)]
+        grid[0][0] = grid[1][1] = 5
+        validate_grid_array(grid)
+
+
+def test_check_solutions():
+    solution = solved_grid()
+    puzzle = [row[:] for row in solution]
+    puzzle[0][0] = puzzle[5][5] = 0
+    swapped = [row[:] for row in solution]
+    swapped[0][0], swapped[0][1] = swapped[0][1], swapped[0][0]
+    assert list(check_solutions([solution, puzzle, swapped])) == [True, False, False]
+    other = [row[:] for row in puzzle]
+    other[8][8] = solution[8][8] % 9 + 1
+    assert list(check_solutions([solution, solution], [puzzle, other])) == [True, False]
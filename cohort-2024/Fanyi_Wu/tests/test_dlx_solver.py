@@ -0,0 +1,77 @@
+import pytest
+import os
+import sys
+
+# Add the 'src' directory to the sys.path
+current_dir = os.path.dirname(__file__)
+parent_dir = os.path.dirname(current_dir)
+src_dir = os.path.join(parent_dir, 'src')
+sys.path.append(src_dir)
+
+from dlx_solver import DancingLinks, DLXSudokuSolver, count_solutions
+
+UNIQUE_GRID = [
+    [0, 0, 0, 0, 0, 7, 0, 0, 0],
+    [0, 0, 0, 0, 0, 9, 5, 0, 4],
+    [0, 0, 0, 0, 5, 0, 1, 6, 9],
+    [0, 8, 0, 0, 0, 0, 3, 0, 5],
+    [0, 7, 5, 0, 0, 0, 2, 9, 0],
+    [4, 0, 6, 0, 0, 0, 0, 8, 0],
+    [7, 6, 2, 0, 8, 0, 0, 0, 0],
+    [1, 0, 3, 9, 0, 0, 0, 0, 0],
+    [0, 0, 0, 6, 0, 0, 0, 0, 0]
+]
+
+def is_solution(grid, box_size=3):
+    size = box_size * box_size
+    digits = list(range(1, size + 1))
+    boxes = [[grid[r + i][c + j] for i in range(box_size) for j in range(box_size)]
+             for r in range(0, size, box_size) for c in range(0, size, box_size)]
+    return all(sorted(unit) == digits for unit in list(grid) + list(zip(*grid)) + boxes)
+
+def test_exact_cover():
+    # Knuth's example: rows B, D and F form the only exact cover.
+    links = DancingLinks(7)
+    rows = {"A": [1, 4, 7], "B": [1, 4], "C": [4, 5, 7], "D": [3, 5, 6], "E": [2, 3, 6, 7], "F": [2, 7]}
+    for row_id, columns in rows.items():
+        links.add_row(row_id, columns)
+    assert [sorted(solution) for solution in links.solutions()] == [["B", "D", "F"]]
+
+def test_solve_unique_grid():
+    solution = DLXSudokuSolver(UNIQUE_GRID).solve()
+    assert is_solution(solution)
+    assert all(UNIQUE_GRID[i][j] in (0, solution[i][j]) for i in range(9) for j in range(9))
+
+def test_count_unique():
+    assert count_solutions(UNIQUE_GRID) == 1
+
+def test_count_stops_at_limit():
+    grid = [[0 for _ in range(9)] for _ in range(9)]
+    assert count_solutions(grid) == 2
+    assert count_solutions(grid, limit=5) == 5
+
+def test_count_restores_links():
+    solver = DLXSudokuSolver(UNIQUE_GRID)
+    assert solver.count_solutions() == 1
+    assert solver.count_solutions() == 1
+
+def test_enumerate_all_solutions():
+    grid = [row[:] for row in UNIQUE_GRID]
+    grid[8] = [0] * 9
+    solutions = list(DLXSudokuSolver(grid).iter_solutions())
+    assert len(solutions) > 1
+    assert len({str(solution) for solution in solutions}) == len(solutions)
+    assert all(is_solution(solution) for solution in solutions)
+
+def test_inconsistent_grid():
+    grid = [row[:] for row in UNIQUE_GRID]
+    grid[0][0] = 7  # 7 is already in row 0
+    assert count_solutions(grid) == 0
+    assert DLXSudokuSolver(grid).solve() is None
+
+def test_solve_16x16():
+    grid = [[0 for _ in range(16)] for _ in range(16)]
+    grid[0][0] = 16
+    solution = DLXSudokuSolver(grid, box_size=4).solve()
+    assert solution[0][0] == 16
+    assert is_solution(solution, box_size=4)
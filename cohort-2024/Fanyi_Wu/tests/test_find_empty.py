@@ -44,3 +44,31 @@ def test_update_cell_remove_from_cache():
     solver.update_cell(0, 0, 1)
     assert solver.grid[0][0] == 1
     assert (0, 0) not in solver.empty_cells_cache
+
+def test_find_empty_fewest_candidates():
+    grid = [[0 for _ in range(9)] for _ in range(9)]
+    grid[4][0:8] = [1, 2, 3, 4, 5, 6, 7, 8]
+    solver = SudokuSolverWithCache(grid)
+    assert solver.find_empty() == (4, 8)  # Only 9 can go there
+
+def test_update_cell_refiles_peers():
+    grid = [[0 for _ in range(9)] for _ in range(9)]
+    grid[4][0:7] = [1, 2, 3, 4, 5, 6, 7]
+    solver = SudokuSolverWithCache(grid)
+    assert solver.find_empty() == (4, 7)
+    solver.update_cell(4, 7, 8)
+    assert solver.find_empty() == (4, 8)
+    solver.update_cell(4, 7, 0)  # Backtrack
+    assert solver.find_empty() == (4, 7)
+    assert (4, 7) in solver.empty_cells_cache
+
+def test_find_empty_ties_follow_filing_order():
+    grid = [[0 for _ in range(9)] for _ in range(9)]
+    grid[0][0:7] = [1, 2, 3, 4, 5, 6, 7]
+    grid[8][0:7] = [1, 2, 3, 4, 5, 6, 7]
+    grid[8][0], grid[8][1] = 2, 1  # Still a valid pair of rows
+    solver = SudokuSolverWithCache(grid)
+    assert solver.find_empty() == (0, 7)  # Row-major right after initialisation
+    solver.update_cell(0, 7, 8)
+    solver.update_cell(0, 7, 0)  # (0, 7), (0, 8) and (8, 7) are re-filed behind (8, 8)
+    assert solver.find_empty() == (8, 8)
@@ -0,0 +1,100 @@
+import pytest
+import os
+import sys
+
+# Add the 'src' directory to the sys.path
+current_dir = os.path.dirname(__file__)
+parent_dir = os.path.dirname(current_dir)
+src_dir = os.path.join(parent_dir, 'src')
+sys.path.append(src_dir)
+
+from grid_file import read_grid_file, save_grid_file, parse_grid_line, parse_grid_row, format_grid_line, iter_grid_file
+from sudoku_grid import SudokuGrid
+from check_input import validate_grid
+from batch_solver import solve_file
+import solve_sudoku
+
+
+def pattern_solution(box_size):
+    """A solved grid of any box size, built from the usual shifting pattern."""
+    size = box_size * box_size
+    return [[(box_size * (r % box_size) + r // box_size + c) % size + 1 for c in range(size)] for r in range(size)]
+
+
+def pattern_puzzle(box_size):
+    rows = pattern_solution(box_size)
+    for r, row in enumerate(rows):
+        for c in range(len(row)):
+            if (r + c) % 3 == 0:
+                row[c] = 0
+    return rows
+
+
+def test_read_grid_file_9x9():
+    grid = read_grid_file(os.path.join(current_dir, "input.txt"))
+    assert len(grid) == 9 and all(len(row) == 9 for row in grid)
+
+
+@pytest.mark.parametrize("box_size", [2, 3, 4, 5])
+def test_save_and_read_round_trip(tmp_path, box_size):
+    path = str(tmp_path / "grid.txt")
+    rows = pattern_puzzle(box_size)
+    save_grid_file(rows, path)
+    assert read_grid_file(path) == rows
+    assert list(iter_grid_file(path)) == [rows]
+
+
+def test_boxed_16x16_format():
+    grid = SudokuGrid.from_rows(pattern_solution(4))
+    lines = str(grid).splitlines()
+    assert lines[0] == "01020304|05060708|09101112|13141516"
+    assert lines[4] == "--------+--------+--------+--------"
+    assert parse_grid_row(lines[0]) == list(range(1, 17))
+    assert parse_grid_row("1234|5678|9ABC|DEFG") == list(range(1, 17))
+    assert parse_grid_row("12|34") == [1, 2, 3, 4]
+    assert parse_grid_row("12345") is None
+    assert parse_grid_row("123|456|78A") is None  # 10 does not fit a 9x9 grid
+
+
+def test_read_grid_file_rejects_ragged_rows(tmp_path):
+    path = tmp_path / "grid.txt"
+    path.write_text("12|34\n34|12\n--+--\n123|456|789\n")
+    assert read_grid_file(str(path)) is None
+
+
+@pytest.mark.parametrize("box_size", [2, 3, 4, 5])
+def test_grid_line_round_trip(box_size):
+    rows = pattern_puzzle(box_size)
+    line = format_grid_line(rows)
+    assert len(line) == box_size ** 4
+    assert parse_grid_line(line) == rows
+    assert parse_grid_line(line.replace('0', '.')) == rows
+
+
+def test_iter_grid_file_mixed_sizes(tmp_path):
+    path = tmp_path / "puzzles.txt"
+    boxed_4x4 = str(SudokuGrid.from_rows(pattern_puzzle(2)))
+    path.write_text(boxed_4x4 + "\n" + format_grid_line(pattern_puzzle(4)) + "\n12|3\n"
+                    + format_grid_line(pattern_puzzle(3)) + "\n")
+    grids = list(iter_grid_file(str(path)))
+    assert grids == [pattern_puzzle(2), pattern_puzzle(4), None, pattern_puzzle(3)]
+
+
+def test_solve_sudoku_cli_16x16(tmp_path, monkeypatch):
+    input_path, output_path = str(tmp_path / "in.txt"), str(tmp_path / "out.txt")
+    save_grid_file(pattern_puzzle(4), input_path)
+    monkeypatch.setattr(sys, "argv", ["solve_sudoku.py", input_path, "--output", output_path])
+    assert solve_sudoku.main() == 0
+    solution = read_grid_file(output_path)
+    assert len(solution) == 16 and 0 not in sum(solution, [])
+    validate_grid(solution, box_size=4)
+
+
+def test_solve_file_other_sizes(tmp_path):
+    input_path, output_path = tmp_path / "puzzles.txt", tmp_path / "solutions.txt"
+    input_path.write_text("\n".join(format_grid_line(pattern_puzzle(b)) for b in (2, 3, 4)) + "\n")
+    stats = solve_file(str(input_path), str(output_path), workers=1)
+    assert stats["solved"] == 3
+    for box_size, line in zip((2, 3, 4), output_path.read_text().splitlines()):
+        validate_grid(parse_grid_line(line), box_size)
+        assert '0' not in line
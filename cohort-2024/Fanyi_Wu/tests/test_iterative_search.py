@@ -0,0 +1,93 @@
+import pytest
+import os
+import sys
+import json
+
+# Add the 'src' directory to the sys.path
+current_dir = os.path.dirname(__file__)
+parent_dir = os.path.dirname(current_dir)
+src_dir = os.path.join(parent_dir, 'src')
+sys.path.append(src_dir)
+
+from iterative_search import IterativeSearch, SOLVED, UNSOLVABLE, PAUSED
+from find_empty import SudokuSolverWithCache
+from check_input import validate_grid
+from sudoku_grid import SudokuGrid
+
+HARD_GRID = [
+    [4, 0, 0, 0, 0, 0, 8, 0, 5],
+    [0, 3, 0, 0, 0, 0, 0, 0, 0],
+    [0, 0, 0, 7, 0, 0, 0, 0, 0],
+    [0, 2, 0, 0, 0, 0, 0, 6, 0],
+    [0, 0, 0, 0, 8, 0, 4, 0, 0],
+    [0, 0, 0, 0, 1, 0, 0, 0, 0],
+    [0, 0, 0, 6, 0, 3, 0, 7, 0],
+    [5, 0, 0, 2, 0, 0, 0, 0, 0],
+    [1, 0, 4, 0, 0, 0, 0, 0, 0]
+]
+
+
+def new_search(grid=HARD_GRID):
+    grid = [row[:] for row in grid]
+    return grid, IterativeSearch(SudokuSolverWithCache(grid))
+
+
+def test_solves_in_one_run():
+    grid, search = new_search()
+    assert search.run() == SOLVED
+    validate_grid(grid)
+    assert all(0 not in row for row in grid)
+    assert search.nodes > search.backtracks > 0
+    assert search.run() == SOLVED  # Nothing left to do
+
+
+def test_pause_and_resume_give_the_same_search():
+    grid, search = new_search()
+    search.run()
+    paused_grid, paused = new_search()
+    runs = 1
+    while paused.run(max_nodes=100) == PAUSED:
+        runs += 1
+    assert runs > 2
+    assert paused_grid == grid
+    assert (paused.nodes, paused.backtracks) == (search.nodes, search.backtracks)
+
+
+def test_time_budget():
+    grid, search = new_search()
+    assert search.run(time_budget=0) == PAUSED
+    assert search.run() == SOLVED
+
+
+def test_unsolvable_grid_is_left_unchanged():
+    grid = [[0] * 9 for _ in range(9)]
+    grid[0][:8] = [1, 2, 3, 4, 5, 6, 7, 8]
+    grid[1][8] = 9  # The last cell of the first row has no candidate
+    puzzle = [row[:] for row in grid]
+    search = IterativeSearch(SudokuSolverWithCache(grid))
+    assert search.run() == UNSOLVABLE
+    assert grid == puzzle
+
+
+def test_checkpoint_and_restore():
+    grid, search = new_search()
+    search.run()
+    _, paused = new_search()
+    paused.run(max_nodes=500)
+    checkpoint = json.loads(json.dumps(paused.checkpoint()))
+
+    restored_grid, restored = new_search()
+    restored.restore(checkpoint)
+    assert restored.run() == SOLVED
+    assert restored_grid == grid
+    assert restored.nodes == search.nodes
+    with pytest.raises(ValueError):
+        restored.restore(checkpoint)
+
+
+def test_deep_search_without_recursion():
+    grid = SudokuGrid(4)  # An empty 16x16 grid: 256 search levels
+    search = IterativeSearch(SudokuSolverWithCache(grid, 4))
+    assert search.run() == SOLVED
+    validate_grid(grid)
+    assert 0 not in grid.cells
@@ -0,0 +1,65 @@
+import pytest
+import os
+import sys
+import random
+
+# Add the 'src' directory to the sys.path
+current_dir = os.path.dirname(__file__)
+parent_dir = os.path.dirname(current_dir)
+src_dir = os.path.join(parent_dir, 'src')
+sys.path.append(src_dir)
+
+from puzzle_generator import random_solution, grade_puzzle, generate_puzzle, generate_corpus
+from check_input import validate_grid
+from dlx_solver import count_solutions
+from grid_file import iter_grid_file
+
+
+def test_random_solution_is_valid():
+    rng = random.Random(1)
+    first, second = random_solution(rng), random_solution(rng)
+    for grid in (first, second):
+        validate_grid(grid)
+        assert all(0 not in row for row in grid)
+    assert first != second
+
+
+def test_grade_puzzle():
+    solution = random_solution(random.Random(2))
+    one_missing = [row[:] for row in solution]
+    one_missing[4][4] = 0
+    assert grade_puzzle(one_missing) == ("easy", 0)
+    hard = [
+        [4, 0, 0, 0, 0, 0, 8, 0, 5],
+        [0, 3, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 7, 0, 0, 0, 0, 0],
+        [0, 2, 0, 0, 0, 0, 0, 6, 0],
+        [0, 0, 0, 0, 8, 0, 4, 0, 0],
+        [0, 0, 0, 0, 1, 0, 0, 0, 0],
+        [0, 0, 0, 6, 0, 3, 0, 7, 0],
+        [5, 0, 0, 2, 0, 0, 0, 0, 0],
+        [1, 0, 4, 0, 0, 0, 0, 0, 0]
+    ]
+    level, nodes = grade_puzzle(hard)
+    assert level == "expert" and nodes > 3
+
+
+@pytest.mark.parametrize("level", ["easy", "medium", "hard"])
+def test_generate_puzzle(level):
+    puzzle, nodes = generate_puzzle(level, seed=3)
+    assert count_solutions(puzzle) == 1
+    assert grade_puzzle(puzzle) == (level, nodes)
+    assert generate_puzzle(level, seed=3) == (puzzle, nodes)  # Reproducible from the seed
+
+
+def test_generate_puzzle_unknown_level():
+    with pytest.raises(ValueError):
+        generate_puzzle("impossible")
+
+
+def test_generate_corpus(tmp_path):
+    written = generate_corpus(str(tmp_path), 2, levels=("easy", "medium"), workers=1, seed=4)
+    assert written == {"easy": 2, "medium": 2}
+    puzzles = list(iter_grid_file(str(tmp_path / "medium.txt")))
+    assert len(puzzles) == 2
+    assert all(grade_puzzle(puzzle)[0] == "medium" for puzzle in puzzles)
@@ -0,0 +1,66 @@
+import pytest
+import os
+import sys
+
+# Add the 'src' directory to the sys.path
+current_dir = os.path.dirname(__file__)
+parent_dir = os.path.dirname(current_dir)
+src_dir = os.path.join(parent_dir, 'src')
+sys.path.append(src_dir)
+
+from solver_stats import SolverStats, timed
+from main_solver import solve_sudoku
+
+HARD_GRID = [
+    [4, 0, 0, 0, 0, 0, 8, 0, 5],
+    [0, 3, 0, 0, 0, 0, 0, 0, 0],
+    [0, 0, 0, 7, 0, 0, 0, 0, 0],
+    [0, 2, 0, 0, 0, 0, 0, 6, 0],
+    [0, 0, 0, 0, 8, 0, 4, 0, 0],
+    [0, 0, 0, 0, 1, 0, 0, 0, 0],
+    [0, 0, 0, 6, 0, 3, 0, 7, 0],
+    [5, 0, 0, 2, 0, 0, 0, 0, 0],
+    [1, 0, 4, 0, 0, 0, 0, 0, 0]
+]
+
+
+@pytest.mark.parametrize("method", ["bitmask", "backtracking", "dlx"])
+def test_stats_are_recorded(method):
+    grid = [row[:] for row in HARD_GRID]
+    stats = SolverStats()
+    solve_sudoku(grid, method=method, stats=stats)
+    assert all(0 not in row for row in grid)
+    assert stats.nodes > 0
+    assert stats.backtracks > 0
+    assert set(stats.phase_ns) == {"validation", "setup", "search"}
+    assert all(ns >= 0 for ns in stats.phase_ns.values())
+    if method == "bitmask":
+        assert stats.propagations > 0
+
+
+def test_no_state_shared_between_calls():
+    first = solve_sudoku([row[:] for row in HARD_GRID], method="backtracking")
+    second = solve_sudoku([row[:] for row in HARD_GRID], method="backtracking")
+    assert first[1] is not second[1]
+    assert len(second[1]) == 1
+    assert second[2] == []  # find_empty() is only timed on request
+
+
+def test_find_empty_times_on_request():
+    find_empty_times = []
+    solve_sudoku([row[:] for row in HARD_GRID], [], find_empty_times, method="backtracking")
+    assert len(find_empty_times) > 1
+
+
+def test_merge_and_timed():
+    total = SolverStats()
+    for _ in range(2):
+        stats = SolverStats()
+        with timed(stats, "search"):
+            stats.nodes += 3
+        total.merge(stats)
+    assert total.nodes == 6
+    assert total.as_dict()["phase_ns"].keys() == {"search"}
+    with timed(None, "search"):
+        pass
+    assert "Search nodes: 6" in str(total)
@@ -0,0 +1,148 @@
+import pytest
+import copy
+import os
+import pickle
+import re
+import sys
+
+# Add the 'src' directory to the sys.path
+current_dir = os.path.dirname(__file__)
+parent_dir = os.path.dirname(current_dir)
+src_dir = os.path.join(parent_dir, 'src')
+sys.path.append(src_dir)
+
+from sudoku_grid import SudokuGrid, box_size_of
+from check_input import validate_grid
+from is_valid import is_valid
+from main_solver import solve_sudoku
+
+HARD_LINE = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+HARD_SOLUTION = "417369825632158947958724316825437169791586432346912758289643571573291684164875293"
+
+
+def pattern_solution(box_size):
+    """A solved grid of any box size, built from the usual shifting pattern."""
+    size = box_size * box_size
+    return [[(box_size * (r % box_size) + r // box_size + c) % size + 1 for c in range(size)] for r in range(size)]
+
+
+def puzzle_16x16():
+    cells = [num for row in pattern_solution(4) for num in row]
+    for i in range(0, 256, 3):
+        cells[i] = 0
+    return SudokuGrid(4, cells)
+
+
+def test_box_size_of():
+    assert box_size_of(4) == 2
+    assert box_size_of(9) == 3
+    assert box_size_of(16) == 4
+    for size in (1, 8, 10):
+        with pytest.raises(ValueError):
+            box_size_of(size)
+
+
+def test_line_round_trip():
+    grid = SudokuGrid.from_line(HARD_LINE)
+    assert grid.box_size == 3 and len(grid) == 9
+    assert grid[0][0] == 4 and grid[0][1] == 0
+    assert SudokuGrid.from_line(grid.to_line()) == grid
+    assert grid.to_line() == HARD_LINE.replace('.', '0')
+
+
+def test_letters_for_large_numbers():
+    grid = SudokuGrid.from_rows(pattern_solution(4))
+    line = grid.to_line()
+    assert len(line) == 256 and 'G' in line
+    assert SudokuGrid.from_line(line.lower()) == grid
+
+
+def test_rows_behave_like_lists():
+    rows = pattern_solution(3)
+    grid = SudokuGrid.from_rows(rows)
+    assert [list(row) for row in grid] == rows
+    assert grid.to_rows() == rows
+    grid[8][8] = 0
+    assert grid.cells[80] == 0
+    copy = grid.copy()
+    copy[0][0] = 0
+    assert grid[0][0] == rows[0][0]
+
+
+def test_invalid_grids():
+    with pytest.raises(ValueError):
+        SudokuGrid(3, [0] * 80)
+    with pytest.raises(ValueError):
+        SudokuGrid(2, [5] * 16)
+    with pytest.raises(ValueError):
+        SudokuGrid.from_rows([[0] * 9 for _ in range(8)])
+    with pytest.raises(ValueError):
+        SudokuGrid.from_line(HARD_LINE[:-1])
+    with pytest.raises(ValueError):
+        SudokuGrid.from_line(HARD_LINE.replace('4', 'x'))
+
+
+def test_validate_grid():
+    validate_grid(puzzle_16x16())
+    validate_grid(pattern_solution(4), box_size=4)
+    grid = puzzle_16x16()
+    grid[0][0] = grid[0][1] or grid[0][2]
+    with pytest.raises(ValueError, match="Duplicate"):
+        validate_grid(grid)
+    grid = puzzle_16x16()
+    grid.cells[0] = 17
+    with pytest.raises(ValueError, match="between 0 and 16"):
+        validate_grid(grid)
+
+
+@pytest.mark.parametrize("method", ["bitmask", "backtracking", "dlx"])
+def test_solve_9x9(method):
+    grid = SudokuGrid.from_line(HARD_LINE)
+    solved, _, _ = solve_sudoku(grid, [], [], method=method)
+    assert solved
+    assert grid.to_line() == HARD_SOLUTION
+
+
+@pytest.mark.parametrize("method", ["bitmask", "backtracking", "dlx"])
+def test_solve_16x16(method):
+    grid = puzzle_16x16()
+    solved, _, _ = solve_sudoku(grid, [], [], method=method)
+    assert solved
+    assert 0 not in grid.cells
+    validate_grid(grid)
+
+
+def test_as_array_shares_memory():
+    grid = SudokuGrid.from_line(HARD_LINE)
+    array = grid.as_array()
+    assert array.shape == (9, 9) and array[0, 0] == 4
+    array[0, 1] = 1
+    assert grid[0][1] == 1
+
+
+def test_is_valid_matches_list():
+    grid = SudokuGrid.from_line(HARD_LINE)
+    rows = grid.to_rows()
+    for row in range(9):
+        for col in range(9):
+            for num in range(0, 11):
+                assert is_valid(grid, row, col, num) == is_valid(rows, row, col, num)
+    assert is_valid(puzzle_16x16(), 0, 0, 16, box_size=3) == is_valid(puzzle_16x16().to_rows(), 0, 0, 16, box_size=4)
+
+
+@pytest.mark.parametrize("cells", [(1, 2), (0, 72), (0, 20)])  # Row, column and subgrid duplicates
+def test_validate_grid_messages_match_list(cells):
+    grid = SudokuGrid.from_line(HARD_LINE)
+    grid.cells[cells[0]] = grid.cells[cells[1]] = 2
+    with pytest.raises(ValueError) as list_error:
+        validate_grid(grid.to_rows())
+    with pytest.raises(ValueError, match=re.escape(str(list_error.value))):
+        validate_grid(grid)
+
+
+def test_pickle_and_deepcopy():
+    grid = SudokuGrid.from_line(HARD_LINE)
+    for clone in (pickle.loads(pickle.dumps(grid)), copy.deepcopy(grid)):
+        assert clone == grid
+        clone[0][1] = 1
+        assert clone.cells[1] == 1 and grid[0][1] == 0